@@ -0,0 +1,7 @@
+from .grants_cache import invalidate_grants_cache
+from .routes import router
+
+__all__ = [
+    "router",
+    "invalidate_grants_cache",
+]
@@ -0,0 +1,31 @@
+from typing import Never, Optional
+
+from fastapi import Depends, Query
+from pydantic import BaseModel
+
+from moma_management.di import get_authorization_service
+from moma_management.middlewares.auth import require_admin
+from moma_management.services.authorization import DatagemsAuthorizationService
+
+
+class InvalidationPayload(BaseModel):
+    invalidated: int
+
+
+async def invalidate_grants_cache(
+    sub: Optional[str] = Query(
+        None, description="Only drop the entries of this user (JWT `sub` claim)"),
+    authorization: Optional[DatagemsAuthorizationService] = Depends(
+        get_authorization_service),
+    _auth: Never = Depends(require_admin()),
+) -> InvalidationPayload:
+    """
+    Drop cached permission-gateway answers (realm roles and dataset grants),
+    for one user or for everyone, so that grant changes take effect
+    immediately instead of after the cache TTL.
+
+    **Required permission:** realm role `dg_admin`, `dg_dataset-curator` or `dg_system`.
+    """
+    if authorization is None:
+        return InvalidationPayload(invalidated=0)
+    return InvalidationPayload(invalidated=authorization.invalidate_cache(sub))
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from .grants_cache import invalidate_grants_cache
+
+router = APIRouter(tags=["admin"])
+
+router.add_api_route(
+    "/grants-cache",
+    invalidate_grants_cache,
+    methods=["DELETE"],
+    summary="Invalidate cached permission grants",
+    responses={
+        200: {"description": "Number of cache entries removed"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Admin role required"},
+        502: {"description": "Permission gateway unavailable"},
+    },
+)
@@ -2,6 +2,7 @@ from typing import Never
 
 from fastapi import Depends
 
+from moma_management.api.v1.request_body import ap_candidate
 from moma_management.di import get_ap_service
 from moma_management.domain.analytical_pattern import AnalyticalPattern
 from moma_management.middlewares.auth import require_browse_for_ap_creation
@@ -9,7 +10,7 @@ from moma_management.services.analytical_pattern import AnalyticalPatternService
 
 
 async def create_ap(
-    candidate: AnalyticalPattern,
+    candidate: AnalyticalPattern = Depends(ap_candidate),
     svc: AnalyticalPatternService = Depends(get_ap_service),
     _auth: Never = Depends(require_browse_for_ap_creation()),
 ) -> dict:
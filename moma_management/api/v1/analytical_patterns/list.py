@@ -26,6 +26,15 @@ def _ap_filters(
     page: int = Query(default=1, ge=1, description="Page number (1-indexed)."),
     pageSize: int = Query(default=25, ge=1, le=100,
                           description="Number of results per page (1–100)."),
+    after: str | None = Query(
+        default=None,
+        description="Cursor returned as `nextCursor` by the previous page. "
+                    "When set, `page` is ignored. Not available with `search.q`.",
+    ),
+    includeTotal: bool = Query(
+        default=True,
+        description="Set to `false` to skip counting the matching APs (`total` is then `null`).",
+    ),
     include_evaluations: bool = Query(
         default=False,
         description="Include evaluations for each returned AnalyticalPattern.",
@@ -37,6 +46,8 @@ def _ap_filters(
         if search_q is not None else None,
         page=page,
         pageSize=pageSize,
+        after=after,
+        includeTotal=includeTotal,
         include_evaluations=include_evaluations,
     )
 
@@ -51,7 +62,8 @@ async def list_aps(
 
     When ``search.q`` is provided, a semantic search is performed and results are
     ordered by relevance.  Pagination (``page``/``pageSize``) applies to both the
-    list and search paths.
+    list and search paths.  Outside searches, ``nextCursor`` is set when more
+    APs follow; pass it back as ``after`` to fetch the next page.
 
     Only APs whose ``input`` edges reference datasets the authenticated user can browse
     are returned.  APs with no ``input`` edges are always included.
@@ -63,7 +75,7 @@ async def list_aps(
     """
     if accessible_ids is not None:
         if not accessible_ids:
-            return JSONResponse({"aps": [], "page": filters.page, "pageSize": filters.pageSize, "total": 0})
+            return JSONResponse({"aps": [], "page": filters.page, "pageSize": filters.pageSize, "total": 0, "nextCursor": None})
 
     result = await svc.list(filters, accessible_dataset_ids=accessible_ids)
 
@@ -72,4 +84,5 @@ async def list_aps(
         "page": result["page"],
         "pageSize": result["pageSize"],
         "total": result["total"],
+        "nextCursor": result.get("nextCursor"),
     })
@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from moma_management.api.v1.request_body import json_body
+from moma_management.domain.analytical_pattern import AnalyticalPattern
+
 from .create import create_ap
 from .delete import delete_ap
 from .evaluations.routes import router as evaluation_routes
@@ -17,6 +20,7 @@ router.add_api_route(
     methods=["POST"],
     status_code=201,
     summary="Create a new AnalyticalPattern",
+    openapi_extra=json_body(AnalyticalPattern),
     responses={
         201: {"description": "AnalyticalPattern created", "content": {"application/json": {"schema": {"type": "object", "properties": {"id": {"type": "string"}}}}}},
         401: {"description": "Unauthorized"},
@@ -27,7 +27,7 @@ async def validate_ap(
 
     This endpoint requires no authentication.
     """
-    errors = svc.validate(candidate)
+    errors = await svc.validate(candidate)
     if errors:
         res.status_code = 422
     return ValidationPayload(valid=len(errors) == 0, errors=errors)
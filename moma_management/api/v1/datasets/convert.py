@@ -18,4 +18,4 @@ async def convert_profile(
 
     This endpoint requires no authentication.
     """
-    return svc.convert(input_data)
+    return await svc.convert(input_data)
@@ -1,7 +1,8 @@
-from typing import Any, Dict, Never
+from typing import Never
 
 from fastapi import Depends
 
+from moma_management.api.v1.request_body import dataset_candidate
 from moma_management.di import get_dataset_service
 from moma_management.domain.dataset import Dataset
 from moma_management.middlewares.auth import require_permission
@@ -10,13 +11,15 @@ from moma_management.services.dataset import DatasetService
 
 
 async def create_dataset(
-    candidate: Dataset,
+    candidate: Dataset = Depends(dataset_candidate),
     svc: DatasetService = Depends(get_dataset_service),
     _auth: Never = Depends(require_permission(DatasetRole.CREATE)),
 ) -> None:
     """
     Create a new dataset in the MoMa graph repository.
 
+    The PG-JSON body is validated off the event loop, on the CPU executor.
+
     **Required permission:** realm role `dg_admin` or `dg_dataset-uploader`.
     """
     return await svc.create(candidate)
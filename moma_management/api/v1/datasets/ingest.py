@@ -1,7 +1,8 @@
 from typing import Any, Dict, Never
 
-from fastapi import Depends
+from fastapi import Depends, Request
 
+from moma_management.api.v1.request_body import read_json_object
 from moma_management.di import get_dataset_service
 from moma_management.domain.dataset import Dataset
 from moma_management.middlewares.auth import require_permission
@@ -22,3 +23,21 @@ async def ingest_profile(
     **Required permission:** realm role `dg_admin` or `dg_dataset-uploader`.
     """
     return await svc.ingest(input_data)
+
+
+async def ingest_profile_streaming(
+    request: Request,
+    svc: DatasetService = Depends(get_dataset_service),
+    _auth: Never = Depends(require_permission(DatasetRole.CREATE)),
+) -> Dict[str, Any]:
+    """
+    Ingest a (possibly very large) Croissant profile in streaming mode.
+
+    Unlike `POST /datasets/croissant`, the PG-JSON graph is never built in
+    memory: nodes and edges are converted, validated and written to Neo4j in
+    bounded chunks within a single transaction. Only a summary of the stored
+    dataset is returned.
+
+    **Required permission:** realm role `dg_admin` or `dg_dataset-uploader`.
+    """
+    return await svc.ingest_streaming(await read_json_object(request))
@@ -40,6 +40,10 @@ def _dataset_filters(
     page: int = Query(default=1, ge=1, description="Page number (1-indexed)."),
     pageSize: int = Query(default=25, ge=1, le=100,
                           description="Number of results per page (1–100)."),
+    after: str | None = Query(
+        default=None, description="Cursor returned as `nextCursor` by the previous page. When set, `page` is ignored."),
+    includeTotal: bool = Query(
+        default=True, description="Set to `false` to skip counting the matching datasets (`total` is then `null`)."),
 ) -> DatasetFilter:
     return DatasetFilter(
         nodeIds=nodeIds,
@@ -53,6 +57,8 @@ def _dataset_filters(
         status=status,
         page=page,
         pageSize=pageSize,
+        after=after,
+        includeTotal=includeTotal,
     )
 
 
@@ -68,6 +74,11 @@ async def list_datasets(
     Realm roles `dg_admin` and `dg_dataset-curator` bypass individual dataset
     grants and allow browsing all datasets. When authentication is disabled, all datasets
     are returned regardless of grants.
+
+    `nextCursor` is set when more datasets follow; pass it back as `after`
+    (with the same filters and sorting) to fetch the next page.  Walking a
+    listing with cursors costs the same for every page, unlike deep `page`
+    numbers.
     """
     if accessible_ids is not None:
         # Intersect caller-visible IDs with any existing nodeIds filter.
@@ -79,7 +90,7 @@ async def list_datasets(
 
         # An empty merged list means zero accessible datasets
         if not filters.nodeIds:
-            return JSONResponse({"datasets": [], "page": filters.page, "pageSize": filters.pageSize, "total": 0})
+            return JSONResponse({"datasets": [], "page": filters.page, "pageSize": filters.pageSize, "total": 0, "nextCursor": None})
 
     ds = await svc.list(filters)
     datasets = [
@@ -90,4 +101,5 @@ async def list_datasets(
         "page": ds.get("page", filters.page),
         "pageSize": ds.get("pageSize", filters.pageSize),
         "total": ds.get("total", 0),
+        "nextCursor": ds.get("nextCursor"),
     })
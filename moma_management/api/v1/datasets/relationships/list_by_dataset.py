@@ -1,6 +1,6 @@
 from typing import Never
 
-from fastapi import Depends
+from fastapi import Depends, Query
 
 from moma_management.di import get_dataset_relationship_service
 from moma_management.domain.dataset_relationship import DatasetRelationship
@@ -15,6 +15,11 @@ from moma_management.services.dataset_relationship import DatasetRelationshipSer
 
 async def list_relationships_for_dataset(
     id: str,
+    page: int = Query(default=1, ge=1, description="Page number (1-indexed)."),
+    pageSize: int | None = Query(
+        default=None, ge=1, le=100,
+        description="Number of relationships per page (1–100). "
+                    "All relationships are returned when omitted."),
     svc: DatasetRelationshipService = Depends(get_dataset_relationship_service),
     accessible_ids: list[str] | None = Depends(get_allowed_datasets_ids()),
     _auth: Never = Depends(require_permission(
@@ -27,7 +32,11 @@ async def list_relationships_for_dataset(
     other dataset it links; relationships linking to a dataset the caller
     cannot see are silently omitted rather than causing the request to fail.
 
+    Relationships are ordered by ID.  Set ``pageSize`` (and ``page``) to
+    fetch them page by page; a page shorter than ``pageSize`` is the last one.
+
     **Required permission:** ``dg_ds-browse`` on the path dataset, or realm
     role ``dg_admin`` / ``dg_dataset-curator``.
     """
-    return await svc.list_for_dataset(id, accessible_dataset_ids=accessible_ids)
+    return await svc.list_for_dataset(
+        id, accessible_dataset_ids=accessible_ids, page=page, page_size=pageSize)
@@ -1,11 +1,14 @@
 
 from fastapi import APIRouter
 
+from moma_management.api.v1.request_body import json_body
+from moma_management.domain.dataset import Dataset
+
 from .convert import convert_profile
 from .create import create_dataset
 from .delete import delete_dataset
 from .get import get_dataset
-from .ingest import ingest_profile
+from .ingest import ingest_profile, ingest_profile_streaming
 from .list import list_datasets
 from .relationships.list_by_dataset import list_relationships_for_dataset
 from .relationships.routes import router as relationship_routes
@@ -30,14 +33,29 @@ router.add_api_route(
         500: {"description": "Internal server error"},
     },
 )
+router.add_api_route(
+    "/croissant/stream",
+    ingest_profile_streaming,
+    methods=["POST"],
+    summary="Ingest a large dataset profile in streaming mode",
+    openapi_extra=json_body(),
+    responses={
+        401: {"description": "Unauthorized"},
+        403: {"description": "Forbidden"},
+        422: {"description": "Conversion or validation error"},
+        500: {"description": "Internal server error"},
+    },
+)
 router.add_api_route(
     "/",
     create_dataset,
     methods=["POST"],
     summary="Create a new dataset",
+    openapi_extra=json_body(Dataset),
     responses={
         401: {"description": "Unauthorized"},
         403: {"description": "Forbidden"},
+        422: {"description": "Validation error"},
         500: {"description": "Internal server error"},
     },
 )
@@ -27,7 +27,7 @@ async def validate_dataset(
 
     This endpoint requires no authentication.
     """
-    errors = svc.validate(input_data)
+    errors = await svc.validate(input_data)
     if errors:
         res.status_code = 422
     return ValidationPayload(valid=len(errors) == 0, errors=errors)
@@ -19,6 +19,8 @@ async def update_node(
     """
     Merge the supplied properties onto the existing node identified by `id`.
     Only the provided keys are updated; all other properties are left unchanged.
+    The updated node is validated against the schema of its labels; only that
+    node is checked, not the whole dataset. Returns 422 if it is invalid.
 
     **Required permission:** dataset grant `dg_ds-edit` on the parent dataset, or realm
     role `GLOBAL_dg_admin` / `GLOBAL_dg_dataset-curator`.
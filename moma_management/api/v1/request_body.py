@@ -0,0 +1,62 @@
+import asyncio
+from json import JSONDecodeError, loads
+from typing import Any, Dict
+
+from fastapi import Depends, HTTPException, Request
+from pydantic import BaseModel
+
+from moma_management.di import get_ap_service, get_dataset_service
+from moma_management.domain.analytical_pattern import AnalyticalPattern
+from moma_management.domain.dataset import Dataset
+from moma_management.services.analytical_pattern import AnalyticalPatternService
+from moma_management.services.dataset import DatasetService
+
+
+def json_body(model: type[BaseModel] | None = None) -> Dict[str, Any]:
+    """
+    Return the ``openapi_extra`` documenting the JSON body of a route that
+    reads it from the request itself, as *model* when given.
+
+    The models *model* refers to must be part of the OpenAPI document
+    through other routes.
+    """
+    schema: Dict[str, Any] = {"type": "object"}
+    if model is not None:
+        schema = model.model_json_schema(
+            ref_template="#/components/schemas/{model}")
+        schema.pop("$defs", None)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        },
+    }
+
+
+async def read_json_object(request: Request) -> Dict[str, Any]:
+    """Decode the JSON object body of *request* in a thread; 422 if it is not one."""
+    try:
+        # Decoded in a thread: the bodies of large graphs take a while.
+        candidate = await asyncio.to_thread(loads, await request.body())
+    except (JSONDecodeError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON body: {e}")
+    if not isinstance(candidate, dict):
+        raise HTTPException(
+            status_code=422, detail="The body must be a JSON object")
+    return candidate
+
+
+async def dataset_candidate(
+    request: Request,
+    svc: DatasetService = Depends(get_dataset_service),
+) -> Dataset:
+    """The request body as a Dataset, validated on the CPU executor."""
+    return await svc.parse(await read_json_object(request))
+
+
+async def ap_candidate(
+    request: Request,
+    svc: AnalyticalPatternService = Depends(get_ap_service),
+) -> AnalyticalPattern:
+    """The request body as an AnalyticalPattern, validated on the CPU executor."""
+    return await svc.parse(await read_json_object(request))
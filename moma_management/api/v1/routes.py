@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from .admin.routes import router as admin_routes
 from .analytical_patterns.routes import router as ap_routes
 from .datasets.routes import router as dataset_routes
 from .health import health_check
@@ -14,6 +15,7 @@ router.include_router(node_routes, prefix="/nodes")
 router.include_router(ap_routes, prefix="/aps")
 router.include_router(task_routes, prefix="/tasks")
 router.include_router(ml_model_routes, prefix="/ml-models")
+router.include_router(admin_routes, prefix="/admin")
 router.add_api_route(
     "/health",
     health_check,
@@ -8,6 +8,7 @@ from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, FastAPI
 from neo4j import AsyncDriver, AsyncGraphDatabase, AsyncSession
 
+from moma_management.domain.validation import SchemaStep
 from moma_management.repository import DatasetRepository, Neo4jDatasetRepository
 from moma_management.repository.analytical_pattern import (
     AnalyticalPatternRepository,
@@ -21,6 +22,8 @@ from moma_management.repository.dataset_relationship import (
     DatasetRelationshipRepository,
     Neo4jDatasetRelationshipRepository,
 )
+from moma_management.repository.migrations import run_migrations
+from moma_management.repository.neo4j_pgson_mixin import Neo4jPgJsonMixin
 from moma_management.repository.node import Neo4jNodeRepository, NodeRepository
 from moma_management.repository.task import Neo4jTaskRepository, TaskRepository
 from moma_management.services.analytical_pattern import AnalyticalPatternService
@@ -29,18 +32,36 @@ from moma_management.services.authorization import DatagemsAuthorizationService
 from moma_management.services.dataset import DatasetService
 from moma_management.services.dataset_relationship import DatasetRelationshipService
 from moma_management.services.embeddings import Embedder, LocalEmbedder
+from moma_management.services.executor import ExecutorMode, WorkExecutor
 from moma_management.services.ml_model import MlModelService
 from moma_management.services.node import NodeService
 from moma_management.services.task import TaskService
+from moma_management.services.ttl_cache import TtlCache
 
 logger = logging.getLogger(__name__)
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "datagems")
+NEO4J_WRITE_BATCH_SIZE = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000"))
+if NEO4J_WRITE_BATCH_SIZE < 1:
+    raise ValueError(
+        f"NEO4J_WRITE_BATCH_SIZE must be at least 1, got {NEO4J_WRITE_BATCH_SIZE}")
+RUN_MIGRATIONS_ON_STARTUP = os.getenv(
+    "RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+DATASET_USE_VIRTUAL_EDGES = os.getenv(
+    "DATASET_USE_VIRTUAL_EDGES", "true").lower() == "true"
+LIST_TOTAL_CACHE_TTL_SECONDS = float(
+    os.getenv("LIST_TOTAL_CACHE_TTL_SECONDS", "30"))
 
 driver: AsyncDriver
 _embedder: Optional[Embedder] = None
+_cpu_executor: Optional[WorkExecutor] = None
+_embedding_executor: Optional[WorkExecutor] = None
+# Totals of dataset and AP listings, shared by every request of the worker.
+_list_total_cache: Optional[TtlCache[int]] = (
+    TtlCache(LIST_TOTAL_CACHE_TTL_SECONDS, max_size=1000)
+    if LIST_TOTAL_CACHE_TTL_SECONDS > 0 else None)
 
 _DEFAULT_EMBEDDER_MODEL = "all-MiniLM-L6-v2"
 
@@ -48,11 +69,12 @@ _DEFAULT_EMBEDDER_MODEL = "all-MiniLM-L6-v2"
 @asynccontextmanager
 async def container_lifespan(_: FastAPI):
     """
-    Lifespan context manager to setup and teardown the Neo4j driver.
-    This ties the driver's lifecycle to that of the FastAPI application
+    Lifespan context manager to setup and teardown the Neo4j driver and the
+    permissions gateway HTTP session.
+    This ties their lifecycle to that of the FastAPI application
     and prevents connection leaks.
     """
-    global driver, _embedder
+    global driver, _embedder, _cpu_executor, _embedding_executor
     driver = AsyncGraphDatabase.driver(
         NEO4J_URI,
         auth=(NEO4J_USER, NEO4J_PASSWORD),
@@ -60,6 +82,24 @@ async def container_lifespan(_: FastAPI):
         connection_acquisition_timeout=10,
         max_transaction_retry_time=30,
     )
+    Neo4jPgJsonMixin.write_batch_size = NEO4J_WRITE_BATCH_SIZE
+    Neo4jDatasetRepository.use_virtual_edges = DATASET_USE_VIRTUAL_EDGES
+
+    async with driver.session() as session:
+        if RUN_MIGRATIONS_ON_STARTUP:
+            # A failed migration leaves the graph in a state the service does
+            # not expect, so it aborts startup.
+            try:
+                applied = await run_migrations(session)
+            except Exception:
+                logger.exception("Neo4j migrations failed")
+                raise
+            if applied:
+                logger.info("Applied migrations: %s", applied)
+
+        # Warm-up: touch Dataset nodes so Neo4j loads them into page cache.
+        # This avoids the cold-cache penalty on the first real query.
+        await session.run("MATCH (n:`sc:Dataset`) RETURN count(n) AS c")
 
     embedder_model = os.getenv("EMBEDDER_MODEL", _DEFAULT_EMBEDDER_MODEL)
     if embedder_model:
@@ -67,7 +107,37 @@ async def container_lifespan(_: FastAPI):
         logger.info("Embedder loaded: %s (%d dimensions)",
                     embedder_model, _embedder.dimensions)
 
+    _cpu_executor = WorkExecutor(
+        "cpu",
+        mode=ExecutorMode(os.getenv("CPU_EXECUTOR", "process")),
+        max_workers=int(os.getenv("CPU_EXECUTOR_WORKERS") or 0) or None,
+        max_queue=int(os.getenv("CPU_EXECUTOR_MAX_QUEUE", "64")),
+        # Graphs are validated in these workers: sharding there would start
+        # one sharding pool per worker.
+        initializer=SchemaStep.disable_sharding,
+    )
+    _embedding_executor = WorkExecutor(
+        "embedding",
+        mode=ExecutorMode(os.getenv("EMBEDDING_EXECUTOR", "thread")),
+        max_workers=int(os.getenv("EMBEDDING_EXECUTOR_WORKERS", "1")),
+        max_queue=int(os.getenv("EMBEDDING_EXECUTOR_MAX_QUEUE", "64")),
+    )
+
+    authentication = get_authentication_service()
+    if authentication is not None:
+        await authentication.start()
+    authorization = get_authorization_service()
+    if authorization is not None:
+        await authorization.start()
+
     yield
+    if authorization is not None:
+        await authorization.close()
+    if authentication is not None:
+        await authentication.close()
+    _cpu_executor.shutdown()
+    _embedding_executor.shutdown()
+    SchemaStep.shutdown_pool()
     await driver.close()
 
 
@@ -84,21 +154,41 @@ def get_mapping_file() -> Path:
 
 async def get_dataset_repo(session: AsyncSession = Depends(get_db_session)) -> DatasetRepository:
     """Return the repository for Dataset graph operations."""
-    return await Neo4jDatasetRepository.create_with_indexes(session)
+    return Neo4jDatasetRepository(session)
 
 
 async def get_dataset_relationship_repo(session: AsyncSession = Depends(get_db_session)) -> DatasetRelationshipRepository:
     """Return the repository for DatasetRelationship graph operations."""
-    return await Neo4jDatasetRelationshipRepository.create_with_indexes(session)
+    return Neo4jDatasetRelationshipRepository(session)
+
+
+def get_cpu_executor() -> Optional[WorkExecutor]:
+    """Return the executor for CPU-bound conversion and validation work."""
+    return _cpu_executor
+
+
+def get_embedding_executor() -> Optional[WorkExecutor]:
+    """Return the executor for embedding computations."""
+    return _embedding_executor
+
+
+def get_list_total_cache() -> Optional[TtlCache[int]]:
+    """Return the cache of listing totals, or ``None`` when disabled."""
+    return _list_total_cache
 
 
 def get_dataset_service(
     repo: DatasetRepository = Depends(get_dataset_repo),
     mapping_file: Path = Depends(get_mapping_file),
     relationship_repo: DatasetRelationshipRepository = Depends(get_dataset_relationship_repo),
+    cpu_executor: Optional[WorkExecutor] = Depends(get_cpu_executor),
+    total_cache: Optional[TtlCache[int]] = Depends(get_list_total_cache),
 ) -> DatasetService:
     """Return the service for Dataset operations."""
-    return DatasetService(repo, mapping_file, relationship_repo)
+    return DatasetService(repo, mapping_file, relationship_repo,
+                          stream_chunk_size=NEO4J_WRITE_BATCH_SIZE,
+                          cpu_executor=cpu_executor,
+                          total_cache=total_cache)
 
 
 def get_dataset_relationship_service(
@@ -127,7 +217,11 @@ def get_authorization_service() -> Optional[DatagemsAuthorizationService]:
             "PERMISSIONS_GATEWAY_URL not set, authorization disabled")
         return None
     return DatagemsAuthorizationService(
-        gateway_url=os.getenv("PERMISSIONS_GATEWAY_URL", "")
+        gateway_url=os.getenv("PERMISSIONS_GATEWAY_URL", ""),
+        max_connections=int(
+            os.getenv("PERMISSIONS_GATEWAY_MAX_CONNECTIONS", "100")),
+        cache_ttl=float(os.getenv("PERMISSIONS_CACHE_TTL_SECONDS", "60")),
+        cache_max_size=int(os.getenv("PERMISSIONS_CACHE_MAX_SIZE", "10000")),
     )
 
 
@@ -144,12 +238,14 @@ def get_authentication_service() -> Optional[Authentication]:
         client_id=os.getenv("OIDC_CLIENT_ID") or None,
         client_secret=os.getenv("OIDC_CLIENT_SECRET") or None,
         exchange_scope=os.getenv("OIDC_EXCHANGE_SCOPE"),
+        token_cache_ttl=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60")),
+        token_cache_max_size=int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000")),
     )
 
 
 async def get_ap_repo(session: AsyncSession = Depends(get_db_session)) -> AnalyticalPatternRepository:
     """Return the repository for AnalyticalPattern graph operations."""
-    return await Neo4jAnalyticalPatternRepository.create_with_indexes(session)
+    return Neo4jAnalyticalPatternRepository(session)
 
 
 def get_embedder() -> Optional[Embedder]:
@@ -161,14 +257,20 @@ def get_ap_service(
     repo: AnalyticalPatternRepository = Depends(get_ap_repo),
     dataset_svc: DatasetService = Depends(get_dataset_service),
     embedder: Optional[Embedder] = Depends(get_embedder),
+    cpu_executor: Optional[WorkExecutor] = Depends(get_cpu_executor),
+    embedding_executor: Optional[WorkExecutor] = Depends(get_embedding_executor),
+    total_cache: Optional[TtlCache[int]] = Depends(get_list_total_cache),
 ) -> AnalyticalPatternService:
     """Return the service for AnalyticalPattern operations."""
-    return AnalyticalPatternService(repo, dataset_svc, embedder=embedder)
+    return AnalyticalPatternService(repo, dataset_svc, embedder=embedder,
+                                    cpu_executor=cpu_executor,
+                                    embedding_executor=embedding_executor,
+                                    total_cache=total_cache)
 
 
 async def get_task_repo(session: AsyncSession = Depends(get_db_session)) -> TaskRepository:
     """Return the repository for Task node operations."""
-    return await Neo4jTaskRepository.create_with_indexes(session)
+    return Neo4jTaskRepository(session)
 
 
 def get_task_service(
@@ -181,7 +283,7 @@ def get_task_service(
 
 async def get_ml_model_repo(session: AsyncSession = Depends(get_db_session)) -> MlModelRepository:
     """Return the repository for ML_Model node operations."""
-    return await Neo4jMlModelRepository.create_with_indexes(session)
+    return Neo4jMlModelRepository(session)
 
 
 def get_ml_model_service(
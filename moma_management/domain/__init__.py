@@ -1,4 +1,10 @@
+import os
 from pathlib import Path
 
 SCHEMA_DIR = Path(__file__).parent / "schema"
 EDGE_CONSTRAINTS_PATH = SCHEMA_DIR / "edges" / "edge_constraints.json"
+
+# Sharded schema validation (see SchemaStep).  Read from the environment here
+# rather than at start-up so that validation worker processes see it too.
+VALIDATION_PARALLEL_THRESHOLD = int(os.getenv("VALIDATION_PARALLEL_THRESHOLD") or 0)
+VALIDATION_PARALLEL_WORKERS = int(os.getenv("VALIDATION_PARALLEL_WORKERS") or 0) or None
@@ -2,6 +2,7 @@ from typing import Self
 
 from pydantic import model_validator
 
+from moma_management.domain.generated.edges.edge_schema import EdgeLabel
 from moma_management.domain.generated.nodes import node_schema
 from moma_management.domain.pg_json_graph import MomaEntity
 
@@ -21,6 +22,25 @@ class AnalyticalPattern(MomaEntity):
         """Return the single ``Analytical_Pattern`` root node."""
         return next(n for n in self.nodes if self.__class__._root_label in n.labels)
 
+    @property
+    def input_node_ids(self) -> list[str]:
+        """
+        Return the ids of the dataset nodes feeding the AP's ``input`` edges.
+
+        Internal ResultType nodes (transient values between Operators) are
+        excluded; Data nodes are ResultType subtypes but are kept.
+        """
+        internal_ids = {
+            str(n.id)
+            for n in self.nodes
+            if "ResultType" in (n.labels or []) and "Data" not in (n.labels or [])
+        }
+        return [
+            str(e.from_)
+            for e in (self.edges or [])
+            if EdgeLabel.input in e.labels and str(e.from_) not in internal_ids
+        ]
+
     @model_validator(mode="after")
     def validate(self: Self) -> Self:
         errors = self.__class__.validation_chain.handle(self)
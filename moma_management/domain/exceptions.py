@@ -29,3 +29,8 @@ class RepositoryError(MomaError):
 class ConflictError(MomaError):
     """Raised when an operation conflicts with existing state."""
     pass
+
+
+class OverloadedError(MomaError):
+    """Raised when a request is rejected because a worker pool is saturated."""
+    pass
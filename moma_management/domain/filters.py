@@ -115,6 +115,15 @@ class DatasetFilter(BaseModel):
     status:        Optional[Status] = None
     page:     int = Field(default=1,  ge=1)
     pageSize: int = Field(default=10, ge=1, le=100)
+    after:    Optional[str] = Field(
+        default=None,
+        description="Cursor returned as `nextCursor` by the previous page. "
+                    "When set, `page` is ignored.",
+    )
+    includeTotal: bool = Field(
+        default=True,
+        description="When False, the total match count is not computed.",
+    )
 
 
 class APSearchParams(BaseModel):
@@ -133,6 +142,15 @@ class AnalyticalPatternFilter(BaseModel):
     search: Optional[APSearchParams] = None
     page: int = Field(default=1, ge=1)
     pageSize: int = Field(default=25, ge=1, le=100)
+    after: Optional[str] = Field(
+        default=None,
+        description="Cursor returned as `nextCursor` by the previous page. "
+                    "When set, `page` is ignored.",
+    )
+    includeTotal: bool = Field(
+        default=True,
+        description="When False, the total match count is not computed.",
+    )
     include_evaluations: bool = Field(
         default=False,
         description="When True, each AP result includes its associated evaluations.",
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 from pydantic import BaseModel
+from yaml import safe_load
 
 # =========================================================
 # Errors
@@ -17,67 +22,63 @@ class MappingError(Exception):
 # JSON path helper
 # =========================================================
 
-def get_path(data: dict, path: str) -> Any:
-    """Simple dot-path resolver."""
-    cur = data
-    for part in path.split("."):
+def _split_path(path: str) -> Tuple[str, ...]:
+    return tuple(path.split("."))
+
+
+def _get_parts(data: dict, parts: Tuple[str, ...]) -> Any:
+    """Resolve a pre-split dot-path (see :func:`get_path`)."""
+    cur: Any = data
+    for part in parts:
         if not isinstance(cur, dict):
             return None
         cur = cur.get(part)
     return cur
 
 
+def get_path(data: dict, path: str) -> Any:
+    """Simple dot-path resolver."""
+    return _get_parts(data, _split_path(path))
+
+
 # =========================================================
 # Truth evaluator
 # =========================================================
 
-def truthy(data: dict, expr: str) -> bool:
+Predicate = Callable[[dict], bool]
+
+
+@lru_cache(maxsize=None)
+def compile_condition(expr: str) -> Predicate:
+    """
+    Compile a condition expression into a predicate over a data dict.
+
+    Supports ``||``, ``&&``, ``path ^= 'prefix'``, ``path == 'value'`` and bare
+    ``path`` (true when the path resolves to a non-``None`` value).  Parsing
+    is done once per distinct expression string.
+    """
     if "||" in expr:
-        return any(truthy(data, part.strip()) for part in expr.split("||"))
+        alternatives = tuple(compile_condition(part.strip())
+                             for part in expr.split("||"))
+        return lambda data: any(p(data) for p in alternatives)
     if "&&" in expr:
-        return all(truthy(data, part.strip()) for part in expr.split("&&"))
+        conjuncts = tuple(compile_condition(part.strip())
+                          for part in expr.split("&&"))
+        return lambda data: all(p(data) for p in conjuncts)
     if "^=" in expr:
         left, right = expr.split("^=", 1)
-        return str(get_path(data, left.strip())).startswith(right.strip().strip("'\""))
+        parts, prefix = _split_path(left.strip()), right.strip().strip("'\"")
+        return lambda data: str(_get_parts(data, parts)).startswith(prefix)
     if "==" in expr:
         left, right = expr.split("==", 1)
-        return str(get_path(data, left.strip())) == right.strip().strip("'\"")
-    return get_path(data, expr) is not None
-
-
-# =========================================================
-# Label resolver (NO None allowed)
-# =========================================================
-
-def resolve_labels(data: dict, spec: Any) -> List[str]:
-    if not spec:
-        return []
-
-    if isinstance(spec, list) and spec and isinstance(spec[0], dict):
-        for rule in spec:
-            if "case" in rule and truthy(data, rule["case"]):
-                return _expand_labels(data, rule["value"])
-            if "default" in rule:
-                return _expand_labels(data, rule["default"])
+        parts, value = _split_path(left.strip()), right.strip().strip("'\"")
+        return lambda data: str(_get_parts(data, parts)) == value
+    parts = _split_path(expr)
+    return lambda data: _get_parts(data, parts) is not None
 
-    return _expand_labels(data, spec)
-
-
-def _expand_labels(data: dict, labels: List[str]) -> List[str]:
-    out: List[str] = []
-
-    for l in labels:
-        if isinstance(l, str) and l.startswith("@"):
-            key = l[1:]  # strip the dereference marker
-            # try the bare key first, then the original @-prefixed key
-            v = data.get(key) if key in data else data.get(l)
-            if v is not None:   # 🔥 critical fix
-                out.append(v)
-        else:
-            if l is not None:
-                out.append(l)
 
-    return out
+def truthy(data: dict, expr: str) -> bool:
+    return compile_condition(expr)(data)
 
 
 # =========================================================
@@ -124,19 +125,210 @@ def build_schema_registry() -> SchemaRegistry:
     }
 
 
+# =========================================================
+# Compiled mapping plan
+# =========================================================
+
+@dataclass(slots=True)
+class LabelRule:
+    """One branch of a label rule list; ``case`` is ``None`` for defaults."""
+    case: Predicate | None
+    labels: List[Any]
+
+
+@dataclass(slots=True)
+class EdgePlan:
+    label: str
+    from_ref: str
+    from_parts: Tuple[str, ...]
+    to_ref: str
+    to_parts: Tuple[str, ...]
+
+
+@dataclass(slots=True)
+class SpecPlan:
+    """A mapping spec (or one of its variants) compiled for a given type."""
+    type_name: str
+    id_parts: Tuple[str, ...]
+    match: Predicate | None
+    label_rules: List[LabelRule]
+    default_labels: List[Any]
+    # (property key, pre-split path) restricted to the type's schema fields
+    properties: List[Tuple[str, Tuple[str, ...]]]
+    schema_fields: set
+    edges: List[EdgePlan]
+    # ``None`` when the spec's ``children`` section is not a mapping
+    children: List[Tuple[str, str]] | None
+    # (``when`` condition or ``None`` for a default, compiled variant spec)
+    variants: List[Tuple[Predicate | None, "SpecPlan"]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class MappingPlan:
+    """A ``mapping.yml`` document compiled for repeated conversions."""
+    root: SpecPlan
+    specs: Dict[str, SpecPlan]
+
+    @classmethod
+    def compile(
+        cls,
+        mapping: dict,
+        schema_registry: SchemaRegistry | None = None,
+    ) -> "MappingPlan":
+        if schema_registry is None:
+            schema_registry = build_schema_registry()
+        specs = {
+            name: _compile_spec(spec, name, schema_registry)
+            for name, spec in mapping.items()
+        }
+        return cls(root=specs[next(iter(mapping))], specs=specs)
+
+
+def _resolve_schema_fields(
+    type_name: str,
+    spec: dict,
+    schema_registry: SchemaRegistry,
+) -> set:
+    """Look up schema fields for *type_name*; fall back to the spec's own map keys."""
+    fields = schema_registry.get(type_name)
+    if fields is not None:
+        return fields
+    return set(spec.get("map", {}).keys())
+
+
+def _compile_labels(spec: Any) -> Tuple[List[LabelRule], List[Any]]:
+    if not spec:
+        return [], []
+
+    rules: List[LabelRule] = []
+    if isinstance(spec, list) and spec and isinstance(spec[0], dict):
+        for rule in spec:
+            if "case" in rule:
+                rules.append(LabelRule(
+                    compile_condition(rule["case"]), rule.get("value", [])))
+            if "default" in rule:
+                rules.append(LabelRule(None, rule["default"]))
+
+    return rules, list(spec)
+
+
+def _compile_spec(
+    spec: dict,
+    type_name: str,
+    schema_registry: SchemaRegistry,
+    with_variants: bool = True,
+) -> SpecPlan:
+    # A variant may declare its own type (e.g. Column, Text, PDF).
+    effective_type = spec.get("type", type_name)
+    schema_fields = _resolve_schema_fields(
+        effective_type, spec, schema_registry)
+    label_rules, default_labels = _compile_labels(spec.get("labels"))
+    children = spec.get("children", {})
+
+    plan = SpecPlan(
+        type_name=effective_type,
+        id_parts=_split_path(spec["id"]),
+        match=compile_condition(
+            spec["match"]) if "match" in spec else None,
+        label_rules=label_rules,
+        default_labels=default_labels,
+        properties=[
+            (k, _split_path(path))
+            for k, path in (spec.get("map") or {}).items()
+            if k in schema_fields
+        ],
+        schema_fields=schema_fields,
+        edges=[
+            EdgePlan(
+                label=e["label"],
+                from_ref=e["from"], from_parts=_split_path(e["from"]),
+                to_ref=e["to"], to_parts=_split_path(e["to"]),
+            )
+            for e in spec.get("edges") or []
+        ],
+        children=list(children.items()) if isinstance(
+            children, dict) else None,
+    )
+
+    if with_variants:
+        for v in spec.get("variants") or []:
+            if "default" in v:
+                condition = None
+            elif "when" in v:
+                condition = compile_condition(v["when"])
+            else:
+                continue
+            merged = _compile_spec(
+                {**spec, **v}, type_name, schema_registry, with_variants=False)
+            plan.variants.append((condition, merged))
+
+    return plan
+
+
+_plan_cache: Dict[Path, Tuple[int, MappingPlan]] = {}
+_plan_cache_lock = Lock()
+
+
+def load_mapping_plan(path: Path) -> MappingPlan:
+    """
+    Return the compiled :class:`MappingPlan` for the mapping file at *path*.
+
+    Plans are cached per file and recompiled only when the file's
+    modification time changes.
+    """
+    path = Path(path).resolve()
+    mtime = path.stat().st_mtime_ns
+    with _plan_cache_lock:
+        cached = _plan_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with path.open("r") as f:
+            plan = MappingPlan.compile(safe_load(f))
+        _plan_cache[path] = (mtime, plan)
+        return plan
+
+
+# =========================================================
+# Label resolver (NO None allowed)
+# =========================================================
+
+def resolve_labels(data: dict, spec: SpecPlan) -> List[str]:
+    for rule in spec.label_rules:
+        if rule.case is None or rule.case(data):
+            return _expand_labels(data, rule.labels)
+
+    return _expand_labels(data, spec.default_labels)
+
+
+def _expand_labels(data: dict, labels: List[str]) -> List[str]:
+    out: List[str] = []
+
+    for l in labels:
+        if isinstance(l, str) and l.startswith("@"):
+            key = l[1:]  # strip the dereference marker
+            # try the bare key first, then the original @-prefixed key
+            v = data.get(key) if key in data else data.get(l)
+            if v is not None:   # 🔥 critical fix
+                out.append(v)
+        else:
+            if l is not None:
+                out.append(l)
+
+    return out
+
+
 # =========================================================
 # Map resolver (STRICT schema projection)
 # =========================================================
 
-def resolve_map(data: dict, spec: Dict[str, str], schema_fields: set) -> Dict[str, Any]:
+def resolve_map(data: dict, spec: SpecPlan) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
 
-    for k, path in (spec or {}).items():
-        v = get_path(data, path)
+    for k, parts in spec.properties:
+        v = _get_parts(data, parts)
         if v is None:
             continue
-        if k in schema_fields:
-            out[k] = v
+        out[k] = v
 
     return out
 
@@ -162,16 +354,10 @@ def apply_schema_defaults(node: dict, schema_fields: set) -> None:
 # Variant resolver
 # =========================================================
 
-def resolve_variant(data: dict, spec: dict) -> dict:
-    variants = spec.get("variants")
-    if not variants:
-        return spec
-
-    for v in variants:
-        if "when" in v and truthy(data, v["when"]):
-            return {**spec, **v}
-        if "default" in v:
-            return {**spec, **v}
+def resolve_variant(data: dict, spec: SpecPlan) -> SpecPlan:
+    for condition, variant in spec.variants:
+        if condition is None or condition(data):
+            return variant
 
     return spec
 
@@ -182,29 +368,23 @@ def resolve_variant(data: dict, spec: dict) -> dict:
 
 def resolve_edges(
     data: dict,
-    spec: dict,
+    spec: SpecPlan,
     node_id: str,
     parent_id: str | None,
 ) -> List[dict]:
     """Build PG-JSON edges from the 'edges' section of a mapping spec."""
-    edge_specs = spec.get("edges")
-    if not edge_specs:
-        return []
-
     edges: List[dict] = []
-    for edge_spec in edge_specs:
-        from_ref = edge_spec["from"]
-        to_ref = edge_spec["to"]
-        label = edge_spec["label"]
-
-        from_id = _resolve_edge_ref(data, from_ref, node_id, parent_id)
-        to_id = _resolve_edge_ref(data, to_ref, node_id, parent_id)
+    for edge_spec in spec.edges:
+        from_id = _resolve_edge_ref(
+            data, edge_spec.from_ref, edge_spec.from_parts, node_id, parent_id)
+        to_id = _resolve_edge_ref(
+            data, edge_spec.to_ref, edge_spec.to_parts, node_id, parent_id)
 
         if from_id and to_id:
             edges.append({
                 "from": from_id,
                 "to": to_id,
-                "labels": [label],
+                "labels": [edge_spec.label],
                 "properties": {},
             })
 
@@ -214,6 +394,7 @@ def resolve_edges(
 def _resolve_edge_ref(
     data: dict,
     ref: str,
+    parts: Tuple[str, ...],
     node_id: str,
     parent_id: str | None,
 ) -> str | None:
@@ -222,46 +403,30 @@ def _resolve_edge_ref(
         return node_id
     if ref == "parent":
         return parent_id
-    return get_path(data, ref)
+    return _get_parts(data, parts)
 
 
 # =========================================================
 # Node builder
 # =========================================================
 
-def _resolve_schema_fields(
-    type_name: str,
-    spec: dict,
-    schema_registry: SchemaRegistry,
-) -> set:
-    """Look up schema fields for *type_name*; fall back to the spec's own map keys."""
-    fields = schema_registry.get(type_name)
-    if fields is not None:
-        return fields
-    return set(spec.get("map", {}).keys())
-
-
 def build_node(
     data: dict,
-    spec: dict,
+    spec: SpecPlan,
     parent_id: str | None,
-    type_name: str,
-    schema_registry: SchemaRegistry,
 ) -> Tuple[List[dict], List[dict]]:
 
-    node_id = get_path(data, spec["id"])
+    node_id = _get_parts(data, spec.id_parts)
     if not node_id:
         return [], []
 
-    if "match" in spec and not truthy(data, spec["match"]):
+    if spec.match is not None and not spec.match(data):
         return [], []
 
-    schema_fields = _resolve_schema_fields(type_name, spec, schema_registry)
-
     node = {
         "id": node_id,
-        "labels": resolve_labels(data, spec.get("labels")),
-        "properties": resolve_map(data, spec.get("map"), schema_fields),
+        "labels": resolve_labels(data, spec),
+        "properties": resolve_map(data, spec),
     }
 
     edges = resolve_edges(data, spec, node_id, parent_id)
@@ -273,56 +438,69 @@ def build_node(
 # Recursive traversal
 # =========================================================
 
-def run_spec(
+# Kind tags for the elements yielded by iter_spec / iter_croissant_pgjson
+NODE = "node"
+EDGE = "edge"
+
+
+def iter_spec(
     data: dict,
-    spec: dict,
-    mapping: dict,
+    spec: SpecPlan,
+    plan: MappingPlan,
     parent_id: str | None,
-    type_name: str,
-    schema_registry: SchemaRegistry,
-) -> Tuple[List[dict], List[dict]]:
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Depth-first generator version of :func:`run_spec`.
 
+    Yields ``(NODE, node)`` for each node followed by ``(EDGE, edge)`` for its
+    edges, then recurses into its children.  Filtering the stream by kind
+    gives exactly the lists returned by :func:`run_spec`.
+    """
     spec = resolve_variant(data, spec)
 
-    # A variant may declare its own type (e.g. Column, Text, PDF).
-    effective_type = spec.get("type", type_name)
-
-    nodes, edges = build_node(data, spec, parent_id,
-                              effective_type, schema_registry)
+    nodes, edges = build_node(data, spec, parent_id)
 
     if not nodes:
-        return [], []
+        return
 
     node_id = nodes[0]["id"]
+    yield NODE, nodes[0]
+    for edge in edges:
+        yield EDGE, edge
 
-    children = spec.get("children", {})
-
-    if not isinstance(children, dict):
+    if spec.children is None:
         raise MappingError(f"Invalid children format in node {node_id}")
 
-    for key, child_type in children.items():
+    for key, child_type in spec.children:
 
-        if child_type not in mapping:
+        if child_type not in plan.specs:
             raise MappingError(
                 f"Unknown child type '{child_type}' in node '{node_id}'. "
-                f"Available: {list(mapping.keys())}"
+                f"Available: {list(plan.specs.keys())}"
             )
 
-        child_spec = mapping[child_type]
+        child_spec = plan.specs[child_type]
         child_data = data.get(key, [])
 
         if isinstance(child_data, list):
             for item in child_data:
-                n, e = run_spec(item, child_spec, mapping,
-                                node_id, child_type, schema_registry)
-                nodes.extend(n)
-                edges.extend(e)
+                yield from iter_spec(item, child_spec, plan, node_id)
 
         elif isinstance(child_data, dict):
-            n, e = run_spec(child_data, child_spec,
-                            mapping, node_id, child_type, schema_registry)
-            nodes.extend(n)
-            edges.extend(e)
+            yield from iter_spec(child_data, child_spec, plan, node_id)
+
+
+def run_spec(
+    data: dict,
+    spec: SpecPlan,
+    plan: MappingPlan,
+    parent_id: str | None,
+) -> Tuple[List[dict], List[dict]]:
+
+    nodes: List[dict] = []
+    edges: List[dict] = []
+    for kind, element in iter_spec(data, spec, plan, parent_id):
+        (nodes if kind == NODE else edges).append(element)
 
     return nodes, edges
 
@@ -378,27 +556,50 @@ def _enrich_field_sources(data: dict) -> None:
                         break
 
 
+def _as_plan(
+    mapping: dict | MappingPlan,
+    schema_registry: SchemaRegistry | None,
+) -> MappingPlan:
+    if isinstance(mapping, MappingPlan):
+        return mapping
+    return MappingPlan.compile(mapping, schema_registry)
+
+
+def iter_croissant_pgjson(
+    data: dict,
+    mapping: dict | MappingPlan,
+    schema_registry: SchemaRegistry | None = None,
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Stream the PG-JSON elements of a Croissant profile as ``(kind, element)``.
+
+    The root node is always yielded first.  Elements are produced lazily, so
+    callers can validate and persist them without materialising the graph.
+    """
+    plan = _as_plan(mapping, schema_registry)
+
+    _enrich_field_sources(data)
+
+    yield from iter_spec(data, plan.root, plan, parent_id=None)
+
+
 def croissant_to_pgjson(
     data: dict,
-    mapping: dict,
+    mapping: dict | MappingPlan,
     schema_registry: SchemaRegistry | None = None,
 ) -> dict:
-    if schema_registry is None:
-        schema_registry = build_schema_registry()
+    """
+    Convert a Croissant profile to a PG-JSON dict.
 
-    _enrich_field_sources(data)
+    *mapping* is either a compiled :class:`MappingPlan` (see
+    :func:`load_mapping_plan`) or a raw mapping document, which is compiled
+    on the fly.
+    """
+    plan = _as_plan(mapping, schema_registry)
 
-    root = next(iter(mapping))
-    root_spec = mapping[root]
+    _enrich_field_sources(data)
 
-    nodes, edges = run_spec(
-        data,
-        root_spec,
-        mapping,
-        parent_id=None,
-        type_name=root,
-        schema_registry=schema_registry,
-    )
+    nodes, edges = run_spec(data, plan.root, plan, parent_id=None)
 
     return {
         "nodes": nodes,
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from typing import Any, List
+
+from moma_management.domain.exceptions import ValidationError
+
+
+def encode_cursor(ordering: List[str], values: List[Any]) -> str:
+    """
+    Return an opaque cursor pointing just after a row of a sorted listing.
+
+    *ordering* describes the sort keys (e.g. ``["name:asc", "id:asc"]``) and
+    *values* holds the row's value for each of them.  The ordering is embedded
+    so that a cursor cannot be replayed against a differently sorted listing.
+    """
+    payload = json.dumps({"o": ordering, "v": values},
+                         separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: List[str]) -> List[Any]:
+    """
+    Return the sort-key values carried by *cursor*.
+
+    Raises:
+        ValidationError: if *cursor* is malformed or was issued for another
+            ordering than *ordering*.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        issued_for = payload["o"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValidationError("Malformed pagination cursor.")
+    if issued_for != ordering or not isinstance(values, list) or len(values) != len(ordering):
+        raise ValidationError(
+            "Pagination cursor does not match the requested ordering.")
+    return values
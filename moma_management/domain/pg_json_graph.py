@@ -42,21 +42,28 @@ class MomaEntity(MoMaGraphModel):
         )
         if root is None:
             return
-        visited: Set[str] = set()
-        stack: list[Tuple[str, str | None]] = [(root, None)]
+        yield from self.walk_from(root, self.adjacency())
 
+    def adjacency(self) -> dict[str, list[str]]:
+        """Return the undirected adjacency lists of the graph, keyed by node id."""
         adj: dict[str, list[str]] = defaultdict(list)
         for edge in self.edges or []:
             adj[str(edge.from_)].append(str(edge.to))
             adj[str(edge.to)].append(str(edge.from_))
+        return adj
 
+    @staticmethod
+    def walk_from(root: str, adjacency: dict[str, list[str]]) -> Iterator[str]:
+        """Yield the node IDs reachable from *root* in *adjacency* (iterative DFS)."""
+        visited: Set[str] = set()
+        stack: list[Tuple[str, str | None]] = [(root, None)]
         while stack:
             node, parent = stack.pop()
             if node in visited:
                 continue
             visited.add(node)
             yield node
-            for neighbor in adj[node]:
+            for neighbor in adjacency.get(node, ()):
                 if neighbor != parent:
                     stack.append((neighbor, node))
 
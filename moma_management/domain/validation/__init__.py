@@ -1,13 +1,19 @@
+from .context import ValidationContext
+from .incremental import IncrementalGraphValidator
 from .schema_error import SchemaError
 from .steps.mapping_step import MappingStep
 from .steps.schema_step import SchemaStep
 from .steps.step import ValidationStep
 from .steps.structure_step import StructureStep
+from .streaming import StreamingGraphValidator
 
 __all__ = [
+    "IncrementalGraphValidator",
     "SchemaError",
     "MappingStep",
     "SchemaStep",
     "StructureStep",
+    "StreamingGraphValidator",
+    "ValidationContext",
     "ValidationStep",
 ]
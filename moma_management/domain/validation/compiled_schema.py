@@ -0,0 +1,338 @@
+"""
+Code-generated acceptance check for the MoMa JSON schema tree.
+
+:class:`CompiledSchema` turns a JSON schema (following ``$ref`` across the
+schema directory) into Python source with one predicate per subschema, and
+executes it once.  The predicates only answer "is this instance valid?": the
+callers fall back to ``jsonschema`` to report the errors of an invalid
+instance, so error output is unaffected.
+
+Conditional branches keyed on the labels of a node (``allOf`` of
+``if: {properties: {labels: {contains: {const: ...}}}}`` entries, as in
+``node.schema.json``) are dispatched per label tuple: the branches that apply
+to a given tuple are computed once and memoised, so a node only runs the
+checks of its own labels.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urldefrag, urljoin
+
+# Keywords without effect on validity.  ``format`` is an annotation unless
+# a format checker is configured, which SchemaStep does not do.  ``$id`` only
+# appears at the top of schema files and equals their path in the schema
+# directory, which is the base URI a document is compiled against.
+_ANNOTATIONS = frozenset({
+    "$schema", "$id", "$defs", "$comment", "title", "description", "default",
+    "examples", "format", "deprecated", "readOnly", "writeOnly",
+})
+
+_TYPE_CHECKS = {
+    "object": "isinstance({x}, dict)",
+    "array": "isinstance({x}, list)",
+    "string": "isinstance({x}, str)",
+    "boolean": "isinstance({x}, bool)",
+    "null": "{x} is None",
+    "number": "(isinstance({x}, (int, float)) and not isinstance({x}, bool))",
+    "integer": "_is_integer({x})",
+}
+
+
+class UnsupportedSchemaError(ValueError):
+    """Raised when a schema uses a keyword the compiler does not handle."""
+
+
+def _is_integer(x: Any) -> bool:
+    if isinstance(x, bool):
+        return False
+    return isinstance(x, int) or (isinstance(x, float) and x.is_integer())
+
+
+def _equal(a: Any, b: Any) -> bool:
+    """JSON equality, as in ``jsonschema``: ``True`` is not ``1``."""
+    if isinstance(a, str) or isinstance(b, str):
+        return a == b
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[k], b[k]) for k in a)
+    return a == b
+
+
+class _LabelDispatch:
+    """Branches of a label-keyed ``allOf``, selected once per label tuple."""
+
+    def __init__(self, prop: str, branches: list[tuple[tuple[str, ...], str]],
+                 namespace: dict[str, Any]) -> None:
+        self._prop = prop
+        # ``then`` predicates are named here and looked up in the namespace
+        # of the generated code, which only exists once it has been executed.
+        self._branches = branches
+        self._namespace = namespace
+        self._by_labels: dict[tuple[str, ...], tuple[Callable, ...]] = {}
+
+    def checks_for(self, x: dict) -> tuple[Callable, ...] | None:
+        """Return the ``then`` checks applying to *x*, or ``None`` if its
+        labels are not a list of strings (the generic path handles it)."""
+        labels = x.get(self._prop)
+        if not isinstance(labels, list):
+            return None
+        key = tuple(labels)
+        checks = self._by_labels.get(key)
+        if checks is None:
+            if not all(isinstance(lbl, str) for lbl in key):
+                return None
+            present = set(key)
+            checks = self._by_labels[key] = tuple(
+                self._namespace[then] for required, then in self._branches
+                if all(lbl in present for lbl in required))
+        return checks
+
+
+class CompiledSchema:
+    """A JSON schema compiled into Python predicates."""
+
+    def __init__(self, schema_path: Path, schema_dir: Path) -> None:
+        self._schema_dir = schema_dir
+        self._documents: dict[str, Any] = {}
+        self._functions: dict[str, str] = {}
+        self._lines: list[str] = []
+        self._namespace: dict[str, Any] = {
+            "_is_integer": _is_integer, "_equal": _equal}
+        self._counter = 0
+
+        root = json.loads(schema_path.read_text())
+        base = schema_path.relative_to(schema_dir).as_posix()
+        self._documents[urldefrag(base)[0]] = root
+        entry = self._compile(root, base)
+
+        #: Generated source, kept for inspection and debugging.
+        self.source = "\n".join(self._lines)
+        exec(compile(self.source, f"<compiled {schema_path.name}>", "exec"),
+             self._namespace)
+        self.is_valid: Callable[[Any], bool] = self._namespace[entry]
+
+    # -- helpers -----------------------------------------------------------
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"_{prefix}{self._counter}"
+
+    def _constant(self, value: Any) -> str:
+        name = self._name("c")
+        self._namespace[name] = value
+        return name
+
+    def _resolve(self, ref: str, base: str) -> tuple[Any, str]:
+        uri, fragment = urldefrag(urljoin(base, ref))
+        if uri not in self._documents:
+            path = self._schema_dir / uri.lstrip("/")
+            self._documents[uri] = json.loads(path.read_text())
+        target = self._documents[uri]
+        for token in filter(None, fragment.split("/")):
+            token = token.replace("~1", "/").replace("~0", "~")
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        return target, uri
+
+    @staticmethod
+    def _label_condition(schema: Any) -> tuple[str, tuple[str, ...]] | None:
+        """Return ``(property, labels)`` if *schema* only requires the array
+        property to contain each of the string labels, else ``None``."""
+        if not isinstance(schema, dict) or set(schema) != {"properties"}:
+            return None
+        props = schema["properties"]
+        if not isinstance(props, dict) or len(props) != 1:
+            return None
+        (prop, cond), = props.items()
+        if not isinstance(cond, dict):
+            return None
+        if "allOf" in cond:
+            if set(cond) != {"allOf"}:
+                return None
+            parts = cond["allOf"]
+        else:
+            parts = [cond]
+        labels = []
+        for part in parts:
+            if (not isinstance(part, dict) or set(part) != {"contains"}
+                    or not isinstance(part["contains"], dict)
+                    or set(part["contains"]) != {"const"}
+                    or not isinstance(part["contains"]["const"], str)):
+                return None
+            labels.append(part["contains"]["const"])
+        return prop, tuple(labels)
+
+    # -- compiler ----------------------------------------------------------
+
+    def _compile(self, schema: Any, base: str) -> str:
+        """Emit a predicate for *schema* and return its function name."""
+        if schema is True or schema == {}:
+            return self._compile_bool(True)
+        if schema is False:
+            return self._compile_bool(False)
+        if not isinstance(schema, dict):
+            raise UnsupportedSchemaError(f"Not a schema: {schema!r}")
+
+        name = self._name("v")
+        body: list[str] = []
+        for keyword, value in schema.items():
+            if keyword in _ANNOTATIONS or keyword in ("then", "else"):
+                continue
+            body += self._keyword(keyword, value, schema, base)
+        self._lines.append(f"def {name}(x):")
+        self._lines += [f"    {line}" for line in body]
+        self._lines.append("    return True\n")
+        return name
+
+    def _compile_bool(self, value: bool) -> str:
+        key = f"<{value}>"
+        if key not in self._functions:
+            name = self._functions[key] = self._name("b")
+            self._lines.append(f"def {name}(x):\n    return {value}\n")
+        return self._functions[key]
+
+    def _compile_ref(self, ref: str, base: str) -> str:
+        target, target_base = self._resolve(ref, base)
+        key = urljoin(base, ref)
+        if key not in self._functions:
+            # Registered before compiling so that recursive refs terminate.
+            name = self._functions[key] = self._name("r")
+            inner = self._compile(target, target_base)
+            self._lines.append(f"def {name}(x):\n    return {inner}(x)\n")
+        return self._functions[key]
+
+    def _keyword(self, keyword: str, value: Any, schema: dict, base: str) -> list[str]:
+        if keyword == "type":
+            types = value if isinstance(value, list) else [value]
+            if any(t not in _TYPE_CHECKS for t in types):
+                raise UnsupportedSchemaError(f"type {value!r}")
+            cond = " or ".join(_TYPE_CHECKS[t].format(x="x") for t in types)
+            return [f"if not ({cond}): return False"]
+
+        if keyword == "properties":
+            lines = ["if isinstance(x, dict):"]
+            for prop, sub in value.items():
+                fn = self._compile(sub, base)
+                lines.append(f"    if {prop!r} in x and not {fn}(x[{prop!r}]): return False")
+            return lines
+
+        if keyword == "required":
+            req = self._constant(tuple(value))
+            return [f"if isinstance(x, dict) and not all(k in x for k in {req}): return False"]
+
+        if keyword == "additionalProperties":
+            if value is True:
+                return []
+            if "patternProperties" in schema:
+                raise UnsupportedSchemaError("additionalProperties with patternProperties")
+            known = self._constant(frozenset(schema.get("properties", {})))
+            fn = self._compile(value, base)
+            return ["if isinstance(x, dict):",
+                    f"    for k, v in x.items():",
+                    f"        if k not in {known} and not {fn}(v): return False"]
+
+        if keyword == "unevaluatedProperties":
+            if value is True:
+                return []
+            raise UnsupportedSchemaError("unevaluatedProperties other than true")
+
+        if keyword == "propertyNames":
+            fn = self._compile(value, base)
+            return ["if isinstance(x, dict):",
+                    f"    for k in x:",
+                    f"        if not {fn}(k): return False"]
+
+        if keyword == "items":
+            if not isinstance(value, (dict, bool)):
+                raise UnsupportedSchemaError("array form of items")
+            fn = self._compile(value, base)
+            return ["if isinstance(x, list):",
+                    f"    for v in x:",
+                    f"        if not {fn}(v): return False"]
+
+        if keyword == "contains":
+            if "minContains" in schema or "maxContains" in schema:
+                raise UnsupportedSchemaError("minContains/maxContains")
+            fn = self._compile(value, base)
+            return [f"if isinstance(x, list) and not any({fn}(v) for v in x): return False"]
+
+        if keyword in ("maxItems", "minItems"):
+            op = ">" if keyword == "maxItems" else "<"
+            return [f"if isinstance(x, list) and len(x) {op} {int(value)}: return False"]
+
+        if keyword == "pattern":
+            pattern = self._constant(re.compile(value))
+            return [f"if isinstance(x, str) and not {pattern}.search(x): return False"]
+
+        if keyword == "enum":
+            if all(isinstance(v, str) for v in value):
+                options = self._constant(frozenset(value))
+                return [f"if not (isinstance(x, str) and x in {options}): return False"]
+            options = self._constant(list(value))
+            return [f"if not any(_equal(x, v) for v in {options}): return False"]
+
+        if keyword == "const":
+            const = self._constant(value)
+            return [f"if not _equal(x, {const}): return False"]
+
+        if keyword == "$ref":
+            fn = self._compile_ref(value, base)
+            return [f"if not {fn}(x): return False"]
+
+        if keyword == "allOf":
+            return self._all_of(value, base)
+
+        if keyword == "anyOf":
+            fns = [self._compile(sub, base) for sub in value]
+            return [f"if not ({' or '.join(f'{fn}(x)' for fn in fns)}): return False"]
+
+        if keyword == "oneOf":
+            fns = [self._compile(sub, base) for sub in value]
+            checks = ", ".join(f"{fn}(x)" for fn in fns)
+            return [f"if sum(({checks},)) != 1: return False"]
+
+        if keyword == "not":
+            fn = self._compile(value, base)
+            return [f"if {fn}(x): return False"]
+
+        if keyword == "if":
+            cond = self._compile(value, base)
+            then = self._compile(schema.get("then", True), base)
+            otherwise = self._compile(schema.get("else", True), base)
+            return [f"if not ({then}(x) if {cond}(x) else {otherwise}(x)): return False"]
+
+        raise UnsupportedSchemaError(f"keyword {keyword!r}")
+
+    def _all_of(self, subschemas: list, base: str) -> list[str]:
+        fns = [self._compile(sub, base) for sub in subschemas]
+        generic = [f"if not {fn}(x): return False" for fn in fns]
+
+        # Label-keyed conditionals: dispatch on the label tuple instead of
+        # evaluating every ``if`` in turn.
+        conditions = [
+            self._label_condition(sub.get("if"))
+            if isinstance(sub, dict) and set(sub) == {"if", "then"} else None
+            for sub in subschemas
+        ]
+        props = {c[0] for c in conditions if c is not None}
+        if len(subschemas) < 2 or None in conditions or len(props) != 1:
+            return generic
+
+        prop = props.pop()
+        dispatch = self._constant(_LabelDispatch(prop, [
+            (labels, self._compile(sub["then"], base))
+            for (_, labels), sub in zip(conditions, subschemas)
+        ], self._namespace))
+        checks = self._name("d")
+        return [
+            f"{checks} = {dispatch}.checks_for(x) if isinstance(x, dict) else None",
+            f"if {checks} is not None:",
+            f"    for check in {checks}:",
+            f"        if not check(x): return False",
+            f"else:",
+            *[f"    {line}" for line in generic],
+        ]
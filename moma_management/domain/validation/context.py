@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from moma_management.domain.pg_json_graph import MomaEntity
+
+
+class ValidationContext:
+    """
+    Derived forms of a graph shared by the steps of one validation run.
+
+    The first step of a chain creates the context and passes it down, so the
+    JSON form, the node-id index and the adjacency lists are each built at
+    most once per validation instead of once per step.
+    """
+
+    def __init__(self, data: MomaEntity) -> None:
+        self.data = data
+
+    @cached_property
+    def raw(self) -> dict:
+        """The graph serialised as PG-JSON (UUIDs as strings, aliased keys)."""
+        return self.data.model_dump(by_alias=True, mode="json")
+
+    @cached_property
+    def raw_node_by_id(self) -> dict[str, dict]:
+        """The nodes of :attr:`raw`, keyed by id."""
+        raw_nodes = self.raw.get("nodes")
+        nodes = raw_nodes if isinstance(raw_nodes, list) else []
+        return {str(n.get("id", "")): n for n in nodes}
+
+    @cached_property
+    def adjacency(self) -> dict[str, list[str]]:
+        """Undirected adjacency lists of the graph, keyed by node id."""
+        return self.data.adjacency()
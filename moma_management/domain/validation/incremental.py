@@ -0,0 +1,122 @@
+from typing import TYPE_CHECKING, Iterable, List
+
+from moma_management.domain.generated.edges.edge_schema import Edge
+from moma_management.domain.generated.nodes.node_schema import Node
+
+from .schema_error import SchemaError
+from .steps.schema_step import SchemaStep
+from .steps.structure_step import StructureStep
+
+if TYPE_CHECKING:
+    from moma_management.domain.pg_json_graph import MomaEntity
+
+
+class IncrementalGraphValidator:
+    """
+    Validate a patch of a PG-JSON graph that is already known to be valid.
+
+    Instead of re-validating the whole graph, :meth:`validate` checks only
+    what the patch can break:
+
+    * the graph schema, on the patched nodes and edges;
+    * edge constraints, on the patched edges and on the stored edges of
+      nodes whose labels change;
+    * the structural rules of the graph type (root, connectivity), only if
+      the patch adds edges or nodes or changes labels.
+
+    Reported paths index the patched graph: stored elements keep their
+    position in *base*, new ones follow the stored ones in patch order.
+    """
+
+    def __init__(self, base: "MomaEntity") -> None:
+        self._base = base
+        self._schema_step = SchemaStep()
+
+    def validate(self, nodes: Iterable[dict] = (), edges: Iterable[dict] = ()) -> List[SchemaError]:
+        """
+        Validate the raw *nodes* and *edges* of a patch against the base graph.
+
+        A patched node whose id is in the base graph is merged onto the stored
+        node, as property updates are: its properties are added to the stored
+        ones and its labels, if any, replace the stored labels.  Other nodes
+        and all *edges* are added to the graph.
+        """
+        base_nodes = list(self._base.nodes)
+        base_edges = list(self._base.edges or [])
+        node_index = {str(n.id): i for i, n in enumerate(base_nodes)}
+        merged_nodes: List[Node] = list(base_nodes)
+        errors: List[SchemaError] = []
+
+        relabelled: set[str] = set()
+        added_nodes = False
+        for raw in nodes:
+            node_id = str(raw.get("id", ""))
+            index = node_index.get(node_id)
+            if index is None:
+                index = node_index[node_id] = len(merged_nodes)
+                merged_nodes.append(None)
+                added_nodes = True
+                full = raw
+            else:
+                full = self._merge(merged_nodes[index], raw)
+                if full["labels"] != list(merged_nodes[index].labels or []):
+                    relabelled.add(node_id)
+            errors += self._schema_step.validate_element("nodes", index, full)
+            merged_nodes[index] = Node.model_construct(
+                id=node_id, labels=list(full.get("labels") or []), properties={})
+
+        added_edges = list(edges)
+        edge_indices: List[int] = []
+        checked_edges: List[dict] = []
+        for i, edge in enumerate(base_edges):
+            if str(edge.from_) in relabelled or str(edge.to) in relabelled:
+                edge_indices.append(i)
+                checked_edges.append(edge.model_dump(by_alias=True, mode="json"))
+        for offset, raw in enumerate(added_edges):
+            index = len(base_edges) + offset
+            errors += self._schema_step.validate_element("edges", index, raw)
+            edge_indices.append(index)
+            checked_edges.append(raw)
+
+        if checked_edges:
+            node_by_id = {str(n.id): {"labels": n.labels or []} for n in merged_nodes}
+            constraint_errors = SchemaStep.validate_edge_constraints(
+                {"edges": checked_edges}, node_by_id=node_by_id)
+            errors += self._reindex_edges(constraint_errors, edge_indices)
+
+        entity_type = type(self._base)
+        if entity_type._root_label and (added_edges or added_nodes or relabelled):
+            graph = entity_type.model_construct(
+                nodes=merged_nodes,
+                edges=base_edges + [
+                    Edge.model_construct(
+                        from_=str(e.get("from", "")), to=str(e.get("to", "")),
+                        labels=list(e.get("labels") or []))
+                    for e in added_edges
+                ],
+            )
+            errors += StructureStep()._validate_structure(
+                graph, entity_type._root_label, entity_type.__name__)
+        return errors
+
+    @staticmethod
+    def _merge(stored: Node, patch: dict) -> dict:
+        """Return the raw form of *stored* with *patch* applied."""
+        full = stored.model_dump(by_alias=True, mode="json")
+        full["properties"] = {**(full.get("properties") or {}),
+                              **(patch.get("properties") or {})}
+        if patch.get("labels"):
+            full["labels"] = list(patch["labels"])
+        return full
+
+    @staticmethod
+    def _reindex_edges(errors: List[SchemaError], indices: List[int]) -> List[SchemaError]:
+        """Point edge errors reported against a sublist of edges at *indices*."""
+        for err in errors:
+            local = err.params.get("edgeIndex")
+            if local is None:
+                continue
+            err.params["edgeIndex"] = indices[local]
+            err.instancePath = err.instancePath.replace(
+                f"/edges/{local}", f"/edges/{indices[local]}", 1)
+        return errors
@@ -1,13 +1,15 @@
 from moma_management.domain.pg_json_graph import MomaEntity
 
+from ..context import ValidationContext
 from ..schema_error import SchemaError
 from .step import ValidationStep
 
 
 class MappingStep(ValidationStep):
-    def handle(self, data: MomaEntity) -> list[SchemaError]:
-        raw = data.model_dump(by_alias=True, mode="json")
-        return _validate_mappings(raw) + self._chain(data)
+    def handle(self, data: MomaEntity, context: ValidationContext | None = None) -> list[SchemaError]:
+        context = context or ValidationContext(data)
+        errors = _validate_mappings(context.raw, node_by_id=context.raw_node_by_id)
+        return errors + self._chain(data, context)
 
 
 def _extract_bracket_value(expr: str, prefix: str) -> str | None:
@@ -53,7 +55,7 @@ def _resolve_param_type(param: dict, nested: list[str]) -> str | None:
     return current.get("type")
 
 
-def _validate_mappings(data: dict) -> list[SchemaError]:
+def _validate_mappings(data: dict, node_by_id: dict[str, dict] | None = None) -> list[SchemaError]:
     """Validate ``mapping`` dicts on AP edges.
 
     For every key/value pair in an edge's ``mapping``:
@@ -76,10 +78,11 @@ def _validate_mappings(data: dict) -> list[SchemaError]:
     ``["ResultType", "string"]`` node).
     """
     errors: list[SchemaError] = []
-    nodes: list[dict] = data.get("nodes") or []
     edges: list[dict] = data.get("edges") or []
 
-    node_by_id: dict[str, dict] = {str(n.get("id", "")): n for n in nodes}
+    if node_by_id is None:
+        nodes: list[dict] = data.get("nodes") or []
+        node_by_id = {str(n.get("id", "")): n for n in nodes}
 
     for i, edge in enumerate(edges):
         props = edge.get("properties") or {}
@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from json import loads
 from pathlib import Path
 from typing import TYPE_CHECKING, List
@@ -8,7 +10,14 @@ from referencing import Registry, Resource
 if TYPE_CHECKING:
     from moma_management.domain.pg_json_graph import MomaEntity
 
-from ... import EDGE_CONSTRAINTS_PATH, SCHEMA_DIR
+from ... import (
+    EDGE_CONSTRAINTS_PATH,
+    SCHEMA_DIR,
+    VALIDATION_PARALLEL_THRESHOLD,
+    VALIDATION_PARALLEL_WORKERS,
+)
+from ..compiled_schema import CompiledSchema, UnsupportedSchemaError
+from ..context import ValidationContext
 from ..schema_error import SchemaError
 from .step import ValidationStep
 
@@ -25,10 +34,29 @@ class SchemaStep(ValidationStep):
 
     # Cached label-ancestry map, built once from the dataset node schemas
     _label_ancestors_cache: dict[str, frozenset[str]] | None = None
-    _edge_constraints_cache: list[dict] | None = None
+    # Compiled edge constraints, keyed by constraints file path
+    _edge_constraint_index_cache: dict[str, "_EdgeConstraintIndex"] = {}
 
     _validator_cache: dict[str, "Draft202012Validator"] = {}
 
+    # Whether to accept valid graphs with the compiled schema, running
+    # jsonschema only to report the errors of graphs it rejects
+    fast_path: bool = True
+    # Compiled schemas keyed by schema path; None if the schema cannot be compiled
+    _compiled_cache: dict[str, CompiledSchema | None] = {}
+
+    # Graphs with at least this many nodes and edges that fail the compiled
+    # check have their errors collected in parallel shards (0 disables it)
+    parallel_threshold: int = VALIDATION_PARALLEL_THRESHOLD
+    # Worker processes used for sharded validation (None: one per CPU, at most
+    # _MAX_DEFAULT_WORKERS)
+    parallel_workers: int | None = VALIDATION_PARALLEL_WORKERS
+    _MAX_DEFAULT_WORKERS = 4
+    # Nodes or edges per shard
+    parallel_chunk_size: int = 5_000
+    # Process pool for sharded validation, created on first use
+    _pool: ProcessPoolExecutor | None = None
+
     def __init__(self, schema_name: str = "moma.schema.json") -> None:
         super().__init__()
         self._schema = self._schema_dir / schema_name
@@ -36,20 +64,121 @@ class SchemaStep(ValidationStep):
             raise ValueError(f"Schema file not found: {self._schema}")
 
         self._registry = Registry(retrieve=self._fetch_schema)
+        if self.fast_path:
+            self._compiled()
+
+    def handle(self, data: MomaEntity, context: ValidationContext | None = None) -> List[SchemaError]:
+        context = context or ValidationContext(data)
+        # The JSON form serialises UUIDs → strings, which the JSON schema expects.
+        raw = context.raw
+        errors = self._schema_errors(raw)
+        errors += self.validate_edge_constraints(
+            raw, node_by_id=context.raw_node_by_id)
+        return errors + self._chain(data, context)
+
+    def validate_element(self, collection: str, index: int, raw: dict) -> List[SchemaError]:
+        """Validate a single raw node or edge against the graph schema.
+
+        The element is checked as the only member of *collection*
+        (``"nodes"`` or ``"edges"``), and reported paths are rewritten to
+        point at *index*, so that a graph can be validated element by element
+        without materialising it.  Edge constraints are not checked here.
+        """
+        doc = {"nodes": [], collection: [raw]}
+        errors = self._schema_errors(doc)
+        for err in errors:
+            err.instancePath = err.instancePath.replace(
+                f"/{collection}/0", f"/{collection}/{index}", 1)
+        return errors
+
+    def _schema_errors(self, raw: dict) -> List[SchemaError]:
+        """Return the JSON schema errors of *raw*.
+
+        The compiled schema answers for valid documents; jsonschema only runs
+        on the documents it rejects, so reported errors are unchanged.
+        """
+        compiled = self._compiled() if self.fast_path else None
+        if compiled is not None and compiled.is_valid(raw):
+            return []
+        shards = self._shards(raw)
+        if shards:
+            return self._sharded_schema_errors(shards)
+        return [self._wrap_to_ajv(e) for e in self._validator().iter_errors(raw)]
+
+    def _shards(self, raw: dict) -> List[tuple[str, int, list]]:
+        """Split the nodes and edges of a large graph into shards.
+
+        Returns ``(collection, offset, elements)`` tuples, or an empty list
+        if *raw* is below :attr:`parallel_threshold` or not a graph whose
+        nodes and edges are lists.  The graph schema only constrains those
+        lists item by item, so the errors of the shards, in order, are the
+        errors of the whole graph.
+        """
+        if not self.parallel_threshold or not isinstance(raw, dict):
+            return []
+        nodes, edges = raw.get("nodes"), raw.get("edges", [])
+        if not isinstance(nodes, list) or not isinstance(edges, list):
+            return []
+        if len(nodes) + len(edges) < self.parallel_threshold:
+            return []
+        size = self.parallel_chunk_size
+        return [
+            (collection, offset, items[offset:offset + size])
+            for collection, items in (("nodes", nodes), ("edges", edges))
+            for offset in range(0, len(items), size)
+        ]
+
+    def _sharded_schema_errors(self, shards: List[tuple[str, int, list]]) -> List[SchemaError]:
+        schema_name = self._schema.relative_to(self._schema_dir).as_posix()
+        pool = self._executor()
+        futures = [
+            pool.submit(_validate_shard, type(self), schema_name, collection, offset, items)
+            for collection, offset, items in shards
+        ]
+        return [err for future in futures for err in future.result()]
+
+    @classmethod
+    def _executor(cls) -> ProcessPoolExecutor:
+        if SchemaStep._pool is None:
+            workers = cls.parallel_workers or min(
+                os.process_cpu_count() or 1, cls._MAX_DEFAULT_WORKERS)
+            SchemaStep._pool = ProcessPoolExecutor(max_workers=workers)
+        return SchemaStep._pool
+
+    @classmethod
+    def disable_sharding(cls) -> None:
+        """Keep every graph on the inline path in this process.
+
+        Used as the initializer of worker processes that validate graphs, so
+        that each of them does not start a sharding pool of its own.
+        """
+        SchemaStep.parallel_threshold = 0
+
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        """Stop the sharded validation pool, if it was started."""
+        if SchemaStep._pool is not None:
+            SchemaStep._pool.shutdown(wait=False, cancel_futures=True)
+            SchemaStep._pool = None
+
+    def _compiled(self) -> CompiledSchema | None:
+        key = str(self._schema)
+        if key not in SchemaStep._compiled_cache:
+            try:
+                compiled = CompiledSchema(self._schema, self._schema_dir)
+            except UnsupportedSchemaError:
+                compiled = None
+            SchemaStep._compiled_cache[key] = compiled
+        return SchemaStep._compiled_cache[key]
 
-    def handle(self, data: MomaEntity) -> List[SchemaError]:
-        # mode="json" serialises UUIDs → strings, which the JSON schema expects.
-        raw = data.model_dump(by_alias=True, mode="json")
+    def _validator(self) -> Draft202012Validator:
         key = str(self._schema)
         if key not in SchemaStep._validator_cache:
             schema = loads(self._schema.read_text())
             SchemaStep._validator_cache[key] = Draft202012Validator(
                 schema, registry=self._registry
             )
-        validator = SchemaStep._validator_cache[key]
-        errors = [self._wrap_to_ajv(e) for e in validator.iter_errors(raw)]
-        errors += self.validate_edge_constraints(raw)
-        return errors + self._chain(data)
+        return SchemaStep._validator_cache[key]
 
     @staticmethod
     def _wrap_to_ajv(err: ValidationError) -> SchemaError:
@@ -72,38 +201,29 @@ class SchemaStep(ValidationStep):
         cls,
         data: dict,
         constraints_path: Path = EDGE_CONSTRAINTS_PATH,
+        node_by_id: dict[str, dict] | None = None,
     ) -> list[SchemaError]:
         """Check that every edge satisfies the declared constraints.
 
         Node labels are expanded with schema-derived ancestors before matching
         so that e.g. ``"RelationalDatabase"`` also satisfies a constraint
-        requiring ``"Data"``.
+        requiring ``"Data"``.  Edges are checked against an
+        :class:`_EdgeConstraintIndex` compiled once per constraints file.
+        *node_by_id* may pass an existing id index of ``data["nodes"]``.
         """
-        if SchemaStep._edge_constraints_cache is None:
-            SchemaStep._edge_constraints_cache = loads(constraints_path.read_text())
-        constraints: list[dict] = SchemaStep._edge_constraints_cache
-        if not constraints:
+        index = cls._edge_constraint_index(constraints_path)
+        if not index.has_constraints:
             return []
 
-        raw_nodes = data.get("nodes")
         raw_edges = data.get("edges")
-        nodes = raw_nodes if isinstance(raw_nodes, list) else []
         edges = raw_edges if isinstance(raw_edges, list) else []
 
-        if SchemaStep._label_ancestors_cache is None:
-            SchemaStep._label_ancestors_cache = SchemaStep._build_label_ancestors(
-                SCHEMA_DIR / "nodes" / "dataset"
-            )
-        ancestors = SchemaStep._label_ancestors_cache
-
-        def _expand(labels: list[str]) -> set[str]:
-            expanded = set(labels)
-            for lbl in labels:
-                expanded |= ancestors.get(lbl, frozenset())
-            return expanded
-
+        if node_by_id is None:
+            raw_nodes = data.get("nodes")
+            nodes = raw_nodes if isinstance(raw_nodes, list) else []
+            node_by_id = {str(n.get("id", "")): n for n in nodes}
         node_labels: dict[str, list[str]] = {
-            str(n.get("id", "")): n.get("labels", []) for n in nodes
+            node_id: n.get("labels", []) for node_id, n in node_by_id.items()
         }
 
         errors: list[SchemaError] = []
@@ -135,28 +255,9 @@ class SchemaStep(ValidationStep):
                 ))
                 continue
 
-            expanded_from = _expand(from_labels)
-            expanded_to = _expand(to_labels)
-
-            allowed = any(
-                c["label"] == edge_label
-                and c["fromLabel"] in expanded_from
-                and c["toLabel"] in expanded_to
-                for c in constraints
-            )
-
-            if not allowed:
-                allowed_labels = [
-                    c["label"] for c in constraints
-                    if c["fromLabel"] in expanded_from
-                    and c["toLabel"] in expanded_to
-                ]
-                allowed_msg = (
-                    f"Allowed relationships between these nodes: "
-                    f"{', '.join(allowed_labels)}"
-                    if allowed_labels
-                    else "No valid relationships allowed between these node types"
-                )
+            allowed_msg = index.rejection(
+                edge_label, tuple(from_labels), tuple(to_labels))
+            if allowed_msg is not None:
                 errors.append(SchemaError(
                     keyword="edgeRelationship",
                     instancePath=f"/edges/{i}/labels",
@@ -176,6 +277,20 @@ class SchemaStep(ValidationStep):
 
         return errors
 
+    @classmethod
+    def _edge_constraint_index(cls, constraints_path: Path) -> "_EdgeConstraintIndex":
+        key = str(constraints_path)
+        if key not in SchemaStep._edge_constraint_index_cache:
+            if SchemaStep._label_ancestors_cache is None:
+                SchemaStep._label_ancestors_cache = SchemaStep._build_label_ancestors(
+                    SCHEMA_DIR / "nodes" / "dataset"
+                )
+            SchemaStep._edge_constraint_index_cache[key] = _EdgeConstraintIndex(
+                loads(constraints_path.read_text()),
+                SchemaStep._label_ancestors_cache,
+            )
+        return SchemaStep._edge_constraint_index_cache[key]
+
     @classmethod
     def _build_label_ancestors(cls, dataset_schema_dir: Path) -> dict[str, frozenset[str]]:
         """Walk all JSON schema files in *dataset_schema_dir*, follow ``allOf.$ref``
@@ -231,3 +346,93 @@ class SchemaStep(ValidationStep):
             _get(label, frozenset())
 
         return ancestors
+
+
+def _validate_shard(
+    step_type: type[SchemaStep],
+    schema_name: str,
+    collection: str,
+    offset: int,
+    elements: list,
+) -> List[SchemaError]:
+    """Validate a shard of a graph in a worker process.
+
+    *elements* are the members of *collection* from *offset* on; reported
+    paths are shifted to their index in the whole graph.
+    """
+    step = step_type(schema_name)
+    doc = {"nodes": [], collection: elements}
+    compiled = step._compiled() if step.fast_path else None
+    if compiled is not None and compiled.is_valid(doc):
+        return []
+    errors = [step._wrap_to_ajv(e) for e in step._validator().iter_errors(doc)]
+    for err in errors:
+        parts = err.instancePath.split("/", 3)
+        parts[2] = str(offset + int(parts[2]))
+        err.instancePath = "/".join(parts)
+    return errors
+
+
+class _EdgeConstraintIndex:
+    """
+    Edge constraints compiled for repeated lookups.
+
+    Constraints are indexed by ``(label, fromLabel, toLabel)``.  Graphs reuse
+    a handful of label combinations across thousands of edges, so the
+    ancestor-expanded label set of each distinct label tuple, and the verdict
+    (with its error details) of each distinct edge/endpoint-labels
+    combination, are computed once and memoised.
+    """
+
+    def __init__(self, constraints: list[dict], ancestors: dict[str, frozenset[str]]) -> None:
+        self._constraints = [
+            (c["label"], c["fromLabel"], c["toLabel"]) for c in constraints]
+        self._allowed = frozenset(self._constraints)
+        self._ancestors = ancestors
+        self._expanded: dict[tuple[str, ...], frozenset[str]] = {}
+        self._verdicts: dict[tuple, str | None] = {}
+
+    @property
+    def has_constraints(self) -> bool:
+        return bool(self._constraints)
+
+    def expand(self, labels: tuple[str, ...]) -> frozenset[str]:
+        """Return *labels* together with all their ancestor labels."""
+        expanded = self._expanded.get(labels)
+        if expanded is None:
+            acc = set(labels)
+            for lbl in labels:
+                acc |= self._ancestors.get(lbl, frozenset())
+            expanded = self._expanded[labels] = frozenset(acc)
+        return expanded
+
+    def rejection(
+        self, edge_label: str, from_labels: tuple[str, ...], to_labels: tuple[str, ...]
+    ) -> str | None:
+        """
+        Return ``None`` if an *edge_label* edge may link nodes labelled
+        *from_labels* and *to_labels*, else the description of the
+        relationships allowed between them.
+        """
+        key = (edge_label, from_labels, to_labels)
+        if key in self._verdicts:
+            return self._verdicts[key]
+
+        expanded_from = self.expand(from_labels)
+        expanded_to = self.expand(to_labels)
+        if any((edge_label, f, t) in self._allowed
+               for f in expanded_from for t in expanded_to):
+            verdict = None
+        else:
+            allowed_labels = [
+                label for label, f, t in self._constraints
+                if f in expanded_from and t in expanded_to
+            ]
+            verdict = (
+                f"Allowed relationships between these nodes: "
+                f"{', '.join(allowed_labels)}"
+                if allowed_labels
+                else "No valid relationships allowed between these node types"
+            )
+        self._verdicts[key] = verdict
+        return verdict
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING, List, Self
 if TYPE_CHECKING:
     from moma_management.domain.pg_json_graph import MomaEntity
 
+from ..context import ValidationContext
 from ..schema_error import SchemaError
 
 
@@ -30,7 +31,16 @@ class ValidationStep(ABC):
         return self
 
     @abstractmethod
-    def handle(self, data: MomaEntity) -> List[SchemaError]: ...
-
-    def _chain(self, data: MomaEntity) -> List[SchemaError]:
-        return self._next.handle(data) if self._next is not None else []
+    def handle(
+        self, data: MomaEntity, context: ValidationContext | None = None
+    ) -> List[SchemaError]:
+        """
+        Validate *data* and run the rest of the chain.
+
+        *context* is shared by all the steps of one run; the step called
+        first creates it.
+        """
+        ...
+
+    def _chain(self, data: MomaEntity, context: ValidationContext) -> List[SchemaError]:
+        return self._next.handle(data, context) if self._next is not None else []
@@ -1,6 +1,7 @@
 from typing import List, Self
 
 from moma_management.domain.pg_json_graph import MomaEntity
+from moma_management.domain.validation.context import ValidationContext
 from moma_management.domain.validation.schema_error import SchemaError
 
 from .step import ValidationStep
@@ -18,21 +19,27 @@ class StructureStep(ValidationStep):
     def __init__(self) -> None:
         super().__init__()
 
-    def handle(self, data: MomaEntity) -> List[SchemaError]:
+    def handle(self, data: MomaEntity, context: ValidationContext | None = None) -> List[SchemaError]:
+        context = context or ValidationContext(data)
         errors = self._validate_structure(
             data,
             data._root_label,
             type(data).__name__,
+            adjacency=context.adjacency,
         )
-        return errors + self._chain(data)
+        return errors + self._chain(data, context)
 
     def _validate_structure(
         self: Self,
         data: MomaEntity,
         root_label: str,
         graph_type: str,
+        adjacency: dict[str, list[str]] | None = None,
     ) -> List[SchemaError]:
-        """Check root-node and connectivity rules for a graph type."""
+        """Check root-node and connectivity rules for a graph type.
+
+        *adjacency* may pass the already built adjacency lists of *data*.
+        """
         errors: List[SchemaError] = []
         nodes = data.nodes
         edges = data.edges or []
@@ -92,7 +99,8 @@ class StructureStep(ValidationStep):
 
         # All nodes must be reachable from root (undirected)
         all_ids = {str(n.id) for n in nodes}
-        reachable = set(data)
+        reachable = set(data.walk_from(
+            root_id, adjacency if adjacency is not None else data.adjacency()))
 
         if reachable - all_ids:
             extra = ", ".join(sorted(reachable - all_ids))
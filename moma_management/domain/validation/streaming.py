@@ -0,0 +1,107 @@
+from typing import TYPE_CHECKING, List, Type
+
+from pydantic import ValidationError as PydanticValidationError
+
+from moma_management.domain.generated.edges.edge_schema import Edge
+from moma_management.domain.generated.nodes.node_schema import Node
+
+from .schema_error import SchemaError
+from .steps.schema_step import SchemaStep
+from .steps.structure_step import StructureStep
+
+if TYPE_CHECKING:
+    from moma_management.domain.pg_json_graph import MomaEntity
+
+
+class StreamingGraphValidator:
+    """
+    Validate a PG-JSON graph one element at a time.
+
+    Each node and edge is checked against the graph schema as it arrives
+    (:meth:`add_node`, :meth:`add_edge`).  Only a skeleton of ids, labels and
+    edge endpoints is retained, from which :meth:`finish` runs the checks
+    that need the whole graph: edge constraints and the structural rules of
+    *entity_type* (single root, no incoming root edges, connectivity).
+
+    Together these cover the same rules as ``SchemaStep() & StructureStep()``.
+    """
+
+    def __init__(self, entity_type: Type["MomaEntity"]) -> None:
+        self._entity_type = entity_type
+        self._schema_step = SchemaStep()
+        self._nodes: List[dict] = []
+        self._edges: List[dict] = []
+
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    def add_node(self, raw: dict) -> tuple[Node | None, List[SchemaError]]:
+        """Validate *raw* and return the parsed :class:`Node` (or ``None``) with its errors."""
+        index = len(self._nodes)
+        errors = self._schema_step.validate_element("nodes", index, raw)
+        self._nodes.append(
+            {"id": str(raw.get("id", "")), "labels": list(raw.get("labels") or [])})
+        if errors:
+            return None, errors
+        try:
+            return Node.model_validate(raw), []
+        except PydanticValidationError as e:
+            return None, self._wrap_pydantic("nodes", index, e)
+
+    def add_edge(self, raw: dict) -> tuple[Edge | None, List[SchemaError]]:
+        """Validate *raw* and return the parsed :class:`Edge` (or ``None``) with its errors."""
+        index = len(self._edges)
+        errors = self._schema_step.validate_element("edges", index, raw)
+        self._edges.append({
+            "from": str(raw.get("from", "")),
+            "to": str(raw.get("to", "")),
+            "labels": list(raw.get("labels") or []),
+        })
+        if errors:
+            return None, errors
+        try:
+            return Edge.model_validate(raw), []
+        except PydanticValidationError as e:
+            return None, self._wrap_pydantic("edges", index, e)
+
+    def finish(self) -> List[SchemaError]:
+        """Run the whole-graph checks on the retained skeleton."""
+        skeleton = {"nodes": self._nodes, "edges": self._edges}
+        errors = SchemaStep.validate_edge_constraints(skeleton)
+
+        graph = self._entity_type.model_construct(
+            nodes=[
+                Node.model_construct(id=n["id"], labels=n["labels"], properties={})
+                for n in self._nodes
+            ],
+            edges=[
+                Edge.model_construct(
+                    from_=e["from"], to=e["to"], labels=e["labels"])
+                for e in self._edges
+            ],
+        )
+        errors += StructureStep()._validate_structure(
+            graph,
+            self._entity_type._root_label,
+            self._entity_type.__name__,
+        )
+        return errors
+
+    @staticmethod
+    def _wrap_pydantic(collection: str, index: int, e: PydanticValidationError) -> List[SchemaError]:
+        return [
+            SchemaError(
+                keyword=err["type"],
+                instancePath=f"/{collection}/{index}/" + "/".join(
+                    str(x) for x in (err.get("loc") or [])),
+                schemaPath="#",
+                params={},
+                message=err["msg"],
+            )
+            for err in e.errors()
+        ]
@@ -17,6 +17,7 @@ from moma_management.domain.exceptions import (
     ConversionError,
     MomaError,
     NotFoundError,
+    OverloadedError,
     RepositoryError,
     ValidationError,
 )
@@ -89,6 +90,11 @@ async def validation_error_handler(request: Request, exc: ValidationError) -> JS
     return JSONResponse(status_code=422, content={"detail": exc.message})
 
 
+@app.exception_handler(OverloadedError)
+async def overloaded_error_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": exc.message}, headers={"Retry-After": "1"})
+
+
 @app.exception_handler(RepositoryError)
 async def repository_error_handler(request: Request, exc: RepositoryError) -> JSONResponse:
     logger.exception("Repository data integrity error")
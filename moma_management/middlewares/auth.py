@@ -8,8 +8,6 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
 
 from moma_management.domain.analytical_pattern import AnalyticalPattern
-from moma_management.domain.filters import DatasetFilter, DatasetProperty
-from moma_management.domain.generated.edges.edge_schema import EdgeLabel
 from moma_management.services.analytical_pattern import AnalyticalPatternService
 from moma_management.services.authentication import Authentication
 from moma_management.services.authorization import (
@@ -27,7 +25,7 @@ logger = logging.getLogger(__name__)
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-def _authenticate(
+async def _authenticate(
     credentials: HTTPAuthorizationCredentials | None,
     authentication: Authentication,
 ) -> tuple[str, dict]:
@@ -36,7 +34,7 @@ def _authenticate(
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = credentials.credentials
     try:
-        claims = authentication.validate(token)
+        claims = await authentication.validate(token)
         structlog.contextvars.bind_contextvars(
             UserId=claims.get("sub", ""),
             ClientId=claims.get("azp", ""),
@@ -50,6 +48,11 @@ def _authenticate(
         raise HTTPException(status_code=401, detail="Token validation failed")
 
 
+def _owning_dataset_ids(owners: dict[str, list[str]]) -> list[str]:
+    """Flatten a node → datasets mapping into distinct dataset IDs."""
+    return list(dict.fromkeys(d for ids in owners.values() for d in ids))
+
+
 def _exchange(authentication: Authentication, token: str) -> str:
     """Exchange *token* for a dg-app-api scoped token. Raises 502 on failure."""
     try:
@@ -75,7 +78,7 @@ def require_authentication():
     ) -> dict | None:
         if authentication is None:
             return None
-        _, user = _authenticate(credentials, authentication)
+        _, user = await _authenticate(credentials, authentication)
         return user
 
     return _check
@@ -103,8 +106,8 @@ def require_permission(
     is only acceptable for ``DatasetRole.CREATE``.
 
     ``id_type=IdType.Node``: the ``id`` path parameter is a node ID.  The
-    parent dataset(s) are resolved first via a subgraph lookup, and the caller
-    must hold *action* on at least one of them.  404 (rather than 403) is
+    parent dataset(s) are resolved first from its ``VIRTUAL_BELONGS_TO``
+    edges, and the caller must hold *action* on at least one of them.  404 (rather than 403) is
     returned on denial to avoid leaking whether the node lives in an
     inaccessible dataset.
 
@@ -159,14 +162,8 @@ def require_permission(
         match id_type:
             # For nodes, we needs to check the dataset they belongs to
             case IdType.Node:
-                result = await dataset_svc.list(DatasetFilter(
-                    nodeIds=[path_id], properties=[DatasetProperty.ID]))
-                dataset_ids = [
-                    n.id
-                    for d in result.get("datasets", [])
-                    for n in d.nodes
-                    if "sc:Dataset" in n.labels
-                ]
+                owners = await dataset_svc.resolve_owning_datasets([path_id])
+                dataset_ids = owners.get(path_id, [])
                 if not dataset_ids:
                     raise HTTPException(
                         status_code=404, detail=f"Node '{path_id}' not found."
@@ -183,23 +180,11 @@ def require_permission(
             # Returns 404 to prevent enumeration of inaccessible APs.
             case IdType.AP:
                 # NotFoundError -> 404 via app handler
-                ap_result = await ap_svc.get(path_id)
-                input_node_ids = [
-                    str(e.to)
-                    for e in (ap_result.edges or [])
-                    if EdgeLabel.input in e.labels
-                ]
-                if not input_node_ids:
+                owners = await ap_svc.resolve_input_datasets(path_id)
+                if not owners:
                     # AP has no input constraint → no dataset to check, grant access
                     return user
-                result = await dataset_svc.list(DatasetFilter(
-                    nodeIds=input_node_ids, properties=[DatasetProperty.ID]))
-                dataset_ids = [
-                    str(n.id)
-                    for d in result.get("datasets", [])
-                    for n in d.nodes
-                    if "sc:Dataset" in n.labels
-                ]
+                dataset_ids = _owning_dataset_ids(owners)
                 if not dataset_ids:
                     raise HTTPException(
                         status_code=404,
@@ -232,12 +217,12 @@ def require_permission(
             # For now I don't know if it's possible to have a node belonging to multiple datasets, but if it is the case,
             # we might want to enforce permissions on ALL parent datasets instead of just one, at least for non-idempotent actions
             #
-            # Realm roles were already checked above, so call has_dataset_grant
+            # Realm roles were already checked above, so call has_dataset_grants
             # directly to avoid a redundant HTTP round-trip.
             check = all if require_all else any
-            results = [await authorization.has_dataset_grant(token, action, ds_id)
-                       for ds_id in dataset_ids]
-            allowed = check(results)
+            grants = await authorization.has_dataset_grants(
+                token, action, dataset_ids)
+            allowed = check(grants.values())
         except UserError as exc:
             logger.warning(
                 "Authorization failed: %s %s: %s",
@@ -268,8 +253,10 @@ def require_browse_for_ap_creation():
 
     This differs from ``require_permission`` in that the dataset IDs are
     derived from the request *body* (the AP's ``input`` edges) rather than
-    a path parameter.
+    a path parameter.  The body is parsed by the same (cached) dependency as
+    the endpoint's, so it is validated once, off the event loop.
     """
+    from moma_management.api.v1.request_body import ap_candidate
     from moma_management.di import (
         get_authentication_service,
         get_authorization_service,
@@ -277,7 +264,7 @@ def require_browse_for_ap_creation():
     )
 
     async def _check(
-        candidate: AnalyticalPattern,
+        candidate: AnalyticalPattern = Depends(ap_candidate),
         credentials: HTTPAuthorizationCredentials | None = Depends(
             bearer_scheme),
         authentication: Optional[Authentication] = Depends(
@@ -290,28 +277,18 @@ def require_browse_for_ap_creation():
         if authentication is None:
             return None
 
-        token, user = _authenticate(credentials, authentication)
+        token, user = await _authenticate(credentials, authentication)
 
         if authorization is None:
             return user
 
-        input_node_ids = [
-            str(e.to)
-            for e in (candidate.edges or [])
-            if EdgeLabel.input in e.labels
-        ]
+        input_node_ids = candidate.input_node_ids
         if not input_node_ids:
             # No input references → no dataset constraint, grant access
             return user
 
-        result = await dataset_svc.list(DatasetFilter(
-            nodeIds=input_node_ids, properties=[DatasetProperty.ID]))
-        dataset_ids = [
-            str(n.id)
-            for d in result.get("datasets", [])
-            for n in d.nodes
-            if "sc:Dataset" in n.labels
-        ]
+        dataset_ids = _owning_dataset_ids(
+            await dataset_svc.resolve_owning_datasets(input_node_ids))
         if not dataset_ids:
             raise HTTPException(
                 status_code=404,
@@ -324,12 +301,11 @@ def require_browse_for_ap_creation():
             ):
                 return user
 
-            # Realm roles already checked above — use has_dataset_grant
+            # Realm roles already checked above — use has_dataset_grants
             # directly to avoid a redundant HTTP round-trip.
-            results = [await authorization.has_dataset_grant(
-                token, DatasetRole.BROWSE, ds_id)
-                for ds_id in dataset_ids]
-            allowed = all(results)
+            grants = await authorization.has_dataset_grants(
+                token, DatasetRole.BROWSE, dataset_ids)
+            allowed = all(grants.values())
         except UserError as exc:
             logger.warning("Authorization failed: %s %s",
                            exc.status_code, exc.text)
@@ -377,7 +353,7 @@ def require_admin():
         if authentication is None:
             return None
 
-        token, user = _authenticate(credentials, authentication)
+        token, user = await _authenticate(credentials, authentication)
 
         if authorization is None:
             return user
@@ -425,7 +401,7 @@ def get_allowed_datasets_ids() -> AsyncGenerator[List[str]]:
 
         if authentication is None:
             return None  # Auth disabled – return everything
-        token, _ = _authenticate(credentials, authentication)
+        token, _ = await _authenticate(credentials, authentication)
 
         # gateway_token = _exchange(authentication, token)
         if authorization is None:
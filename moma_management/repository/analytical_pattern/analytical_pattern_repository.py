@@ -1,4 +1,4 @@
-from typing import List, Optional, Protocol, runtime_checkable
+from typing import Dict, List, Optional, Protocol, runtime_checkable
 
 from moma_management.domain.analytical_pattern import AnalyticalPattern
 from moma_management.domain.filters import AnalyticalPatternFilter
@@ -31,22 +31,39 @@ class AnalyticalPatternRepository(Protocol):
         """
         ...
 
+    async def resolve_input_datasets(self, ap_id: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Map each data node feeding the AP's ``input`` edges to the ids of the
+        datasets it belongs to, without loading the AP subgraph.
+
+        Internal ResultType nodes are skipped, as in
+        :attr:`AnalyticalPattern.input_node_ids`.  Returns an empty dict for
+        an AP without inputs and ``None`` if the AP does not exist.
+        """
+        ...
+
     async def list(
         self,
         filter: AnalyticalPatternFilter,
         accessible_dataset_ids: Optional[List[str]] = None,
         query_vector: Optional[List[float]] = None,
     ) -> dict:
-        """Return a paginated dict ``{"aps": [...], "total": int}`` (shallow retrieval).
+        """Return a paginated dict ``{"aps": [...], "total": int | None, "nextCursor": str | None}`` (shallow retrieval).
 
         When *query_vector* is provided, a vector-similarity search is performed
         instead of a full scan; ``filter.search.threshold`` and
         ``filter.search.top_k`` are used to control the search.
         When *accessible_dataset_ids* is provided, only APs whose input data
         nodes belong to one of those datasets are returned.
+        ``filter.after`` resumes a listing after the AP its cursor points to;
+        ``total`` is only computed when ``filter.includeTotal`` is set.
         """
         ...
 
+    async def count(self, accessible_dataset_ids: Optional[List[str]] = None) -> int:
+        """Return the number of APs visible with *accessible_dataset_ids*."""
+        ...
+
     async def get_ids_by_task_id(self, task_id: str) -> List[str]:
         """
         Return the IDs of all AnalyticalPattern nodes accomplished by the
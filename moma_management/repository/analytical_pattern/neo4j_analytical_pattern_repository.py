@@ -1,16 +1,15 @@
 
 import json
 from logging import getLogger
-from typing import Any, Dict, List, Optional, Tuple
-from uuid import UUID
+from typing import Dict, List, Optional, Tuple
 
 from neo4j import AsyncSession
 
 from moma_management.domain import EDGE_CONSTRAINTS_PATH
 from moma_management.domain.analytical_pattern import AnalyticalPattern
+from moma_management.domain.exceptions import ValidationError
 from moma_management.domain.filters import AnalyticalPatternFilter
-from moma_management.domain.generated.edges.edge_schema import Edge
-from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.domain.pagination import decode_cursor, encode_cursor
 from moma_management.repository.analytical_pattern.analytical_pattern_repository import (
     AnalyticalPatternRepository,
 )
@@ -19,6 +18,8 @@ from moma_management.repository.neo4j_pgson_mixin import Neo4jPgJsonMixin
 logger = getLogger(__name__)
 
 _VECTOR_INDEX_NAME = "ap_description_embedding"
+# APs are listed by ascending ID, the only key of their pagination cursors.
+_CURSOR_ORDERING = ["id:asc"]
 
 _edge_constraints: list[dict] = json.loads(EDGE_CONSTRAINTS_PATH.read_text())
 _EVALUATION_EDGE: str = next(
@@ -48,8 +49,6 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
     ]
     _indexes_ensured: bool = False
     _vector_index_ensured: bool = False
-    # When deserializing nodes, ignore these properties
-    _NODE_IGNORE_PROPS: frozenset[str] = frozenset({"description_embedding"})
 
     def _effective_forbidden_edges(self, include_evaluations: bool) -> list[str]:
         """Return the forbidden-edge list for subgraph traversal.
@@ -69,7 +68,7 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
     async def create_with_indexes(cls, session: AsyncSession) -> "Neo4jAnalyticalPatternRepository":
         repo = cls(session)
         if not cls._indexes_ensured:
-            for stmt in cls._INDEX_STATEMENTS:
+            for stmt in cls._BASE_INDEX_STATEMENTS + cls._INDEX_STATEMENTS:
                 await session.run(stmt)
             cls._indexes_ensured = True
             logger.info("Neo4jAnalyticalPatternRepository indexes ensured")
@@ -80,8 +79,8 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
     # ------------------------------------------------------------------
 
     async def create(self, ap: AnalyticalPattern, embedding: Optional[List[float]] = None) -> None:
-        """Store the full AP subgraph using the mixin's MERGE/SET helpers."""
-        await self._session.execute_write(self.create_pgson, ap)
+        """Store the full AP subgraph using the mixin's batched UNWIND writer."""
+        await self._session.execute_write(self.create_pgson_bulk, ap)
         if embedding is not None:
             await self._ensure_index(len(embedding))
             await self._session.run(
@@ -153,91 +152,69 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
 
         When *include_evaluations* is ``False`` (default) Evaluation nodes are
         excluded from the traversal.  Pass ``True`` to include them.
-
-        ResultType nodes are internal to the AP but connected via input/output
-        edges (which are in FORBIDDEN_EDGES).  A second query fetches them
-        explicitly and merges them into the subgraph.
         """
-        forbidden = self._effective_forbidden_edges(include_evaluations)
-        query = """//cypher
-            MATCH (root:Analytical_Pattern {id: $ap_id})
-            OPTIONAL MATCH path=(root)-[*1..4]-(m)
-            WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
-            RETURN root, m, relationships(path) AS rels
+        aps = await self._get_batch([str(ap_id)], include_evaluations)
+        return aps[0] if aps else None
+
+    async def _get_batch(
+        self, ids: List[str], include_evaluations: bool = False
+    ) -> List[AnalyticalPattern]:
+        """Fetch shallow subgraphs for multiple AP IDs in a single query.
+
+        Each AP is made of the nodes within 4 hops of its root, found by a
+        breadth-first expansion that does not cross forbidden edges, plus the
+        internal ResultType nodes linked to its Operators through ``input``/``output`` edges (those
+        edges are forbidden for the traversal itself).  Data nodes, although
+        ResultType subtypes, are persistent and never included.
+
+        Nodes and edges are projected as lightweight maps, and the
+        ``description_embedding`` vector is left out of the projection.
+        Result order matches the input *ids* order.
         """
-        result = await self._session.run(
-            query, ap_id=str(ap_id), forbiddenEdges=forbidden)
-        rows = [record async for record in result]
-        if not rows:
-            return None
-
-        nodes: Dict[str, Any] = {}
-        edges: Dict[str, Any] = {}
-
-        root = rows[0]["root"]
-        if root is None:
-            return None
-        nodes[root["id"]] = self._deserialize_node(
-            root, ignore_props=self._NODE_IGNORE_PROPS)
-
-        for record in rows:
-            m = record["m"]
-            rels = record["rels"] or []
-            if m:
-                mid = m["id"]
-                if mid not in nodes:
-                    nodes[mid] = self._deserialize_node(
-                        m, ignore_props=self._NODE_IGNORE_PROPS)
-            for rel in rels:
-                key = (rel.start_node["id"], rel.end_node["id"], rel.type)
-                if key not in edges:
-                    edges[key] = self._deserialize_edge(rel)
-
-        # Second pass: collect internal ResultType nodes connected to Operators.
-        # Data nodes (which are also ResultType) are excluded — they are external
-        # persistent nodes not owned by the AP subgraph.
-        rt_query = """//cypher
-            MATCH (root:Analytical_Pattern {id: $ap_id})-[:consist_of]->(op:Operator)
-            OPTIONAL MATCH (op)-[r:input|output]-(rt:ResultType)
-            WHERE NOT rt:Data
-            RETURN rt, r
+        query = f"""//cypher
+        UNWIND $apIds AS apId
+        MATCH (root:Analytical_Pattern {{id: apId}})
+        {self._bfs_subgraph(4)}
+
+        OPTIONAL MATCH (root)-[:consist_of]->(:Operator)-[rr:input|output]-(rt:ResultType)
+        WHERE NOT rt:Data
+        WITH root, subgraph, collect(DISTINCT rt) AS resultTypes,
+             collect(DISTINCT {{from: startNode(rr).id, to: endNode(rr).id,
+                               type: type(rr), props: properties(rr)}}) AS rtEdgeMaps
+
+        UNWIND subgraph AS a
+        OPTIONAL MATCH (a)-[r]->(b)
+        WHERE b IN subgraph AND NOT type(r) IN $forbiddenEdges
+        WITH root, subgraph, resultTypes, rtEdgeMaps,
+             collect(DISTINCT {{from: startNode(r).id, to: endNode(r).id,
+                               type: type(r), props: properties(r)}}) AS edgeMaps
+
+        RETURN root.id AS apId,
+               [x IN subgraph + resultTypes |
+                   {{id: x.id, labels: labels(x),
+                    props: x {{.*, description_embedding: null}}}}] AS node_maps,
+               [e IN edgeMaps + rtEdgeMaps WHERE e.from IS NOT NULL] AS edge_maps
         """
-        rt_result = await self._session.run(rt_query, ap_id=str(ap_id))
-        async for record in rt_result:
-            rt = record["rt"]
-            r = record["r"]
-            if rt is not None:
-                rt_id = rt["id"]
-                if rt_id not in nodes:
-                    nodes[rt_id] = self._deserialize_node(rt)
-            if r is not None:
-                key = (r.start_node["id"], r.end_node["id"], r.type)
-                if key not in edges:
-                    edges[key] = self._deserialize_edge(r)
-
-        valid_edges = [
-            e for e in edges.values()
-            if e["from"] in nodes and e["to"] in nodes
-        ]
-
-        node_objects = [
-            Node.model_construct(id=UUID(n["id"]), labels=n["labels"], properties=n["properties"])
-            for n in nodes.values()
-        ]
-        edge_objects = (
-            [
-                Edge.model_construct(
-                    from_=UUID(e["from"]), to=UUID(e["to"]),
-                    labels=e["labels"], properties=e.get("properties"),
-                )
-                for e in valid_edges
-            ]
-            if valid_edges else None
-        )
-        return AnalyticalPattern.model_construct(
-            nodes=node_objects,
-            edges=edge_objects,
+        result = await self._session.run(
+            query,
+            apIds=ids,
+            forbiddenEdges=self._effective_forbidden_edges(include_evaluations),
         )
+        by_id: Dict[str, AnalyticalPattern] = {}
+        async for record in result:
+            try:
+                nodes, edges = self._graph_from_maps(
+                    record["node_maps"], record["edge_maps"]
+                )
+                by_id[record["apId"]] = AnalyticalPattern.model_construct(
+                    nodes=nodes, edges=edges
+                )
+            except Exception as e:
+                logger.error("Neo4j _get_batch error for %s: %s",
+                             record["apId"], e)
+
+        # Preserve the order of the page of IDs
+        return [by_id[id_] for id_ in ids if id_ in by_id]
 
     @staticmethod
     def _access_filter(accessible_dataset_ids: Optional[List[str]]) -> Tuple[str, dict]:
@@ -266,6 +243,19 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
         """
         return clause, {"accessible_ids": accessible_dataset_ids}
 
+    async def count(self, accessible_dataset_ids: Optional[List[str]] = None) -> int:
+        """Return the number of APs passing the access filter."""
+        access_clause, access_params = self._access_filter(
+            accessible_dataset_ids)
+        count_query = f"""//cypher
+            MATCH (root:Analytical_Pattern)
+            {access_clause}
+            RETURN count(DISTINCT root) AS total
+        """
+        count_result = await self._session.run(count_query, **access_params)
+        count_record = await count_result.single()
+        return count_record["total"] if count_record else 0
+
     async def list(
         self,
         filter: AnalyticalPatternFilter,
@@ -278,12 +268,29 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
         threshold and top_k are read from ``filter.search``.  Both paths share
         the same access filter and DB-side SKIP/LIMIT pagination.
 
-        Returns ``{"aps": [AnalyticalPattern, ...], "total": int}``.
+        Without a query vector, APs are sorted by ID and ``filter.after``
+        seeks past the AP a cursor points to, through the ID index, instead
+        of skipping the previous pages.  Search results are capped by
+        ``top_k`` and only paginate by page number.
+
+        Returns ``{"aps": [AnalyticalPattern, ...], "total": int | None,
+        "nextCursor": str | None}``; ``total`` is ``None`` unless
+        ``filter.includeTotal`` is set.
+
+        Raises:
+            ValidationError: if ``filter.after`` is malformed or combined
+                with a search.
         """
-        skip = (filter.page - 1) * filter.pageSize
+        if filter.after is not None and query_vector is not None:
+            raise ValidationError(
+                "Cursor pagination is not available for semantic search; use 'page'.")
+        after = decode_cursor(filter.after, _CURSOR_ORDERING)[0] if filter.after else None
+
+        skip = 0 if after is not None else (filter.page - 1) * filter.pageSize
         limit = filter.pageSize
         access_clause, access_params = self._access_filter(
             accessible_dataset_ids)
+        access_clause_clean = access_clause.strip().removeprefix("WHERE").strip()
 
         if query_vector is not None:
             search = filter.search
@@ -291,7 +298,6 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
             threshold = search.threshold if search else 0.0
             await self._ensure_index(len(query_vector))
 
-            access_clause_clean = access_clause.strip().removeprefix("WHERE").strip()
             access_and = f"AND ({access_clause_clean})" if access_clause_clean else ""
 
             count_query = f"""//cypher
@@ -319,39 +325,72 @@ class Neo4jAnalyticalPatternRepository(Neo4jPgJsonMixin, AnalyticalPatternReposi
                 **access_params,
             }
         else:
-            count_query = f"""//cypher
-                MATCH (root:Analytical_Pattern)
-                {access_clause}
-                RETURN count(DISTINCT root) AS total
-            """
+            conditions = [c for c in (
+                access_clause_clean,
+                "root.id > $after" if after is not None else "",
+            ) if c]
+            where = ("WHERE " + " AND ".join(f"({c})" for c in conditions)
+                     if conditions else "")
+            # One extra row tells whether a next page exists.
             id_query = f"""//cypher
                 MATCH (root:Analytical_Pattern)
-                {access_clause}
+                {where}
                 WITH root
                 ORDER BY root.id ASC
                 SKIP $skip
-                LIMIT $limit
+                LIMIT $limit + 1
                 RETURN root.id AS id
             """
-            params = dict(access_params)
-
-        count_result = await self._session.run(count_query, **params)
-        count_record = await count_result.single()
-        total = count_record["total"] if count_record else 0
-
-        if total == 0:
-            return {"aps": [], "total": 0}
+            params = {**access_params, "after": after}
+
+        total: Optional[int] = None
+        if filter.includeTotal:
+            if query_vector is not None:
+                count_result = await self._session.run(count_query, **params)
+                count_record = await count_result.single()
+                total = count_record["total"] if count_record else 0
+            else:
+                total = await self.count(accessible_dataset_ids)
+            if total == 0:
+                return {"aps": [], "total": 0, "nextCursor": None}
 
         id_result = await self._session.run(id_query, **{**params, "skip": skip, "limit": limit})
         page_ids = [record["id"] async for record in id_result]
 
-        aps = []
-        for ap_id in page_ids:
-            ap = await self.get(ap_id, include_evaluations=filter.include_evaluations)
-            if ap is not None:
-                aps.append(ap)
+        next_cursor = None
+        if len(page_ids) > limit:
+            page_ids = page_ids[:limit]
+            next_cursor = encode_cursor(_CURSOR_ORDERING, [page_ids[-1]])
+
+        aps = await self._get_batch(page_ids, filter.include_evaluations)
+
+        return {"aps": aps, "total": total, "nextCursor": next_cursor}
+
+    async def resolve_input_datasets(self, ap_id: str) -> Optional[Dict[str, List[str]]]:
+        """Map the AP's input data nodes to their datasets in a single query.
 
-        return {"aps": aps, "total": total}
+        The owners are read from the VIRTUAL_BELONGS_TO edges of the input
+        nodes, as in ``resolve_owning_datasets``; a dataset root node belongs
+        to itself.
+        """
+        query = """//cypher
+            MATCH (root:Analytical_Pattern {id: $ap_id})
+            OPTIONAL MATCH (root)-[:consist_of]->(:Operator)<-[:input]-(n)
+            WHERE NOT (n:ResultType AND NOT n:Data)
+            OPTIONAL MATCH (n)-[:VIRTUAL_BELONGS_TO]->(d:`sc:Dataset`)
+            WITH n, collect(DISTINCT d.id) AS owners
+            RETURN n.id AS nodeId,
+                   CASE WHEN n:`sc:Dataset` THEN [n.id] + owners ELSE owners END AS datasetIds
+        """
+        result = await self._session.run(query, ap_id=str(ap_id))
+        records = [record async for record in result]
+        if not records:
+            return None
+        return {
+            record["nodeId"]: list(record["datasetIds"])
+            for record in records
+            if record["nodeId"] is not None
+        }
 
     async def get_ids_by_task_id(self, task_id: str) -> List[str]:
         """Return AP IDs accomplished by the given Task."""
@@ -0,0 +1,109 @@
+"""
+One-off backfill adding the shared ``MomaNode`` base label to existing nodes.
+
+Databases populated before the base label was introduced contain nodes that
+only carry their PG-JSON labels, so label-anchored id lookups cannot find
+them.  Run once after upgrading, against the same Neo4j instance the service
+uses::
+
+    python -m moma_management.repository.backfill_base_label
+
+Connection settings are read from ``NEO4J_URI``, ``NEO4J_USER`` and
+``NEO4J_PASSWORD``.  The command is idempotent and safe to re-run.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+from neo4j import AsyncGraphDatabase, AsyncSession
+
+from moma_management.repository.neo4j_pgson_mixin import (
+    BASE_LABEL,
+    Neo4jPgJsonMixin,
+)
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BATCH_SIZE = 10_000
+
+
+async def backfill_base_label(session: AsyncSession, batch_size: int = _DEFAULT_BATCH_SIZE) -> int:
+    """
+    Add :data:`BASE_LABEL` to every node that has an ``id`` but lacks it.
+
+    Labels are set in batches of *batch_size* rows, each committed in its own
+    transaction, so the backfill does not build one huge transaction on large
+    stores.  Once labelling is done the ``MomaNode.id`` uniqueness constraint
+    is created.
+
+    Args:
+        session:    Neo4j session (auto-commit transactions are required for
+                    ``CALL { ... } IN TRANSACTIONS``).
+        batch_size: Number of nodes labelled per inner transaction.
+
+    Returns:
+        The number of nodes that were labelled.
+
+    Raises:
+        RuntimeError: If several labelled nodes share the same ``id``, which
+            would prevent the uniqueness constraint from being created.
+    """
+    result = await session.run(
+        f"""//cypher
+        MATCH (n)
+        WHERE n.id IS NOT NULL AND NOT n:{BASE_LABEL}
+        CALL {{ WITH n SET n:{BASE_LABEL} }} IN TRANSACTIONS OF $batchSize ROWS
+        RETURN count(n) AS labelled
+        """,
+        batchSize=batch_size,
+    )
+    record = await result.single()
+    labelled = record["labelled"] if record else 0
+    logger.info("Added %s label to %d nodes", BASE_LABEL, labelled)
+
+    result = await session.run(
+        f"""//cypher
+        MATCH (n:{BASE_LABEL})
+        WITH n.id AS id, count(*) AS occurrences
+        WHERE occurrences > 1
+        RETURN id, occurrences
+        LIMIT 20
+        """
+    )
+    duplicates = [(r["id"], r["occurrences"]) async for r in result]
+    if duplicates:
+        raise RuntimeError(
+            f"Cannot create {BASE_LABEL}.id uniqueness constraint, "
+            f"duplicate ids found: {duplicates}"
+        )
+
+    for stmt in Neo4jPgJsonMixin._BASE_INDEX_STATEMENTS:
+        await session.run(stmt)
+    logger.info("%s constraints ensured", BASE_LABEL)
+    return labelled
+
+
+async def main() -> int:
+    driver = AsyncGraphDatabase.driver(
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        auth=(
+            os.getenv("NEO4J_USER", "neo4j"),
+            os.getenv("NEO4J_PASSWORD", "datagems"),
+        ),
+    )
+    try:
+        async with driver.session() as session:
+            await backfill_base_label(session)
+    except RuntimeError as e:
+        logger.error("%s", e)
+        return 1
+    finally:
+        await driver.close()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
@@ -1,5 +1,8 @@
+from typing import AsyncIterable, Dict, List
+
 from moma_management.domain.dataset import Dataset
 from moma_management.domain.filters import DatasetFilter
+from moma_management.domain.generated.moma_schema import MoMaGraphModel
 from moma_management.repository.repository import Repository
 
 
@@ -8,3 +11,19 @@ class DatasetRepository(Repository[Dataset, DatasetFilter]):
     async def has_referencing_aps(self, dataset_id: str) -> bool:
         """Return True if at least one AP references a node in this dataset."""
         ...
+
+    async def count(self, criteria: DatasetFilter) -> int:
+        """Return the number of datasets matching *criteria*, ignoring pagination."""
+        ...
+
+    async def create_streaming(self, root_id: str, chunks: AsyncIterable[MoMaGraphModel]) -> None:
+        """Atomically store a dataset delivered as successive partial graphs."""
+        ...
+
+    async def resolve_owning_datasets(self, node_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Map each node id to the ids of the datasets it belongs to.
+
+        A dataset root node belongs to itself; unknown ids are omitted.
+        """
+        ...
@@ -1,15 +1,27 @@
 import time
+from collections import deque
 from logging import getLogger
-from typing import List, Optional
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple
+from uuid import UUID
 
 from neo4j import AsyncManagedTransaction, AsyncSession
 from pydantic import ValidationError as PydanticValidationError
 
 from moma_management.domain.dataset import Dataset
-from moma_management.domain.exceptions import RepositoryError
+from moma_management.domain.exceptions import RepositoryError, ValidationError
 from moma_management.domain.filters import DatasetFilter, DatasetSortField
+from moma_management.domain.generated.edges.edge_schema import Edge
 from moma_management.domain.generated.moma_schema import MoMaGraphModel
-from moma_management.repository.neo4j_pgson_mixin import Neo4jPgJsonMixin
+from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.domain.pagination import decode_cursor, encode_cursor
+from moma_management.domain.validation import IncrementalGraphValidator
+from moma_management.repository.neo4j_pgson_mixin import (
+    DATASET_BOUNDARY_EDGES,
+    DATASET_MAX_HOPS,
+    FACET_ENCODING_FORMATS_PROP,
+    FACET_LABELS_PROP,
+    Neo4jPgJsonMixin,
+)
 
 logger = getLogger(__name__)
 
@@ -19,9 +31,7 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
 
     # These edges links datasets to models, APs, or DatasetRelationships so must
     # be excluded when maniulating datasets in isolation
-    FORBIDDEN_EDGES: list[str] = ["fitted_on", "input",
-                                  "output", "perform_inference", "trained_on",
-                                  "VIRTUAL_BELONGS_TO", "HAS_TARGET"]
+    FORBIDDEN_EDGES: list[str] = DATASET_BOUNDARY_EDGES
 
     _INDEX_STATEMENTS: list[str] = [
         "CREATE CONSTRAINT dataset_id_unique IF NOT EXISTS "
@@ -35,6 +45,11 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
     ]
     _indexes_ensured: bool = False
 
+    # Find dataset subgraphs through the VIRTUAL_BELONGS_TO edges.  When
+    # False, they are expanded hop by hop from the root instead, for
+    # databases whose edges have not been backfilled (migration 3) yet.
+    use_virtual_edges: bool = True
+
     def __init__(self, session: AsyncSession):
         self._session = session
 
@@ -42,57 +57,77 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
     async def create_with_indexes(cls, session: AsyncSession) -> "Neo4jDatasetRepository":
         repo = cls(session)
         if not cls._indexes_ensured:
-            for stmt in cls._INDEX_STATEMENTS:
+            for stmt in cls._BASE_INDEX_STATEMENTS + cls._INDEX_STATEMENTS:
                 await session.run(stmt)
             cls._indexes_ensured = True
             logger.info("Neo4jDatasetRepository indexes ensured")
-
-            # Backfill VIRTUAL_BELONGS_TO for existing datasets.
-            # Uses MERGE so it is idempotent and safe to re-run.
-            backfill_edges = [
-                "fitted_on", "input", "output",
-                "perform_inference", "trained_on", "HAS_TARGET",
-            ]
-            await session.run(
-                """//cypher
-                MATCH (d:`sc:Dataset`)
-                OPTIONAL MATCH path=(d)-[*1..4]-(m)
-                WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
-                  AND m <> d
-                WITH d, collect(DISTINCT m) AS children
-                UNWIND children AS child
-                MERGE (child)-[:VIRTUAL_BELONGS_TO]->(d)
-                """,
-                forbiddenEdges=backfill_edges,
-            )
-            logger.info(
-                "Neo4jDatasetRepository VIRTUAL_BELONGS_TO backfill done")
-
-            # Warm-up: touch Dataset nodes so Neo4j loads them into page cache.
-            # This avoids the cold-cache penalty on the first real query.
-            await session.run(
-                "MATCH (n:`sc:Dataset`) RETURN count(n) AS c"
-            )
-            logger.info("Neo4jDatasetRepository page-cache warm-up done")
         return repo
 
     async def _create_dataset_with_virtual_edges(
         self, tx: AsyncManagedTransaction, dataset: Dataset
     ) -> None:
-        """Write the full PG-JSON graph and add VIRTUAL_BELONGS_TO edges."""
-        await self.create_pgson(tx, dataset)
-
-        root_id = dataset.root_id
-        child_ids = [str(n.id) for n in dataset.nodes if str(n.id) != root_id]
-        if child_ids:
+        """Write the full PG-JSON graph, add VIRTUAL_BELONGS_TO edges and set its facets."""
+        await self.create_pgson_bulk(tx, dataset, link_owners=False)
+        owned = self._newly_owned(dataset.root_id, dataset.edges, {}, {dataset.root_id: 0})
+        await self._merge_virtual_edges(tx, dataset.root_id, owned)
+        await self._refresh_dataset_facets(tx, [dataset.root_id])
+
+    @staticmethod
+    def _newly_owned(
+        root_id: str, edges: Optional[List[Edge]], adjacency: Dict[str, List[str]],
+        owned: Dict[str, int],
+    ) -> List[str]:
+        """
+        Return the nodes that *edges* connect to the dataset root.
+
+        Only edges outside :attr:`FORBIDDEN_EDGES` count, so nodes merely
+        referenced by an AP or model in the payload do not join the dataset,
+        and only nodes within :data:`DATASET_MAX_HOPS` hops of the root do,
+        as with the hop-based reads and migration 3.  *adjacency* and *owned*
+        (the hop distance of each owned node, starting as ``{root_id: 0}``)
+        are updated in place so that they carry over the chunks of a streamed
+        dataset.
+        """
+        touched = []
+        for edge in edges or []:
+            if all(lbl.value in Neo4jDatasetRepository.FORBIDDEN_EDGES for lbl in edge.labels):
+                continue
+            a, b = str(edge.from_), str(edge.to)
+            adjacency.setdefault(a, []).append(b)
+            adjacency.setdefault(b, []).append(a)
+            touched += (a, b)
+
+        # A later chunk may bring an owned node closer to the root, so hop
+        # distances are relaxed rather than assigned once.
+        reached: List[str] = []
+        queue = deque(n for n in touched if n in owned)
+        while queue:
+            n = queue.popleft()
+            hops = owned[n] + 1
+            if hops > DATASET_MAX_HOPS:
+                continue
+            for m in adjacency.get(n, ()):
+                if m not in owned:
+                    reached.append(m)
+                elif owned[m] <= hops:
+                    continue
+                owned[m] = hops
+                queue.append(m)
+        return [n for n in reached if n != root_id]
+
+    async def _merge_virtual_edges(
+        self, tx: AsyncManagedTransaction, root_id: str, child_ids: List[str]
+    ) -> None:
+        """Link every node of *child_ids* to the dataset root with VIRTUAL_BELONGS_TO."""
+        for start in range(0, len(child_ids), self.write_batch_size):
             await tx.run(
                 """//cypher
                 UNWIND $childIds AS childId
-                MATCH (child {id: childId})
+                MATCH (child:MomaNode {id: childId})
                 MATCH (root:`sc:Dataset` {id: $rootId})
                 MERGE (child)-[:VIRTUAL_BELONGS_TO]->(root)
                 """,
-                childIds=child_ids,
+                childIds=child_ids[start:start + self.write_batch_size],
                 rootId=root_id,
             )
 
@@ -107,17 +142,62 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
             logger.error("Neo4j upload failed: %s", e)
             return f"Error: {str(e)}"
 
+    async def create_streaming(self, root_id: str, chunks: AsyncIterable[MoMaGraphModel]) -> None:
+        """Store a dataset delivered as a sequence of partial graphs.
+
+        All chunks are written in a single explicit transaction, so the
+        client only ever holds one chunk at a time while the dataset is still
+        stored atomically.  Each chunk's edges must only reference nodes of
+        the same or an earlier chunk, and the root node must be in the first
+        chunk.  If iterating *chunks* raises, e.g. because a final validation
+        failed, the transaction is rolled back and the exception propagates.
+        """
+        adjacency: Dict[str, List[str]] = {}
+        owned = {root_id: 0}
+        tx = await self._session.begin_transaction()
+        try:
+            async for chunk in chunks:
+                await self.create_pgson_bulk(tx, chunk, link_owners=False)
+                await self._merge_virtual_edges(
+                    tx, root_id, self._newly_owned(root_id, chunk.edges, adjacency, owned))
+            await self._refresh_dataset_facets(tx, [root_id])
+            await tx.commit()
+        except BaseException:
+            await tx.rollback()
+            raise
+        finally:
+            await tx.close()
+
+    def _subgraph_clauses(self) -> Tuple[str, str]:
+        """
+        Return the Cypher collecting a dataset subgraph and a predicate
+        telling whether node ``b`` belongs to it.
+
+        The fragment continues a query in which the dataset node ``root`` is
+        bound and binds ``root, subgraph`` (``root`` included).  It follows
+        the VIRTUAL_BELONGS_TO edges, or expands up to
+        :data:`DATASET_MAX_HOPS` hops when :attr:`use_virtual_edges` is off.
+        Both need the ``$forbiddenEdges`` parameter.
+        """
+        if not self.use_virtual_edges:
+            return self._bfs_subgraph(DATASET_MAX_HOPS), "b IN subgraph"
+        return (
+            """
+            OPTIONAL MATCH (child)-[:VIRTUAL_BELONGS_TO]->(root)
+            WITH root, [root] + collect(DISTINCT child) AS subgraph
+            """,
+            "(b = root OR EXISTS { (b)-[:VIRTUAL_BELONGS_TO]->(root) })",
+        )
+
     async def delete(self, id: str) -> int:
         """
         Delete a dataset and its full connected subgraph by id.
         """
-        query = """//cypher
-            MATCH (d:`sc:Dataset` {id: $datasetId})
-            OPTIONAL MATCH path=(d)-[*1..10]-(m)
-            WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
-            WITH d, collect(DISTINCT m) AS related
-            FOREACH (n IN related | DETACH DELETE n)
-            DETACH DELETE d
+        subgraph, _ = self._subgraph_clauses()
+        query = f"""//cypher
+            MATCH (root:`sc:Dataset` {{id: $datasetId}})
+            {subgraph}
+            FOREACH (n IN subgraph | DETACH DELETE n)
             RETURN 1 AS deletedRows
         """
         result = await self._session.run(
@@ -127,12 +207,11 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
 
     async def has_referencing_aps(self, dataset_id: str) -> bool:
         """Return True if at least one AP references a node in this dataset."""
-        query = """//cypher
-            MATCH (d:`sc:Dataset` {id: $datasetId})
-            MATCH path=(d)-[*1..4]-(data)
-            WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
-            WITH collect(DISTINCT data) AS data_nodes
-            UNWIND data_nodes AS dn
+        subgraph, _ = self._subgraph_clauses()
+        query = f"""//cypher
+            MATCH (root:`sc:Dataset` {{id: $datasetId}})
+            {subgraph}
+            UNWIND subgraph AS dn
             MATCH (dn)-[:input]->(:Operator)
             RETURN true AS referenced
             LIMIT 1
@@ -143,91 +222,60 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
         record = await result.single()
         return record is not None
 
-    async def get(self, id: str) -> Optional[Dataset]:
-        """Fetch a single dataset and its full subgraph by root node id."""
-        query = """//cypher
-        MATCH (n:`sc:Dataset` {id: $datasetId})
-
-        // Hop 1
-        OPTIONAL MATCH (n)-[r1]-(h1)
-        WHERE NOT type(r1) IN $forbiddenEdges
-        WITH n, collect(DISTINCT h1) AS h1n
-
-        // Hop 2
-        UNWIND CASE WHEN size(h1n) > 0 THEN h1n ELSE [null] END AS h1
-        OPTIONAL MATCH (h1)-[r2]-(h2)
-        WHERE NOT type(r2) IN $forbiddenEdges
-          AND NOT h2 IN h1n AND h2 <> n
-        WITH n, h1n, collect(DISTINCT h2) AS h2n
-
-        // Hop 3
-        UNWIND CASE WHEN size(h2n) > 0 THEN h2n ELSE [null] END AS h2
-        OPTIONAL MATCH (h2)-[r3]-(h3)
-        WHERE NOT type(r3) IN $forbiddenEdges
-          AND NOT h3 IN h1n AND NOT h3 IN h2n AND h3 <> n
-        WITH n, h1n, h2n, collect(DISTINCT h3) AS h3n
-
-        // Hop 4
-        UNWIND CASE WHEN size(h3n) > 0 THEN h3n ELSE [null] END AS h3
-        OPTIONAL MATCH (h3)-[r4]-(h4)
-        WHERE NOT type(r4) IN $forbiddenEdges
-          AND NOT h4 IN h1n AND NOT h4 IN h2n AND NOT h4 IN h3n AND h4 <> n
-        WITH n, h1n, h2n, h3n, collect(DISTINCT h4) AS h4n
-
-        WITH n, [n] + h1n + h2n + h3n + h4n AS allNodes
-
-        // Collect edges as lightweight maps instead of full Relationship objects
-        UNWIND allNodes AS a
-        OPTIONAL MATCH (a)-[r]->(b)
-        WHERE b IN allNodes AND NOT type(r) IN $forbiddenEdges
-        WITH allNodes,
-             collect(DISTINCT {from: startNode(r).id, to: endNode(r).id, type: type(r), props: properties(r)}) AS edgeMaps
+    async def resolve_owning_datasets(self, node_ids: List[str]) -> Dict[str, List[str]]:
+        """Map each node id to the ids of the datasets it belongs to.
 
-        // Project nodes as lightweight maps instead of full Node objects
-        RETURN [x IN allNodes | {id: x.id, labels: labels(x), props: properties(x)}] AS node_maps,
-               [e IN edgeMaps WHERE e.from IS NOT NULL] AS edge_maps
+        Answered from the VIRTUAL_BELONGS_TO edges in a single query: one
+        index lookup per node plus its outgoing virtual edges, without loading
+        any dataset subgraph.  A dataset root node belongs to itself.  Ids
+        that match no stored node are absent from the result.
+        """
+        query = """//cypher
+        UNWIND $nodeIds AS nodeId
+        MATCH (n:MomaNode {id: nodeId})
+        OPTIONAL MATCH (n)-[:VIRTUAL_BELONGS_TO]->(d:`sc:Dataset`)
+        WITH n, collect(DISTINCT d.id) AS owners
+        RETURN n.id AS nodeId,
+               CASE WHEN n:`sc:Dataset` THEN [n.id] + owners ELSE owners END AS datasetIds
         """
+        result = await self._session.run(query, nodeIds=list(dict.fromkeys(node_ids)))
+        return {
+            record["nodeId"]: list(record["datasetIds"])
+            async for record in result
+        }
+
+    async def get(self, id: str) -> Optional[Dataset]:
+        """Fetch a single dataset and its full subgraph by root node id."""
         try:
-            result = await self._session.run(
-                query,
-                datasetId=id,
-                forbiddenEdges=self.FORBIDDEN_EDGES,
-            )
-            record = await result.single()
-            if not record:
-                return None
-            graph = self._build_dataset_from_maps(
-                record["node_maps"],
-                record["edge_maps"],
-            )
-            # NOTE: Skipping validation here since if the datasets are in the DB, they should be well-formed.
-            return Dataset.model_construct(nodes=graph.nodes, edges=graph.edges)
+            datasets = await self._get_batch([id])
         except Exception as e:
             logger.error("Neo4j get failed: %s", e)
             return None
+        return datasets[0] if datasets else None
 
     async def _get_batch(self, ids: List[str]) -> List[Dataset]:
         """Fetch full subgraphs for multiple dataset IDs in a single query.
 
-        Uses VIRTUAL_BELONGS_TO edges (maintained on every write) to collect
-        child nodes without a per-dataset 4-hop traversal, then gathers edges
-        in one pass.  Result order matches the input *ids* order.
+        Collects each subgraph with :meth:`_subgraph_clauses` (by default the
+        VIRTUAL_BELONGS_TO edges, without a per-dataset 4-hop traversal),
+        then gathers its edges in one pass.  Result order matches the input
+        *ids* order.
         """
-        query = """//cypher
+        subgraph, is_member = self._subgraph_clauses()
+        query = f"""//cypher
         UNWIND $datasetIds AS datasetId
-        MATCH (n:`sc:Dataset` {id: datasetId})
-        OPTIONAL MATCH (child)-[:VIRTUAL_BELONGS_TO]->(n)
-        WITH n, [n] + collect(DISTINCT child) AS allNodes
+        MATCH (root:`sc:Dataset` {{id: datasetId}})
+        {subgraph}
 
-        UNWIND allNodes AS a
+        UNWIND subgraph AS a
         OPTIONAL MATCH (a)-[r]->(b)
-        WHERE b IN allNodes AND NOT type(r) IN $forbiddenEdges
-        WITH n, allNodes,
-             collect(DISTINCT {from: startNode(r).id, to: endNode(r).id,
-                                type: type(r), props: properties(r)}) AS edgeMaps
+        WHERE NOT type(r) IN $forbiddenEdges AND {is_member}
+        WITH root, subgraph,
+             collect(DISTINCT {{from: startNode(r).id, to: endNode(r).id,
+                               type: type(r), props: properties(r)}}) AS edgeMaps
 
-        RETURN n.id AS datasetId,
-               [x IN allNodes | {id: x.id, labels: labels(x), props: properties(x)}] AS node_maps,
+        RETURN root.id AS datasetId,
+               [x IN subgraph | {{id: x.id, labels: labels(x), props: properties(x)}}] AS node_maps,
                [e IN edgeMaps WHERE e.from IS NOT NULL] AS edge_maps
         """
         result = await self._session.run(
@@ -239,6 +287,7 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
                 graph = self._build_dataset_from_maps(
                     record["node_maps"], record["edge_maps"]
                 )
+                # NOTE: Skipping validation here since if the datasets are in the DB, they should be well-formed.
                 by_id[record["datasetId"]] = Dataset.model_construct(
                     nodes=graph.nodes, edges=graph.edges
                 )
@@ -249,92 +298,147 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
         # Preserve the sort order from the ID query
         return [by_id[id_] for id_ in ids if id_ in by_id]
 
-    async def list(self, criteria: DatasetFilter) -> List[Dataset]:
-        try:
-            t0 = time.monotonic()
+    # Datasets matching the filter criteria of list() and count(); format
+    # with the alias of the dataset node.  Type and MIME-type filters read
+    # the facets denormalised on the dataset node rather than its subgraph.
+    _FILTER_WHERE = """(
+        $nodeIds = []
+        OR {alias}.id IN $nodeIds
+        OR EXISTS {{ MATCH (c)-[:VIRTUAL_BELONGS_TO]->({alias}) WHERE c.id IN $nodeIds }}
+    )
+    AND ($publishedDateFrom IS NULL OR {alias}.datePublished >= $publishedDateFrom)
+    AND ($publishedDateTo IS NULL OR {alias}.datePublished <= $publishedDateTo)
+    AND ($status IS NULL OR {alias}.status = $status)
+    AND (
+        ($nodeLabels = [] AND $mimeTypeValues = [])
+        OR ANY(t IN $nodeLabels WHERE t IN {alias}.""" + FACET_LABELS_PROP + """)
+        OR ANY(f IN $mimeTypeValues WHERE f IN {alias}.""" + FACET_ENCODING_FORMATS_PROP + """)
+    )"""
+
+    def _filter_params(self, criteria: DatasetFilter) -> dict:
+        """Return the query parameters of :attr:`_FILTER_WHERE`."""
+        return dict(
+            nodeIds=criteria.nodeIds or [],
+            publishedDateFrom=criteria.publishedFrom.isoformat() if criteria.publishedFrom else None,
+            publishedDateTo=criteria.publishedTo.isoformat() if criteria.publishedTo else None,
+            status=criteria.status.value if criteria.status is not None else None,
+            nodeLabels=[t.value for t in criteria.types],
+            mimeTypeValues=[mt.value for mt in criteria.mimeTypes],
+        )
 
-            skip = (criteria.page - 1) * criteria.pageSize
-            limit = criteria.pageSize
-            order = criteria.direction.value.upper()
+    @staticmethod
+    def _sort_keys(criteria: DatasetFilter) -> Tuple[List[str], str]:
+        """
+        Return the dataset properties to sort by and the sort direction.
+
+        ``id`` always closes the keys so that the order is total, which
+        cursor pagination relies on.  Without ``orderBy`` datasets are
+        sorted by ascending ``id``.
+        """
+        if not criteria.orderBy:
+            return ["id"], "ASC"
+        keys: List[str] = []
+        for field in criteria.orderBy:
+            if field.value not in keys:
+                keys.append(field.value)
+        if "id" in keys:
+            keys = keys[:keys.index("id")]
+        return keys + ["id"], criteria.direction.value.upper()
+
+    @staticmethod
+    def _seek_clause(alias: str, keys: List[str], order: str, values: List[Any]) -> Tuple[str, dict]:
+        """
+        Return a WHERE predicate + params selecting the datasets sorted after
+        the one whose sort-key values are *values*.
 
-            def _order_expr(field: DatasetSortField) -> str:
-                if field.value == "datePublished":
-                    return f"n.`datePublished` {order}"
-                return f"n.`{field.value}` {order}"
+        Follows the Neo4j ordering, in which nulls come last in ascending
+        and first in descending order.  ``id`` (the last key) is never null,
+        so sorting by ``id`` alone becomes a plain range seek on its index.
+        """
+        last = len(keys) - 1
+        params = {f"after{last}": values[last]}
+        clause = f"{alias}.id {'>' if order == 'ASC' else '<'} $after{last}"
+        for i in reversed(range(last)):
+            prop, param = f"{alias}.`{keys[i]}`", f"$after{i}"
+            params[f"after{i}"] = values[i]
+            if order == "ASC" and values[i] is None:
+                clause = f"({prop} IS NULL AND {clause})"
+            elif order == "ASC":
+                clause = f"({prop} > {param} OR {prop} IS NULL OR ({prop} = {param} AND {clause}))"
+            elif values[i] is None:
+                clause = f"({prop} IS NOT NULL OR {clause})"
+            else:
+                clause = f"({prop} < {param} OR ({prop} = {param} AND {clause}))"
+        return clause, params
+
+    async def count(self, criteria: DatasetFilter) -> int:
+        """Return the number of datasets matching *criteria*, ignoring pagination."""
+        count_query = f"""//cypher
+        MATCH (m:`sc:Dataset`)
+        WHERE {self._FILTER_WHERE.format(alias="m")}
+        RETURN count(DISTINCT m) AS total
+        """
+        count_result = await self._session.run(count_query, **self._filter_params(criteria))
+        count_record = await count_result.single()
+        return count_record["total"] if count_record else 0
 
-            order_clause = (
-                ", ".join([_order_expr(k) for k in criteria.orderBy])
-                if criteria.orderBy else "n.id ASC"
-            )
+    async def list(self, criteria: DatasetFilter) -> List[Dataset]:
+        keys, order = self._sort_keys(criteria)
+        ordering = [f"{k}:{order.lower()}" for k in keys]
+        # Decoded outside the try block so that a bad cursor surfaces as a
+        # ValidationError instead of an error dict.
+        after = decode_cursor(criteria.after, ordering) if criteria.after else None
 
-            node_labels = [t.value for t in criteria.types]
-            mime_type_values = [mt.value for mt in criteria.mimeTypes]
+        try:
+            t0 = time.monotonic()
 
-            filter_where = """(
-                $nodeIds = []
-                OR {alias}.id IN $nodeIds
-                OR EXISTS {{ MATCH (c)-[:VIRTUAL_BELONGS_TO]->({alias}) WHERE c.id IN $nodeIds }}
-            )
-            AND ($publishedDateFrom IS NULL OR {alias}.datePublished >= $publishedDateFrom)
-            AND ($publishedDateTo IS NULL OR {alias}.datePublished <= $publishedDateTo)
-            AND ($status IS NULL OR {alias}.status = $status)
-            AND (
-                ($nodeLabels = [] AND $mimeTypeValues = [])
-                OR EXISTS {{
-                    MATCH path=({alias})-[*1..4]-(x)
-                    WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
-                    AND (ANY(t IN $nodeLabels WHERE t IN labels(x)) OR x.encodingFormat IN $mimeTypeValues)
-                }}
-            )"""
-
-            base_params = dict(
-                nodeIds=criteria.nodeIds or [],
-                publishedDateFrom=criteria.publishedFrom.isoformat(
-                ) if criteria.publishedFrom else None,
-                publishedDateTo=criteria.publishedTo.isoformat() if criteria.publishedTo else None,
-                status=criteria.status.value if criteria.status is not None else None,
-                nodeLabels=node_labels,
-                mimeTypeValues=mime_type_values,
-                forbiddenEdges=self.FORBIDDEN_EDGES,
-            )
+            skip = 0 if after is not None else (criteria.page - 1) * criteria.pageSize
+            limit = criteria.pageSize
+            order_clause = ", ".join(f"n.`{k}` {order}" for k in keys)
+            sort_key = ", ".join(f"n.`{k}`" for k in keys)
 
-            # ---------------- COUNT query ----------------
-            count_query = f"""//cypher
-            MATCH (m:`sc:Dataset`)
-            WHERE {filter_where.format(alias="m")}
-            RETURN count(DISTINCT m) AS total
-            """
+            where = self._FILTER_WHERE.format(alias="n")
+            params = self._filter_params(criteria)
+            if after is not None:
+                seek, seek_params = self._seek_clause("n", keys, order, after)
+                where = f"{where}\n    AND {seek}"
+                params.update(seek_params)
 
             t1 = time.monotonic()
 
-            count_result = await self._session.run(count_query, **base_params)
-            count_record = await count_result.single()
-            total: int = count_record["total"] if count_record else 0
-
-            if total == 0 or skip >= total:
-                return {
-                    "datasets": [],
-                    "page": criteria.page,
-                    "pageSize": criteria.pageSize,
-                    "total": total,
-                }
+            # ---------------- COUNT query (optional) ----------------
+            total: Optional[int] = None
+            if criteria.includeTotal:
+                total = await self.count(criteria)
+                if total == 0 or (after is None and skip >= total):
+                    return {
+                        "datasets": [],
+                        "page": criteria.page,
+                        "pageSize": criteria.pageSize,
+                        "total": total,
+                        "nextCursor": None,
+                    }
 
             # ---------------- PAGINATED IDs query ----------------
+            # One extra row tells whether a next page exists.
             ids_query = f"""//cypher
             MATCH (n:`sc:Dataset`)
-            WHERE {filter_where.format(alias="n")}
+            WHERE {where}
             WITH n
             ORDER BY {order_clause}
             SKIP $skip LIMIT $limit
-            RETURN n.id AS id
+            RETURN n.id AS id, [{sort_key}] AS sortKey
             """
 
-            ids: list[str] = []
             ids_result = await self._session.run(
-                ids_query, **base_params, skip=skip, limit=limit
+                ids_query, **params, skip=skip, limit=limit + 1
             )
-            async for record in ids_result:
-                ids.append(record["id"])
+            rows = [(record["id"], record["sortKey"]) async for record in ids_result]
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(ordering, rows[-1][1])
+            ids = [id_ for id_, _ in rows]
 
             t2 = time.monotonic()
 
@@ -377,6 +481,7 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
                 "page": criteria.page,
                 "pageSize": criteria.pageSize,
                 "total": total,
+                "nextCursor": next_cursor,
             }
 
         except Exception as e:
@@ -384,7 +489,15 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
             return {"error": str(e)}
 
     async def update(self, pg_json: Dataset) -> dict:
-        """Update properties of existing nodes."""
+        """Update properties of existing nodes and the facets they affect.
+
+        Raises:
+            ValidationError: if an updated node, merged onto its stored form,
+                fails schema validation.  Nothing is written in that case.
+        """
+        # Validated outside the try block so that an invalid patch surfaces as
+        # a ValidationError instead of an error dict.
+        await self._validate_patch(pg_json)
         try:
             batch = [
                 {
@@ -396,12 +509,20 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
 
             cypher_query = """
                     UNWIND $batch AS row
-                    MATCH (n { id: row.id })
+                    MATCH (n:MomaNode { id: row.id })
                     SET n += row.properties
                     RETURN count(n) AS updated
                     """
             result = await self._session.run(cypher_query, {"batch": batch})
             record = await result.single()
+
+            changed = [str(row["id"]) for row in batch
+                       if "encodingFormat" in row["properties"]]
+            if changed:
+                owners = await self.resolve_owning_datasets(changed)
+                await self._refresh_dataset_facets(
+                    self._session, [d for ids in owners.values() for d in ids])
+
             return {
                 "status": "success",
                 "updated": record["updated"]
@@ -409,3 +530,28 @@ class Neo4jDatasetRepository(Neo4jPgJsonMixin):
         except Exception as e:
             logger.error("Neo4j update failed: %s", e)
             return {"error": str(e), "updated": "0"}
+
+    async def _validate_patch(self, pg_json: Dataset) -> None:
+        """Validate the nodes of an update against their stored form only."""
+        result = await self._session.run(
+            """//cypher
+            MATCH (n:MomaNode) WHERE n.id IN $ids
+            RETURN n
+            """,
+            ids=[str(node.id) for node in pg_json.nodes],
+        )
+        stored = [self._deserialize_node(record["n"]) async for record in result]
+        known = {n["id"] for n in stored}
+        base = Dataset.model_construct(nodes=[
+            Node.model_construct(id=UUID(n["id"]), labels=n["labels"], properties=n["properties"])
+            for n in stored
+        ], edges=[])
+        # Unknown ids are not written by the update and not validated here.
+        # Labels are not written either, so only the properties are patched.
+        errors = IncrementalGraphValidator(base).validate(nodes=[
+            node.model_dump(mode="json", include={"id", "properties"})
+            for node in pg_json.nodes if str(node.id) in known
+        ])
+        if errors:
+            raise ValidationError(
+                f"Dataset update failed schema validation: {errors}")
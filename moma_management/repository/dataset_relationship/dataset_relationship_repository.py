@@ -28,8 +28,19 @@ class DatasetRelationshipRepository(Protocol):
         """Return the root ID of an existing relationship between the two datasets, if any."""
         ...
 
-    async def list_for_dataset(self, dataset_id: str) -> List[DatasetRelationship]:
-        """Return every DatasetRelationship whose root directly targets *dataset_id*."""
+    async def list_for_dataset(
+        self,
+        dataset_id: str,
+        accessible_dataset_ids: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[DatasetRelationship]:
+        """Return the DatasetRelationships whose root directly targets *dataset_id*.
+
+        Results are ordered by root ID; *skip* / *limit* select a page of them.
+        When *accessible_dataset_ids* is provided, only relationships whose
+        two datasets are both in that set are returned.
+        """
         ...
 
     async def delete_referencing(self, dataset_id: str) -> None:
@@ -1,12 +1,9 @@
 from logging import getLogger
-from typing import Any, Dict, List, Optional
-from uuid import UUID
+from typing import Any, List, Optional
 
 from neo4j import AsyncSession
 
 from moma_management.domain.dataset_relationship import DatasetRelationship
-from moma_management.domain.generated.edges.edge_schema import Edge
-from moma_management.domain.generated.nodes.node_schema import Node
 from moma_management.repository.dataset_relationship.dataset_relationship_repository import (
     DatasetRelationshipRepository,
 )
@@ -34,6 +31,23 @@ class Neo4jDatasetRelationshipRepository(Neo4jPgJsonMixin, DatasetRelationshipRe
     ]
     _indexes_ensured: bool = False
 
+    # Continues a query that has bound ``root`` (one row per relationship):
+    # collects each relationship's subgraph, without crossing HAS_TARGET, as
+    # lightweight node and edge maps.
+    _SUBGRAPH_PROJECTION: str = Neo4jPgJsonMixin._bfs_subgraph(4) + """
+            UNWIND subgraph AS a
+            OPTIONAL MATCH (a)-[r]->(b)
+            WHERE b IN subgraph AND NOT type(r) IN $forbiddenEdges
+            WITH root, subgraph,
+                 collect(DISTINCT {from: startNode(r).id, to: endNode(r).id,
+                                   type: type(r), props: properties(r)}) AS edgeMaps
+
+            RETURN root.id AS relationshipId,
+                   [x IN subgraph | {id: x.id, labels: labels(x), props: properties(x)}] AS node_maps,
+                   [e IN edgeMaps WHERE e.from IS NOT NULL] AS edge_maps
+            ORDER BY relationshipId
+    """
+
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
@@ -41,7 +55,7 @@ class Neo4jDatasetRelationshipRepository(Neo4jPgJsonMixin, DatasetRelationshipRe
     async def create_with_indexes(cls, session: AsyncSession) -> "Neo4jDatasetRelationshipRepository":
         repo = cls(session)
         if not cls._indexes_ensured:
-            for stmt in cls._INDEX_STATEMENTS:
+            for stmt in cls._BASE_INDEX_STATEMENTS + cls._INDEX_STATEMENTS:
                 await session.run(stmt)
             cls._indexes_ensured = True
             logger.info("Neo4jDatasetRelationshipRepository indexes ensured")
@@ -52,8 +66,8 @@ class Neo4jDatasetRelationshipRepository(Neo4jPgJsonMixin, DatasetRelationshipRe
     # ------------------------------------------------------------------
 
     async def create(self, relationship: DatasetRelationship) -> None:
-        """Store the full DatasetRelationship subgraph using the mixin's MERGE/SET helpers."""
-        await self._session.execute_write(self.create_pgson, relationship)
+        """Store the full DatasetRelationship subgraph using the mixin's batched UNWIND writer."""
+        await self._session.execute_write(self.create_pgson_bulk, relationship)
 
     async def delete(self, relationship_id: str) -> None:
         """Delete the relationship and its connected subgraph; leaves dataset nodes intact."""
@@ -97,18 +111,41 @@ class Neo4jDatasetRelationshipRepository(Neo4jPgJsonMixin, DatasetRelationshipRe
     # Read
     # ------------------------------------------------------------------
 
-    async def list_for_dataset(self, dataset_id: str) -> List[DatasetRelationship]:
-        """Return every DatasetRelationship whose root directly targets *dataset_id*."""
+    async def list_for_dataset(
+        self,
+        dataset_id: str,
+        accessible_dataset_ids: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[DatasetRelationship]:
+        """Return the DatasetRelationships whose root directly targets *dataset_id*.
+
+        All subgraphs are loaded by a single query, ordered by root ID so
+        that *skip* / *limit* page through them consistently.  When
+        *accessible_dataset_ids* is provided, relationships targeting a
+        dataset outside that set are left out before paging.
+        """
+        page_clause = "SKIP $skip" + (" LIMIT $limit" if limit is not None else "")
+        query = f"""//cypher
+            MATCH (root:BasicDLElement)-[:HAS_TARGET]->(:`sc:Dataset` {{id: $datasetId}})
+            WHERE $accessibleIds IS NULL OR ALL(
+                targetId IN [(root)-[:HAS_TARGET]->(t:`sc:Dataset`) | t.id]
+                WHERE targetId IN $accessibleIds
+            )
+            WITH DISTINCT root
+            ORDER BY root.id
+            {page_clause}
+            {self._SUBGRAPH_PROJECTION}
+        """
         result = await self._session.run(
-            """//cypher
-            MATCH (root:BasicDLElement)-[:HAS_TARGET]->(:`sc:Dataset` {id: $datasetId})
-            RETURN root.id AS relationshipId
-            """,
+            query,
             datasetId=str(dataset_id),
+            accessibleIds=accessible_dataset_ids,
+            skip=skip,
+            limit=limit,
+            forbiddenEdges=self.FORBIDDEN_EDGES,
         )
-        relationship_ids = [record["relationshipId"] async for record in result]
-        relationships = [await self.get(rid) for rid in relationship_ids]
-        return [r for r in relationships if r is not None]
+        return [self._build_relationship(record) async for record in result]
 
     async def find_id_for_dataset_pair(self, dataset_id_a: str, dataset_id_b: str) -> Optional[str]:
         """Return the root ID of an existing relationship between the two datasets, if any."""
@@ -127,55 +164,15 @@ class Neo4jDatasetRelationshipRepository(Neo4jPgJsonMixin, DatasetRelationshipRe
 
     async def get(self, relationship_id: str) -> Optional[DatasetRelationship]:
         """Shallow retrieval: root + connected subgraph (excluding HAS_TARGET)."""
-        query = """//cypher
-            MATCH (root:BasicDLElement {id: $relationshipId})
-            OPTIONAL MATCH path=(root)-[*1..4]-(m)
-            WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
-            RETURN root, m, relationships(path) AS rels
+        query = f"""//cypher
+            MATCH (root:BasicDLElement {{id: $relationshipId}})
+            {self._SUBGRAPH_PROJECTION}
         """
         result = await self._session.run(
             query, relationshipId=str(relationship_id), forbiddenEdges=self.FORBIDDEN_EDGES)
-        rows = [record async for record in result]
-        if not rows:
-            return None
-
-        nodes: Dict[str, Any] = {}
-        edges: Dict[Any, Any] = {}
-
-        root = rows[0]["root"]
-        if root is None:
-            return None
-        nodes[root["id"]] = self._deserialize_node(root)
-
-        for record in rows:
-            m = record["m"]
-            rels = record["rels"] or []
-            if m:
-                mid = m["id"]
-                if mid not in nodes:
-                    nodes[mid] = self._deserialize_node(m)
-            for rel in rels:
-                key = (rel.start_node["id"], rel.end_node["id"], rel.type)
-                if key not in edges:
-                    edges[key] = self._deserialize_edge(rel)
-
-        valid_edges = [
-            e for e in edges.values()
-            if e["from"] in nodes and e["to"] in nodes
-        ]
-
-        node_objects = [
-            Node.model_construct(id=UUID(n["id"]), labels=n["labels"], properties=n["properties"])
-            for n in nodes.values()
-        ]
-        edge_objects: Optional[List[Edge]] = (
-            [
-                Edge.model_construct(
-                    from_=UUID(e["from"]), to=UUID(e["to"]),
-                    labels=e["labels"], properties=e.get("properties"),
-                )
-                for e in valid_edges
-            ]
-            if valid_edges else None
-        )
-        return DatasetRelationship.model_construct(nodes=node_objects, edges=edge_objects)
+        record = await result.single()
+        return self._build_relationship(record) if record else None
+
+    def _build_relationship(self, record: Any) -> DatasetRelationship:
+        nodes, edges = self._graph_from_maps(record["node_maps"], record["edge_maps"])
+        return DatasetRelationship.model_construct(nodes=nodes, edges=edges)
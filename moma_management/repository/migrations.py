@@ -0,0 +1,284 @@
+"""
+Versioned schema and data migrations for the Neo4j store.
+
+Migrations run once per database rather than once per worker: the versions
+already applied are recorded on a single ``MomaMigrationState`` node, and a
+lease stored on that same node ensures that only one process applies pending
+migrations while the others wait for it to finish.
+
+The runner is called from ``container_lifespan`` at start-up (unless
+``RUN_MIGRATIONS_ON_STARTUP=false``) and can also be run on its own, e.g. as a
+deployment job::
+
+    python -m moma_management.repository.migrations
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+from uuid import uuid4
+
+from neo4j import AsyncGraphDatabase, AsyncSession
+
+from moma_management.repository.analytical_pattern.neo4j_analytical_pattern_repository import (
+    Neo4jAnalyticalPatternRepository,
+)
+from moma_management.repository.backfill_base_label import backfill_base_label
+from moma_management.repository.dataset.neo4j_dataset_repository import (
+    Neo4jDatasetRepository,
+)
+from moma_management.repository.dataset_relationship.neo4j_dataset_relationship_repository import (
+    Neo4jDatasetRelationshipRepository,
+)
+from moma_management.repository.ml_model.neo4j_ml_model_repository import (
+    Neo4jMlModelRepository,
+)
+from moma_management.repository.neo4j_pgson_mixin import Neo4jPgJsonMixin
+from moma_management.repository.task.neo4j_task_repository import (
+    Neo4jTaskRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+_STATE_NAME = "schema"
+
+# A lease rather than a plain flag, so that a worker killed mid-migration does
+# not block every later start-up.  It is renewed before each migration.
+_LOCK_TTL_MS = 15 * 60 * 1000
+_LOCK_POLL_SECONDS = 2.0
+
+# Datasets processed per inner transaction of the VIRTUAL_BELONGS_TO backfill.
+_BACKFILL_DATASETS_PER_TX = 50
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[AsyncSession], Awaitable[None]]
+
+
+# ---------------------------------------------------------------------------
+# Migrations
+# ---------------------------------------------------------------------------
+
+
+async def _add_base_label(session: AsyncSession) -> None:
+    await backfill_base_label(session)
+
+
+async def _create_repository_indexes(session: AsyncSession) -> None:
+    repositories = [
+        Neo4jDatasetRepository,
+        Neo4jDatasetRelationshipRepository,
+        Neo4jAnalyticalPatternRepository,
+        Neo4jTaskRepository,
+        Neo4jMlModelRepository,
+    ]
+    for stmt in Neo4jPgJsonMixin._BASE_INDEX_STATEMENTS:
+        await session.run(stmt)
+    for repo in repositories:
+        for stmt in repo._INDEX_STATEMENTS:
+            await session.run(stmt)
+
+
+async def _backfill_virtual_belongs_to(session: AsyncSession) -> None:
+    # Uses MERGE so it is idempotent and safe to re-run.
+    await session.run(
+        """//cypher
+        MATCH (d:`sc:Dataset`)
+        CALL {
+            WITH d
+            MATCH path=(d)-[*1..4]-(m)
+            WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
+              AND m <> d
+            WITH DISTINCT d, m
+            MERGE (m)-[:VIRTUAL_BELONGS_TO]->(d)
+        } IN TRANSACTIONS OF $batchSize ROWS
+        """,
+        forbiddenEdges=Neo4jDatasetRepository.FORBIDDEN_EDGES,
+        batchSize=_BACKFILL_DATASETS_PER_TX,
+    )
+
+
+async def _backfill_dataset_facets(session: AsyncSession) -> None:
+    # Relies on the VIRTUAL_BELONGS_TO edges of migration 3; idempotent.
+    await session.run(
+        """//cypher
+        MATCH (d:`sc:Dataset`)
+        CALL {
+            WITH d
+            """ + Neo4jPgJsonMixin._SET_DATASET_FACETS + """
+        } IN TRANSACTIONS OF $batchSize ROWS
+        """,
+        batchSize=_BACKFILL_DATASETS_PER_TX,
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "add MomaNode base label", _add_base_label),
+    Migration(2, "create repository indexes", _create_repository_indexes),
+    Migration(3, "backfill VIRTUAL_BELONGS_TO edges",
+              _backfill_virtual_belongs_to),
+    Migration(4, "backfill dataset facets", _backfill_dataset_facets),
+]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+async def _ensure_state(session: AsyncSession) -> None:
+    # The constraint makes concurrent MERGEs of the state node converge on a
+    # single node.
+    await session.run(
+        "CREATE CONSTRAINT moma_migration_state_name IF NOT EXISTS "
+        "FOR (n:MomaMigrationState) REQUIRE n.name IS UNIQUE"
+    )
+    await session.run(
+        """//cypher
+        MERGE (s:MomaMigrationState {name: $name})
+        ON CREATE SET s.applied = []
+        """,
+        name=_STATE_NAME,
+    )
+
+
+async def _applied_versions(session: AsyncSession) -> set[int]:
+    result = await session.run(
+        "MATCH (s:MomaMigrationState {name: $name}) RETURN s.applied AS applied",
+        name=_STATE_NAME,
+    )
+    record = await result.single()
+    return set(record["applied"] or []) if record else set()
+
+
+async def _try_lock(session: AsyncSession, owner: str) -> bool:
+    async def _tx(tx) -> bool:
+        # Touching the node first takes its write lock, so concurrent workers
+        # serialise here and each sees the lease written by the previous one.
+        result = await tx.run(
+            """//cypher
+            MATCH (s:MomaMigrationState {name: $name})
+            SET s.lockProbe = timestamp()
+            WITH s
+            WHERE s.lockedUntil IS NULL
+               OR s.lockedUntil < timestamp()
+               OR s.lockedBy = $owner
+            SET s.lockedBy = $owner, s.lockedUntil = timestamp() + $ttl
+            RETURN s.lockedBy AS owner
+            """,
+            name=_STATE_NAME, owner=owner, ttl=_LOCK_TTL_MS,
+        )
+        return await result.single() is not None
+
+    return await session.execute_write(_tx)
+
+
+async def _unlock(session: AsyncSession, owner: str) -> None:
+    await session.run(
+        """//cypher
+        MATCH (s:MomaMigrationState {name: $name, lockedBy: $owner})
+        SET s.lockedBy = null, s.lockedUntil = null
+        """,
+        name=_STATE_NAME, owner=owner,
+    )
+
+
+async def _record(session: AsyncSession, migration: Migration) -> None:
+    await session.run(
+        """//cypher
+        MATCH (s:MomaMigrationState {name: $name})
+        SET s.applied = s.applied + $version, s.updatedAt = datetime()
+        """,
+        name=_STATE_NAME, version=migration.version,
+    )
+
+
+async def run_migrations(
+    session: AsyncSession,
+    migrations: Optional[List[Migration]] = None,
+    wait_timeout: float = 30 * 60,
+) -> List[int]:
+    """
+    Apply every migration that has not been recorded yet, in version order.
+
+    Only the process holding the migration lease applies migrations; other
+    processes poll until the holder releases it (or *wait_timeout* seconds
+    elapse) and then return without applying anything themselves.
+
+    Args:
+        session:      Neo4j session.  Must allow auto-commit transactions, which
+                      batched ``CALL { ... } IN TRANSACTIONS`` backfills need.
+        migrations:   Migrations to consider; defaults to :data:`MIGRATIONS`.
+        wait_timeout: Maximum number of seconds to wait for another process.
+
+    Returns:
+        The versions applied by this call.
+    """
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+    owner = str(uuid4())
+    await _ensure_state(session)
+
+    deadline = time.monotonic() + wait_timeout
+    while True:
+        applied = await _applied_versions(session)
+        pending = [m for m in migrations if m.version not in applied]
+        if not pending:
+            return []
+        if await _try_lock(session, owner):
+            break
+        if time.monotonic() > deadline:
+            logger.warning(
+                "Timed out waiting for migrations run by another process, "
+                "continuing without them")
+            return []
+        await asyncio.sleep(_LOCK_POLL_SECONDS)
+
+    done: List[int] = []
+    try:
+        # Re-read under the lock: another process may have finished meanwhile.
+        applied = await _applied_versions(session)
+        for migration in migrations:
+            if migration.version in applied:
+                continue
+            await _try_lock(session, owner)  # renew the lease
+            logger.info("Applying migration %d: %s",
+                        migration.version, migration.name)
+            t0 = time.monotonic()
+            await migration.apply(session)
+            await _record(session, migration)
+            done.append(migration.version)
+            logger.info("Migration %d applied in %.1fs",
+                        migration.version, time.monotonic() - t0)
+    finally:
+        await _unlock(session, owner)
+    return done
+
+
+async def main() -> int:
+    driver = AsyncGraphDatabase.driver(
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        auth=(
+            os.getenv("NEO4J_USER", "neo4j"),
+            os.getenv("NEO4J_PASSWORD", "datagems"),
+        ),
+    )
+    try:
+        async with driver.session() as session:
+            applied = await run_migrations(session)
+        logger.info("Applied migrations: %s", applied or "none")
+    except RuntimeError as e:
+        logger.error("%s", e)
+        return 1
+    finally:
+        await driver.close()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
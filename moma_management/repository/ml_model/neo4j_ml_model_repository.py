@@ -29,7 +29,7 @@ class Neo4jMlModelRepository(Neo4jPgJsonMixin, MlModelRepository):
     async def create_with_indexes(cls, session: AsyncSession) -> "Neo4jMlModelRepository":
         repo = cls(session)
         if not cls._indexes_ensured:
-            for stmt in cls._INDEX_STATEMENTS:
+            for stmt in cls._BASE_INDEX_STATEMENTS + cls._INDEX_STATEMENTS:
                 await session.run(stmt)
             cls._indexes_ensured = True
             logger.info("Neo4jMlModelRepository indexes ensured")
@@ -1,7 +1,9 @@
 import json
+from collections import defaultdict
 from datetime import date as date_type
 from logging import getLogger
-from typing import Any, Dict, List, LiteralString, Optional, cast
+from typing import Any, Dict, Iterator, List, LiteralString, Optional, cast
+from uuid import UUID
 
 import arrow
 from neo4j import AsyncManagedTransaction
@@ -34,6 +36,29 @@ _DATE_FORMATS = [
 
 _JSON_PREFIX = "__json__:"
 
+# Label carried by every node written through the mixin, in addition to its
+# PG-JSON labels.  Backed by a uniqueness constraint on ``id`` so that all
+# id lookups can be anchored on it instead of scanning every node.
+BASE_LABEL = "MomaNode"
+
+# Facets denormalised on each ``sc:Dataset`` root node: the labels and the
+# encoding formats found among its child nodes.  They let the dataset list
+# filter by type and MIME type without traversing every subgraph, and are
+# internal, i.e. never returned as node properties.
+FACET_LABELS_PROP = "_facetLabels"
+FACET_ENCODING_FORMATS_PROP = "_facetEncodingFormats"
+_INTERNAL_PROPS = frozenset({FACET_LABELS_PROP, FACET_ENCODING_FORMATS_PROP})
+
+# Edge types linking a dataset to other entities (APs, ML models,
+# DatasetRelationships) rather than to its own nodes: dataset ownership,
+# recorded by VIRTUAL_BELONGS_TO edges, never crosses them.
+DATASET_BOUNDARY_EDGES: list[str] = ["fitted_on", "input",
+                                     "output", "perform_inference", "trained_on",
+                                     "VIRTUAL_BELONGS_TO", "HAS_TARGET"]
+
+# Depth of a dataset subgraph, in hops from its root.
+DATASET_MAX_HOPS = 4
+
 
 def _maybe_decode_json(value: Any) -> Any:
     if isinstance(value, str) and value.startswith(_JSON_PREFIX):
@@ -41,6 +66,12 @@ def _maybe_decode_json(value: Any) -> Any:
     return value
 
 
+def _chunked(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield consecutive slices of *rows* holding at most *size* items."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
 def _to_iso_date(value: Any) -> str | Any:
     if isinstance(value, date_type):
         return value.isoformat()
@@ -66,6 +97,93 @@ class Neo4jPgJsonMixin:
     (colon namespace separators encoded as double-underscore).
     """
 
+    # Maximum number of rows sent in a single ``UNWIND $rows`` statement by
+    # :meth:`create_pgson_bulk`.  Bounds the parameter payload (and the
+    # transaction state built per statement) for very large graphs.
+    write_batch_size: int = 1000
+
+    # Schema statements shared by every repository, run by each
+    # ``create_with_indexes`` before its own ``_INDEX_STATEMENTS``.
+    _BASE_INDEX_STATEMENTS: list[str] = [
+        "CREATE CONSTRAINT moma_node_id_unique IF NOT EXISTS "
+        f"FOR (n:{BASE_LABEL}) REQUIRE n.id IS UNIQUE",
+    ]
+
+    # Continues a query in which the dataset root ``d`` is bound and
+    # recomputes its facets from its VIRTUAL_BELONGS_TO children.
+    _SET_DATASET_FACETS: str = f"""
+        OPTIONAL MATCH (c)-[:VIRTUAL_BELONGS_TO]->(d)
+        WITH d, collect(DISTINCT c) AS children
+        SET d.{FACET_LABELS_PROP} = reduce(
+                acc = [], c IN children |
+                acc + [l IN labels(c) WHERE l <> '{BASE_LABEL}' AND NOT l IN acc]),
+            d.{FACET_ENCODING_FORMATS_PROP} = reduce(
+                acc = [], c IN children |
+                CASE WHEN c.encodingFormat IS NULL OR c.encodingFormat IN acc
+                     THEN acc ELSE acc + c.encodingFormat END)
+    """
+
+    # One round of ownership propagation: links each node of $nodeIds to the
+    # datasets that own (or are) one of its neighbours across a non-boundary
+    # edge, and returns what it linked.
+    _LINK_TO_OWNERS_QUERY: str = """//cypher
+        UNWIND $nodeIds AS nodeId
+        MATCH (n:MomaNode {id: nodeId})
+        WHERE NOT n:`sc:Dataset`
+        MATCH (n)-[r]-(m)
+        WHERE NOT type(r) IN $boundaryEdges
+        UNWIND CASE WHEN m:`sc:Dataset` THEN [m]
+                    ELSE [(m)-[:VIRTUAL_BELONGS_TO]->(o:`sc:Dataset`) | o] END AS d
+        WITH DISTINCT n, d
+        WHERE NOT EXISTS { (n)-[:VIRTUAL_BELONGS_TO]->(d) }
+        MERGE (n)-[:VIRTUAL_BELONGS_TO]->(d)
+        RETURN count(*) AS linked, collect(DISTINCT d.id) AS datasetIds
+    """
+
+    async def _link_to_owning_datasets(self, runner: Any, node_ids: List[str]) -> List[str]:
+        """
+        Add the VIRTUAL_BELONGS_TO edges that *node_ids* are missing.
+
+        Meant for nodes that just gained edges: a node belongs to every
+        dataset owning (or being) one of its neighbours across an edge not
+        in :data:`DATASET_BOUNDARY_EDGES`.  Ownership spreads one hop per
+        round, so chains of new nodes are linked within
+        :data:`DATASET_MAX_HOPS` rounds.  The facets of the datasets that
+        gained nodes are refreshed, and their ids returned.
+        """
+        node_ids = list(dict.fromkeys(node_ids))
+        dataset_ids: Dict[str, None] = {}
+        for _ in range(DATASET_MAX_HOPS if node_ids else 0):
+            result = await runner.run(
+                self._LINK_TO_OWNERS_QUERY,
+                nodeIds=node_ids,
+                boundaryEdges=DATASET_BOUNDARY_EDGES,
+            )
+            record = await result.single()
+            if not record or not record["linked"]:
+                break
+            dataset_ids.update(dict.fromkeys(record["datasetIds"]))
+        await self._refresh_dataset_facets(runner, list(dataset_ids))
+        return list(dataset_ids)
+
+    async def _refresh_dataset_facets(self, runner: Any, dataset_ids: List[str]) -> None:
+        """
+        Recompute the facets of the datasets *dataset_ids*.
+
+        *runner* is the session or transaction the change is written in.
+        Must be called after any write that adds, removes or changes the
+        labels or ``encodingFormat`` of a dataset child node.
+        """
+        if not dataset_ids:
+            return
+        await runner.run(
+            """//cypher
+            UNWIND $datasetIds AS datasetId
+            MATCH (d:`sc:Dataset` {id: datasetId})
+            """ + self._SET_DATASET_FACETS,
+            datasetIds=list(dict.fromkeys(dataset_ids)),
+        )
+
     @staticmethod
     def _sanitize_properties(props: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -121,7 +239,8 @@ class Neo4jPgJsonMixin:
         Store a single PG-JSON node in Neo4j using MERGE/SET.
 
         Creates or updates a node identified by its ``id`` property,
-        assigning all provided labels and properties.
+        assigning the :data:`BASE_LABEL` plus all provided labels and
+        properties.
 
         Args:
             tx:   Neo4j write transaction.
@@ -131,12 +250,14 @@ class Neo4jPgJsonMixin:
             Exception: If the Neo4j operation fails.
         """
         node_id = str(node.id)
-        labels = ":".join(self._escape_labels(node.labels))
         props = self._sanitize_properties(node.properties)
         props["id"] = node_id
 
         prop_assignments = ", ".join(f"{k}: ${k}" for k in props.keys())
-        query = f"MERGE (n:{labels} {{id: $id}}) SET n += {{{prop_assignments}}}"
+        query = f"MERGE (n:{BASE_LABEL} {{id: $id}})"
+        if node.labels:
+            query += f" SET n:{':'.join(self._escape_labels(node.labels))}"
+        query += f" SET n += {{{prop_assignments}}}"
 
         await tx.run(cast(LiteralString, query), props)
 
@@ -169,8 +290,8 @@ class Neo4jPgJsonMixin:
         )
 
         query = f"""
-        MATCH (a {{id: $from_id}})
-        MATCH (b {{id: $to_id}})
+        MATCH (a:{BASE_LABEL} {{id: $from_id}})
+        MATCH (b:{BASE_LABEL} {{id: $to_id}})
         MERGE (a)-[r:{labels}]->(b)
         """
 
@@ -192,7 +313,8 @@ class Neo4jPgJsonMixin:
 
         Reverses the key sanitisation applied at write time:
         - ``__`` in property keys is restored to ``:``
-        - Labels are returned as-is (Neo4j stores them without backticks)
+        - Labels are returned as-is (Neo4j stores them without backticks),
+          minus the internal :data:`BASE_LABEL`
         - ``None``-valued properties are excluded (Neo4j never persists them)
 
         Args:
@@ -207,10 +329,14 @@ class Neo4jPgJsonMixin:
             k.replace("__", ":"): _maybe_decode_json(v)
             for k, v in dict(neo4j_node).items()
             if v is not None and k != "id" and k not in ignore_props
+            and k not in _INTERNAL_PROPS
         }
         return {
             "id": neo4j_node["id"],
-            "labels": [lbl.replace("__", ":") for lbl in neo4j_node.labels],
+            "labels": [
+                lbl.replace("__", ":") for lbl in neo4j_node.labels
+                if lbl != BASE_LABEL
+            ],
             "properties": properties,
         }
 
@@ -244,7 +370,12 @@ class Neo4jPgJsonMixin:
             "properties": properties,
         }
 
-    async def create_pgson(self, tx: AsyncManagedTransaction, pg_json: MoMaGraphModel) -> None:
+    async def create_pgson(
+        self,
+        tx: AsyncManagedTransaction,
+        pg_json: MoMaGraphModel,
+        link_owners: bool = True,
+    ) -> None:
         """
         Store an entire PG-JSON structure (nodes then edges) in Neo4j.
 
@@ -252,8 +383,11 @@ class Neo4jPgJsonMixin:
         both endpoints.
 
         Args:
-            tx:      Neo4j write transaction.
-            pg_json: A :class:`MoMaGraphModel` with ``nodes`` and optional ``edges``.
+            tx:          Neo4j write transaction.
+            pg_json:     A :class:`MoMaGraphModel` with ``nodes`` and optional ``edges``.
+            link_owners: Link the endpoints of the written edges to the
+                         datasets they now belong to (see
+                         :meth:`_link_to_owning_datasets`).
 
         Raises:
             Exception: If any Neo4j operation fails.
@@ -262,6 +396,95 @@ class Neo4jPgJsonMixin:
             await self.create_pgson_node(tx, node)
         for edge in pg_json.edges or []:
             await self.create_pgson_edge(tx, edge)
+        if link_owners:
+            await self._link_to_owning_datasets(tx, self._ownership_candidates(pg_json))
+
+    async def create_pgson_bulk(
+        self,
+        tx: AsyncManagedTransaction,
+        pg_json: MoMaGraphModel,
+        batch_size: Optional[int] = None,
+        link_owners: bool = True,
+    ) -> None:
+        """
+        Store an entire PG-JSON structure using batched ``UNWIND`` statements.
+
+        Equivalent to :meth:`create_pgson`, but nodes are grouped by label set
+        and edges by relationship type so that each group is written with one
+        parameterised ``UNWIND $rows`` statement per chunk instead of one
+        statement per element.  All nodes are written before any edge.
+
+        Args:
+            tx:          Neo4j write transaction.
+            pg_json:     A :class:`MoMaGraphModel` with ``nodes`` and optional ``edges``.
+            batch_size:  Maximum rows per statement; defaults to
+                         :attr:`write_batch_size`.
+            link_owners: Link the endpoints of the written edges to the
+                         datasets they now belong to (see
+                         :meth:`_link_to_owning_datasets`).  Dataset writes,
+                         which link every node to their root themselves,
+                         turn it off.
+
+        Raises:
+            Exception: If any Neo4j operation fails.
+        """
+        size = batch_size or self.write_batch_size
+
+        node_groups: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for node in pg_json.nodes:
+            node_id = str(node.id)
+            props = self._sanitize_properties(node.properties)
+            props["id"] = node_id
+            node_groups[tuple(node.labels)].append(
+                {"id": node_id, "props": props})
+
+        for labels, rows in node_groups.items():
+            label_expr = ":".join(self._escape_labels([BASE_LABEL, *labels]))
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (n:{BASE_LABEL} {{id: row.id}})
+            SET n:{label_expr}
+            SET n += row.props
+            """
+            for chunk in _chunked(rows, size):
+                await tx.run(cast(LiteralString, query), rows=chunk)
+
+        edge_groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for edge in pg_json.edges or []:
+            # Edge type labels: encode "/" as "___" to keep Cypher valid
+            rel_type = ":".join(
+                f"`{lbl.value.replace('/', '___')}`" for lbl in edge.labels
+            )
+            props = self._sanitize_properties(
+                edge.properties.model_dump(exclude_none=True, by_alias=True)
+                if edge.properties is not None else {}
+            )
+            edge_groups[rel_type].append(
+                {"from_id": str(edge.from_), "to_id": str(edge.to), "props": props})
+
+        for rel_type, rows in edge_groups.items():
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (a:{BASE_LABEL} {{id: row.from_id}})
+            MATCH (b:{BASE_LABEL} {{id: row.to_id}})
+            MERGE (a)-[r:{rel_type}]->(b)
+            SET r += row.props
+            """
+            for chunk in _chunked(rows, size):
+                await tx.run(cast(LiteralString, query), rows=chunk)
+
+        if link_owners:
+            await self._link_to_owning_datasets(tx, self._ownership_candidates(pg_json))
+
+    @staticmethod
+    def _ownership_candidates(pg_json: MoMaGraphModel) -> List[str]:
+        """Return the endpoints of the edges of *pg_json* that carry dataset ownership."""
+        return [
+            str(node_id)
+            for edge in pg_json.edges or []
+            if any(lbl.value not in DATASET_BOUNDARY_EDGES for lbl in edge.labels)
+            for node_id in (edge.from_, edge.to)
+        ]
 
     def _build_dataset(self, root: Any, node_lists: List, rel_lists: List) -> MoMaGraphModel:
         """
@@ -368,6 +591,82 @@ class Neo4jPgJsonMixin:
 
         return results
 
+    @staticmethod
+    def _bfs_subgraph(max_hops: int = 4) -> str:
+        """
+        Return Cypher that collects the nodes within *max_hops* of ``root``.
+
+        The fragment continues a query in which ``root`` is bound and binds
+        ``root, subgraph`` (``root`` included) without crossing any edge whose
+        type is in ``$forbiddenEdges``.  Unlike a variable-length
+        ``(root)-[*1..n]-(m)`` match, the expansion is breadth-first over
+        distinct nodes: each hop only expands the nodes first reached by the
+        previous one, so the work grows with the size of the subgraph rather
+        than with the number of paths through it.
+        """
+        hops = "".join(
+            f"""
+            // Hop {hop}
+            UNWIND CASE WHEN size(frontier) > 0 THEN frontier ELSE [null] END AS f
+            OPTIONAL MATCH (f)-[r]-(x)
+            WHERE NOT type(r) IN $forbiddenEdges AND NOT x IN subgraph
+            WITH root, subgraph, collect(DISTINCT x) AS frontier
+            WITH root, subgraph + frontier AS subgraph, frontier
+            """
+            for hop in range(1, max_hops + 1)
+        )
+        return f"""
+            WITH root, [root] AS subgraph, [root] AS frontier
+            {hops}
+            WITH root, subgraph
+        """
+
+    @staticmethod
+    def _graph_from_maps(
+        node_maps: List[Dict], edge_maps: List[Dict]
+    ) -> tuple[List[Node], Optional[List[Edge]]]:
+        """
+        Build unvalidated :class:`Node` / :class:`Edge` objects from
+        ``{id, labels, props}`` and ``{from, to, type, props}`` Cypher maps.
+
+        Nodes and edges are deduplicated, JSON-encoded property values are
+        decoded, and edges whose endpoints are not both present are
+        discarded.  Returns ``(nodes, edges)`` with ``edges`` set to ``None``
+        when there are none, ready for ``model_construct``.
+        """
+        nodes: Dict[str, Node] = {}
+        for m in node_maps:
+            nid = m["id"]
+            if nid in nodes:
+                continue
+            nodes[nid] = Node.model_construct(
+                id=UUID(nid),
+                labels=[lbl.replace("__", ":")
+                        for lbl in m["labels"] if lbl != BASE_LABEL],
+                properties={
+                    k.replace("__", ":"): _maybe_decode_json(v)
+                    for k, v in (m["props"] or {}).items()
+                    if v is not None and k != "id" and k not in _INTERNAL_PROPS
+                },
+            )
+
+        edges: Dict[tuple, Edge] = {}
+        for e in edge_maps:
+            key = (e["from"], e["to"], e["type"])
+            if key in edges or e["from"] not in nodes or e["to"] not in nodes:
+                continue
+            edges[key] = Edge.model_construct(
+                from_=UUID(e["from"]), to=UUID(e["to"]),
+                labels=[e["type"].replace("___", "/")],
+                properties={
+                    k.replace("__", ":"): _maybe_decode_json(v)
+                    for k, v in (e["props"] or {}).items()
+                    if v is not None
+                },
+            )
+
+        return list(nodes.values()), list(edges.values()) or None
+
     def _build_dataset_from_maps(
         self, node_maps: List[Dict], edge_maps: List[Dict]
     ) -> MoMaGraphModel:
@@ -386,11 +685,14 @@ class Neo4jPgJsonMixin:
                 properties = {
                     k.replace("__", ":"): v
                     for k, v in (m.get("props") or {}).items()
-                    if v is not None and k != "id"
+                    if v is not None and k != "id" and k not in _INTERNAL_PROPS
                 }
                 nodes_dict[nid] = {
                     "id": nid,
-                    "labels": [lbl.replace("__", ":") for lbl in m["labels"]],
+                    "labels": [
+                        lbl.replace("__", ":") for lbl in m["labels"]
+                        if lbl != BASE_LABEL
+                    ],
                     "properties": properties,
                 }
 
@@ -1,11 +1,15 @@
 from logging import getLogger
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
-from neo4j import AsyncSession
+from neo4j import AsyncManagedTransaction, AsyncSession
 
 from moma_management.domain.generated.nodes.node_schema import Node
-from moma_management.repository.neo4j_pgson_mixin import Neo4jPgJsonMixin
+from moma_management.repository.neo4j_pgson_mixin import (
+    DATASET_BOUNDARY_EDGES,
+    DATASET_MAX_HOPS,
+    Neo4jPgJsonMixin,
+)
 from moma_management.repository.node.node_repository import NodeRepository
 
 logger = getLogger(__name__)
@@ -29,7 +33,7 @@ class Neo4jNodeRepository(Neo4jPgJsonMixin, NodeRepository):
     async def get(self, node_id: str) -> Optional[Node]:
         """Retrieve a single node by its ID."""
         query = """//cypher
-            MATCH (n {id: $nodeId})
+            MATCH (n:MomaNode {id: $nodeId})
             RETURN n
         """
         result = await self._session.run(query, nodeId=str(node_id))
@@ -40,29 +44,87 @@ class Neo4jNodeRepository(Neo4jPgJsonMixin, NodeRepository):
         return Node.model_construct(id=UUID(data["id"]), labels=data["labels"], properties=data["properties"])
 
     async def update(self, node: Node) -> dict:
-        """Update properties of an existing node."""
+        """Update properties of an existing node (and the facets of its datasets)."""
         try:
             props = self._sanitize_properties(node.properties)
             query = """//cypher
-                MATCH (n {id: $nodeId})
+                MATCH (n:MomaNode {id: $nodeId})
                 SET n += $props
-                RETURN count(n) AS updated
+                WITH n
+                OPTIONAL MATCH (n)-[:VIRTUAL_BELONGS_TO]->(d:`sc:Dataset`)
+                RETURN count(DISTINCT n) AS updated, collect(d.id) AS datasetIds
             """
             result = await self._session.run(query, nodeId=str(node.id), props=props)
             record = await result.single()
             updated = record["updated"] if record else 0
+            if updated and "encodingFormat" in props:
+                await self._refresh_dataset_facets(self._session, record["datasetIds"])
             return {"status": "success", "updated": updated}
         except Exception as e:
             logger.error("Neo4j node update failed: %s", e)
             return {"error": str(e), "updated": 0}
 
     async def delete(self, node_id: str) -> int:
-        """Detach-delete a single node by ID. Returns 1 on success, 0 if not found."""
+        """
+        Detach-delete a single node by ID. Returns 1 on success, 0 if not found.
+
+        Nodes that only belonged to a dataset through the deleted one lose
+        their VIRTUAL_BELONGS_TO edge to it, in the same transaction.
+        """
+        return await self._session.execute_write(self._delete_node, str(node_id))
+
+    async def _delete_node(self, tx: AsyncManagedTransaction, node_id: str) -> int:
         query = """//cypher
-            MATCH (n {id: $nodeId})
+            MATCH (n:MomaNode {id: $nodeId})
+            OPTIONAL MATCH (n)-[:VIRTUAL_BELONGS_TO]->(d:`sc:Dataset`)
+            WITH n, collect(d.id) AS datasetIds
             DETACH DELETE n
-            RETURN 1 AS deleted
+            RETURN 1 AS deleted, datasetIds
         """
-        result = await self._session.run(query, nodeId=str(node_id))
+        result = await tx.run(query, nodeId=node_id)
         record = await result.single()
-        return record["deleted"] if record else 0
+        if record is None:
+            return 0
+        await self._unlink_unreachable(tx, record["datasetIds"])
+        # The deleted node no longer contributes to its datasets' facets.
+        await self._refresh_dataset_facets(tx, record["datasetIds"])
+        return record["deleted"]
+
+    async def _unlink_unreachable(self, tx: AsyncManagedTransaction, dataset_ids: List[str]) -> None:
+        """
+        Drop the VIRTUAL_BELONGS_TO edges of nodes no longer within
+        :data:`DATASET_MAX_HOPS` hops of the datasets *dataset_ids*.
+
+        Neighbours vouch for each other (a Field and its Statistics both
+        stay linked once their RecordSet is gone), so reachability is
+        recomputed from each root rather than checked one hop around the
+        deleted node.
+        """
+        if not dataset_ids:
+            return
+        result = await tx.run(
+            """//cypher
+            UNWIND $datasetIds AS datasetId
+            MATCH (root:`sc:Dataset` {id: datasetId})
+            """ + self._bfs_subgraph(DATASET_MAX_HOPS) + """
+            RETURN root.id AS datasetId, [m IN subgraph | m.id] AS reachable,
+                   [(x)-[:VIRTUAL_BELONGS_TO]->(root) | x.id] AS linked
+            """,
+            datasetIds=list(dict.fromkeys(dataset_ids)),
+            forbiddenEdges=DATASET_BOUNDARY_EDGES,
+        )
+        stale = []
+        async for record in result:
+            reachable = set(record["reachable"])
+            stale += [{"nodeId": n, "datasetId": record["datasetId"]}
+                      for n in record["linked"] if n not in reachable]
+        for start in range(0, len(stale), self.write_batch_size):
+            await tx.run(
+                """//cypher
+                UNWIND $stale AS row
+                MATCH (:MomaNode {id: row.nodeId})-[v:VIRTUAL_BELONGS_TO]->
+                      (:`sc:Dataset` {id: row.datasetId})
+                DELETE v
+                """,
+                stale=stale[start:start + self.write_batch_size],
+            )
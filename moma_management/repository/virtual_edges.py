@@ -0,0 +1,230 @@
+"""
+Consistency check of the ``VIRTUAL_BELONGS_TO`` shortcut edges.
+
+Every node of a dataset subgraph carries a ``VIRTUAL_BELONGS_TO`` edge to its
+dataset root.  The write APIs maintain them, but stores touched by hand or by
+an older release can miss some (*missing* edges) or keep some to datasets the
+node no longer belongs to (*dangling* edges).  Report them, or fix them with
+``--repair``, against the same Neo4j instance the service uses::
+
+    python -m moma_management.repository.virtual_edges [--repair]
+
+Connection settings are read from ``NEO4J_URI``, ``NEO4J_USER`` and
+``NEO4J_PASSWORD``.  Both checks only look one hop around each node: a node
+belongs to a dataset when a neighbour across a non-boundary edge is the
+dataset or belongs to it.  Repairs therefore run in passes, each spreading
+ownership by one hop, until one changes nothing or ``DATASET_MAX_HOPS``
+passes ran, rather than enumerating the ``[*1..4]`` paths of every dataset.
+Groups of stale nodes that only vouch for each other are not detected.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from typing import List, NamedTuple
+
+from neo4j import AsyncGraphDatabase, AsyncSession
+
+from moma_management.repository.neo4j_pgson_mixin import (
+    DATASET_BOUNDARY_EDGES,
+    DATASET_MAX_HOPS,
+    Neo4jPgJsonMixin,
+)
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BATCH_SIZE = 10_000
+
+# Yields (n, d) for each dataset d that n belongs to but is not linked to.
+_MISSING_MATCH = """
+    MATCH (n)-[r]-(m)
+    WHERE NOT type(r) IN $boundaryEdges
+    UNWIND CASE WHEN m:`sc:Dataset` THEN [m]
+                ELSE [(m)-[:VIRTUAL_BELONGS_TO]->(o:`sc:Dataset`) | o] END AS d
+    WITH DISTINCT n, d
+    WHERE NOT EXISTS { (n)-[:VIRTUAL_BELONGS_TO]->(d) }
+"""
+
+# Yields (v, d) for each VIRTUAL_BELONGS_TO edge v no neighbour backs up.
+_DANGLING_MATCH = """
+    MATCH (n)-[v:VIRTUAL_BELONGS_TO]->(d)
+    WHERE NOT d:`sc:Dataset` OR NOT EXISTS {
+        MATCH (n)-[r]-(m)
+        WHERE NOT type(r) IN $boundaryEdges
+          AND (m = d OR EXISTS { (m)-[:VIRTUAL_BELONGS_TO]->(d) })
+    }
+"""
+
+
+class VirtualEdgeReport(NamedTuple):
+    """Number of missing and dangling edges found (or fixed, when repairing)."""
+
+    missing: int
+    dangling: int
+
+
+async def _count(session: AsyncSession) -> VirtualEdgeReport:
+    result = await session.run(
+        """//cypher
+        MATCH (n:MomaNode)
+        WHERE NOT n:`sc:Dataset`
+        """ + _MISSING_MATCH + """
+        RETURN count(*) AS missing
+        """,
+        boundaryEdges=DATASET_BOUNDARY_EDGES,
+    )
+    record = await result.single()
+    missing = record["missing"] if record else 0
+
+    result = await session.run(
+        "//cypher" + _DANGLING_MATCH + "RETURN count(v) AS dangling",
+        boundaryEdges=DATASET_BOUNDARY_EDGES,
+    )
+    record = await result.single()
+    dangling = record["dangling"] if record else 0
+    return VirtualEdgeReport(missing or 0, dangling or 0)
+
+
+async def _repair_pass(session: AsyncSession, batch_size: int) -> tuple[VirtualEdgeReport, List[str]]:
+    # Collect first: edges merged while matching would back up nodes examined
+    # later in the same pass, spreading ownership more than one hop per pass
+    # and so past DATASET_MAX_HOPS.
+    result = await session.run(
+        """//cypher
+        MATCH (n:MomaNode)
+        WHERE NOT n:`sc:Dataset`
+        """ + _MISSING_MATCH + """
+        RETURN elementId(n) AS nodeId, elementId(d) AS datasetElementId, d.id AS datasetId
+        """,
+        boundaryEdges=DATASET_BOUNDARY_EDGES,
+    )
+    missing = [(r["nodeId"], r["datasetElementId"], r["datasetId"]) async for r in result]
+    await session.run(
+        """//cypher
+        UNWIND $pairs AS pair
+        CALL {
+            WITH pair
+            MATCH (n) WHERE elementId(n) = pair.nodeId
+            MATCH (d) WHERE elementId(d) = pair.datasetElementId
+            MERGE (n)-[:VIRTUAL_BELONGS_TO]->(d)
+        } IN TRANSACTIONS OF $batchSize ROWS
+        """,
+        pairs=[{"nodeId": node_id, "datasetElementId": ds_element_id}
+               for node_id, ds_element_id, _ in missing],
+        batchSize=batch_size,
+    )
+    linked = len(missing)
+    dataset_ids = list(dict.fromkeys(ds_id for _, _, ds_id in missing))
+
+    # Collect first: deleting while matching would let one removal
+    # withdraw the support of edges examined later in the same pass.
+    result = await session.run(
+        "//cypher" + _DANGLING_MATCH + "RETURN elementId(v) AS edgeId, d.id AS datasetId",
+        boundaryEdges=DATASET_BOUNDARY_EDGES,
+    )
+    dangling = [(r["edgeId"], r["datasetId"]) async for r in result]
+    await session.run(
+        """//cypher
+        UNWIND $edgeIds AS edgeId
+        CALL {
+            WITH edgeId
+            MATCH ()-[v:VIRTUAL_BELONGS_TO]->()
+            WHERE elementId(v) = edgeId
+            DELETE v
+        } IN TRANSACTIONS OF $batchSize ROWS
+        """,
+        edgeIds=[edge_id for edge_id, _ in dangling],
+        batchSize=batch_size,
+    )
+    dataset_ids.extend(ds_id for _, ds_id in dangling if ds_id is not None)
+    unlinked = len(dangling)
+    return VirtualEdgeReport(linked, unlinked), dataset_ids
+
+
+async def _refresh_facets(session: AsyncSession, dataset_ids: List[str], batch_size: int) -> None:
+    await session.run(
+        """//cypher
+        UNWIND $datasetIds AS datasetId
+        CALL {
+            WITH datasetId
+            MATCH (d:`sc:Dataset` {id: datasetId})
+            """ + Neo4jPgJsonMixin._SET_DATASET_FACETS + """
+        } IN TRANSACTIONS OF $batchSize ROWS
+        """,
+        datasetIds=dataset_ids,
+        batchSize=batch_size,
+    )
+
+
+async def check_virtual_edges(
+    session: AsyncSession,
+    repair: bool = False,
+    batch_size: int = _DEFAULT_BATCH_SIZE,
+) -> VirtualEdgeReport:
+    """
+    Report, and optionally repair, inconsistent ``VIRTUAL_BELONGS_TO`` edges.
+
+    When repairing, missing edges are created and dangling ones deleted in
+    batches of *batch_size* rows, each committed in its own transaction.
+    Passes are repeated (at most :data:`DATASET_MAX_HOPS` times) until one
+    changes nothing, then the facets of the affected datasets are refreshed.
+
+    Args:
+        session:    Neo4j session (auto-commit transactions are required for
+                    ``CALL { ... } IN TRANSACTIONS``).
+        repair:     Fix the inconsistencies instead of only counting them.
+        batch_size: Number of rows written per inner transaction.
+
+    Returns:
+        The number of missing and dangling edges found, or, when repairing,
+        created and deleted.
+    """
+    if not repair:
+        report = await _count(session)
+        logger.info("%d missing and %d dangling VIRTUAL_BELONGS_TO edges",
+                    report.missing, report.dangling)
+        return report
+
+    linked = unlinked = 0
+    dataset_ids: dict[str, None] = {}
+    for _ in range(DATASET_MAX_HOPS):
+        report, touched = await _repair_pass(session, batch_size)
+        linked += report.missing
+        unlinked += report.dangling
+        dataset_ids.update(dict.fromkeys(touched))
+        if not report.missing and not report.dangling:
+            break
+    await _refresh_facets(session, list(dataset_ids), batch_size)
+    logger.info("Created %d and deleted %d VIRTUAL_BELONGS_TO edges across %d datasets",
+                linked, unlinked, len(dataset_ids))
+    return VirtualEdgeReport(linked, unlinked)
+
+
+async def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check the VIRTUAL_BELONGS_TO edges of the dataset subgraphs.")
+    parser.add_argument("--repair", action="store_true",
+                        help="create missing and delete dangling edges")
+    args = parser.parse_args(argv)
+
+    driver = AsyncGraphDatabase.driver(
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        auth=(
+            os.getenv("NEO4J_USER", "neo4j"),
+            os.getenv("NEO4J_PASSWORD", "datagems"),
+        ),
+    )
+    try:
+        async with driver.session() as session:
+            report = await check_virtual_edges(session, repair=args.repair)
+    finally:
+        await driver.close()
+    # A non-zero exit lets scheduled checks flag an inconsistent store.
+    return 0 if args.repair or report == (0, 0) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import logging
 from typing import List, Optional
 from uuid import UUID
@@ -7,8 +9,8 @@ from pydantic import ValidationError as PydanticValidationError
 
 from moma_management.domain.analytical_pattern import AnalyticalPattern
 from moma_management.domain.exceptions import NotFoundError, ValidationError
-from moma_management.domain.filters import AnalyticalPatternFilter, DatasetFilter
-from moma_management.domain.generated.edges.edge_schema import Edge, EdgeLabel
+from moma_management.domain.filters import AnalyticalPatternFilter
+from moma_management.domain.generated.edges.edge_schema import Edge
 from moma_management.domain.generated.moma_schema import MoMaGraphModel
 from moma_management.domain.generated.nodes.ap.evaluation_schema import (
     Type as EvaluationType,
@@ -19,10 +21,48 @@ from moma_management.repository.analytical_pattern.analytical_pattern_repository
 )
 from moma_management.services.dataset import DatasetService
 from moma_management.services.embeddings.embedder import Embedder
+from moma_management.services.executor import WorkExecutor
+from moma_management.services.ttl_cache import TtlCache
 
 logger = logging.getLogger(__name__)
 
 
+def validate_ap(candidate: dict) -> list[SchemaError]:
+    """Validate a raw PG-JSON dict as an AnalyticalPattern (see :meth:`AnalyticalPatternService.validate`).
+
+    Module-level so that it can be shipped to a process pool.
+    """
+    try:
+        base = MoMaGraphModel.model_validate(candidate)
+    except PydanticValidationError as e:
+        return [
+            SchemaError(
+                keyword=err["type"],
+                instancePath="/" + "/".join(str(x)
+                                            for x in (err.get("loc") or [])),
+                schemaPath="#",
+                params={},
+                message=err["msg"],
+            )
+            for err in e.errors()
+        ]
+    ap = AnalyticalPattern.model_construct(
+        nodes=base.nodes, edges=base.edges)
+    return AnalyticalPattern.validation_chain.handle(ap)
+
+
+def parse_ap(candidate: dict) -> AnalyticalPattern:
+    """Build a validated AnalyticalPattern from raw PG-JSON (see :meth:`AnalyticalPatternService.parse`).
+
+    Module-level so that it can be shipped to a process pool.
+    """
+    try:
+        return AnalyticalPattern.model_validate(candidate)
+    except PydanticValidationError as e:
+        raise ValidationError(
+            f"AnalyticalPattern validation failed: {e}") from e
+
+
 class AnalyticalPatternService:
     """Business-logic layer for AnalyticalPattern CRUD."""
 
@@ -31,10 +71,17 @@ class AnalyticalPatternService:
         repo: AnalyticalPatternRepository,
         dataset_service: DatasetService,
         embedder: Optional[Embedder] = None,
+        cpu_executor: Optional[WorkExecutor] = None,
+        embedding_executor: Optional[WorkExecutor] = None,
+        total_cache: Optional[TtlCache[int]] = None,
     ) -> None:
         self._repo = repo
         self._dataset_service = dataset_service
         self._embedder = embedder
+        self._cpu_executor = cpu_executor or WorkExecutor("cpu")
+        self._embedding_executor = embedding_executor or WorkExecutor(
+            "embedding")
+        self._total_cache = total_cache
 
     async def create(self, ap: AnalyticalPattern) -> str:
         """
@@ -50,41 +97,21 @@ class AnalyticalPatternService:
         Raises:
             ValidationError: if any input target does not belong to a known dataset.
         """
-        # Build a set of node IDs that are internal ResultType nodes (transient
-        # values between Operators).  Data nodes are also ResultType subtypes but
-        # they are persistent and DO need dataset-existence validation.
-        result_type_ids: set[str] = {
-            str(n.id)
-            for n in ap.nodes
-            if "ResultType" in (n.labels or []) and "Data" not in (n.labels or [])
-        }
-
-        input_node_ids = [
-            str(e.from_)
-            for e in (ap.edges or [])
-            if EdgeLabel.input in e.labels and str(e.from_) not in result_type_ids
-        ]
-
+        input_node_ids = ap.input_node_ids
         if input_node_ids:
-            result = await self._dataset_service.list(
-                DatasetFilter(nodeIds=input_node_ids)
-            )
-            found_ids: set[str] = set()
-            for ds in result.get("datasets", []):
-                for node in ds.nodes:
-                    found_ids.add(str(node.id))
-
-            missing = [nid for nid in input_node_ids if nid not in found_ids]
+            owners = await self._dataset_service.resolve_owning_datasets(input_node_ids)
+            missing = [nid for nid in input_node_ids if not owners.get(nid)]
             if missing:
                 raise ValidationError(
                     f"AnalyticalPattern references input node(s) that do not "
                     f"belong to any known dataset: {', '.join(missing)}"
                 )
 
-        await self._repo.create(ap, embedding=self._embed_ap(ap))
+        await self._repo.create(ap, embedding=await self._embed_ap(ap))
+        self._invalidate_totals()
         return str(ap.root.id)
 
-    def _embed_ap(self, ap: AnalyticalPattern) -> Optional[List[float]]:
+    async def _embed_ap(self, ap: AnalyticalPattern) -> Optional[List[float]]:
         """Extract description text and embed it, or return ``None`` if no embedder."""
         if self._embedder is None:
             return None
@@ -92,7 +119,7 @@ class AnalyticalPatternService:
             "description") or ap.root.properties.get("name", "")
         if not text:
             return None
-        return self._embedder.embed(text)
+        return await self._embedding_executor.run(self._embedder.embed, text)
 
     async def get(self, ap_id: str, include_evaluations: bool = False) -> AnalyticalPattern:
         """
@@ -106,6 +133,17 @@ class AnalyticalPatternService:
             raise NotFoundError(f"AnalyticalPattern '{ap_id}' not found.")
         return result
 
+    async def resolve_input_datasets(self, ap_id: str) -> dict[str, list[str]]:
+        """Map each input data node of an AP to the datasets it belongs to.
+
+        Raises:
+            NotFoundError: if no AP with *ap_id* exists.
+        """
+        owners = await self._repo.resolve_input_datasets(ap_id)
+        if owners is None:
+            raise NotFoundError(f"AnalyticalPattern '{ap_id}' not found.")
+        return owners
+
     async def delete(self, ap_id: str) -> None:
         """Delete an AnalyticalPattern by its root node ID.
 
@@ -115,6 +153,12 @@ class AnalyticalPatternService:
         if await self._repo.get(ap_id) is None:
             raise NotFoundError(f"AnalyticalPattern '{ap_id}' not found.")
         await self._repo.delete(ap_id)
+        self._invalidate_totals()
+
+    def _invalidate_totals(self) -> None:
+        """Drop the cached listing totals after an AP was added or removed."""
+        if self._total_cache is not None:
+            self._total_cache.invalidate(lambda key: key[0] == "aps")
 
     async def list(self, filter: AnalyticalPatternFilter, accessible_dataset_ids: list[str] | None = None) -> dict:
         """Unified list/search entry-point for the AP list endpoint.
@@ -125,7 +169,8 @@ class AnalyticalPatternService:
                 "aps": [{"ap": AnalyticalPattern}, ...],
                 "page": int,
                 "pageSize": int,
-                "total": int,
+                "total": int | None,
+                "nextCursor": str | None,
             }
 
         When ``filter.search`` is set a vector-similarity search is performed;
@@ -136,21 +181,41 @@ class AnalyticalPatternService:
         When ``filter.include_evaluations`` is ``True``, Evaluation nodes are
         included in each AP's subgraph (``ap.nodes``).  When ``False``
         (default), Evaluation nodes are excluded from the traversal entirely.
+
+        Outside searches, ``total`` is read from the total cache when one is
+        configured, so it may lag behind the writes of other workers by up to
+        its TTL.
         """
         query_vector = None
         if filter.search is not None:
             if self._embedder is None:
                 raise ValidationError(
                     "Semantic search is not available: no embedder configured.")
-            query_vector = self._embedder.embed(filter.search.q)
+            query_vector = await self._embedding_executor.run(
+                self._embedder.embed, filter.search.q)
+
+        cache_total = (self._total_cache is not None and filter.includeTotal
+                       and query_vector is None)
+        repo_filter = (filter.model_copy(update={"includeTotal": False})
+                       if cache_total else filter)
+        repo_result = await self._repo.list(repo_filter, accessible_dataset_ids=accessible_dataset_ids, query_vector=query_vector)
 
-        repo_result = await self._repo.list(filter, accessible_dataset_ids=accessible_dataset_ids, query_vector=query_vector)
+        total = repo_result["total"]
+        if cache_total:
+            key = ("aps", hashlib.sha256(
+                json.dumps(accessible_dataset_ids).encode()).hexdigest())
+
+            async def count() -> tuple[bool, int]:
+                return True, await self._repo.count(accessible_dataset_ids)
+
+            total = await self._total_cache.get_or_load(key, count)
 
         return {
             "aps": repo_result["aps"],
             "page": filter.page,
             "pageSize": filter.pageSize,
-            "total": repo_result["total"],
+            "total": total,
+            "nextCursor": repo_result.get("nextCursor"),
         }
 
     async def add_evaluation(self, ap_id: str, type: EvaluationType, eval: str, execution_id: UUID | None = uuidv4()) -> str:
@@ -188,26 +253,18 @@ class AnalyticalPatternService:
         await self._repo.create(ap)
         return str(eval_id)
 
-    def validate(self, candidate: dict) -> list[SchemaError]:
+    async def parse(self, candidate: dict) -> AnalyticalPattern:
+        """Build an AnalyticalPattern from a raw PG-JSON dict, validating it on the CPU executor.
+
+        Raises:
+            ValidationError: if the PG-JSON is not a valid AnalyticalPattern.
+        """
+        return await self._cpu_executor.run(parse_ap, candidate)
+
+    async def validate(self, candidate: dict) -> list[SchemaError]:
         """Validate a raw PG-JSON dict as an AnalyticalPattern.
 
         Returns a list of AJV-style :class:`SchemaError` objects (empty when
-        the candidate is valid).
+        the candidate is valid).  Validation runs on the CPU executor.
         """
-        try:
-            base = MoMaGraphModel.model_validate(candidate)
-        except PydanticValidationError as e:
-            return [
-                SchemaError(
-                    keyword=err["type"],
-                    instancePath="/" + "/".join(str(x)
-                                                for x in (err.get("loc") or [])),
-                    schemaPath="#",
-                    params={},
-                    message=err["msg"],
-                )
-                for err in e.errors()
-            ]
-        ap = AnalyticalPattern.model_construct(
-            nodes=base.nodes, edges=base.edges)
-        return AnalyticalPattern.validation_chain.handle(ap)
+        return await self._cpu_executor.run(validate_ap, candidate)
@@ -1,10 +1,14 @@
 import base64
+import hashlib
 import logging
-import threading
 import time
 
 import requests
 from jose import jwt
+from jose.backends.base import Key
+
+from moma_management.services.jwks import JwksProvider
+from moma_management.services.ttl_cache import TtlCache
 
 logger = logging.getLogger(__name__)
 
@@ -19,43 +23,79 @@ class Authentication:
         client_id: str | None = None,
         client_secret: str | None = None,
         exchange_scope: str | None = None,
+        token_cache_ttl: float = 60,
+        token_cache_max_size: int = 10_000,
     ) -> None:
         self._issuer = issuer.rstrip("/")
         self._ttl = ttl
         self._client_id = client_id
         self._client_secret = client_secret
         self._exchange_scope = exchange_scope
-        self._lock = threading.Lock()
-        self._jwks: dict | None = None
-        self._fetched_at: float = 0.0
+        self._jwks = JwksProvider(
+            f"{self._issuer}/protocol/openid-connect/certs", ttl=ttl)
+        # Validated claims, keyed by (JWKS generation, token digest)
+        self._token_cache: TtlCache[dict] | None = (
+            TtlCache(token_cache_ttl, token_cache_max_size)
+            if token_cache_ttl > 0 else None)
 
         if not (self._client_id and self._client_secret and self._exchange_scope):
             raise ValueError(
                 "Token exchange requires client_id, client_secret and exchange_scope"
             )
 
-    def _get_jwks(self) -> dict:
-        """Return the JWKS, refreshing the cache when stale."""
-        now = time.monotonic()
-        with self._lock:
-            if self._jwks is None or (now - self._fetched_at) > self._ttl:
-                url = f"{self._issuer}/protocol/openid-connect/certs"
-                logger.info("Refreshing JWKS from %s", url)
-                resp = requests.get(url, timeout=10)
-                resp.raise_for_status()
-                self._jwks = resp.json()
-                self._fetched_at = now
-        return self._jwks
-
-    def validate(self, token: str) -> dict:
+    async def start(self) -> None:
+        """Load the issuer's signing keys and keep them refreshed in the background."""
+        await self._jwks.start()
+
+    async def close(self) -> None:
+        """Stop refreshing the signing keys."""
+        await self._jwks.close()
+
+    @property
+    def token_cache_stats(self) -> dict:
+        """Hit and miss counters of the verified-token cache."""
+        if self._token_cache is None:
+            return {"hits": 0, "misses": 0, "size": 0}
+        return {
+            "hits": self._token_cache.hits,
+            "misses": self._token_cache.misses,
+            "size": len(self._token_cache),
+        }
+
+    async def validate(self, token: str) -> dict:
         """Decode and validate *token*.
 
         Verifies signature (RS256), issuer, and audience (when configured).
+        Validated claims are cached until the token expires (or the cache TTL
+        elapses) so that a token presented repeatedly is verified only once;
+        a change of signing keys invalidates the cache.
         Raises ``jose.JWTError`` on any validation failure.
         """
+        # Resolving the signing key first may refresh the JWKS, so the cache
+        # key is built from the generation that actually verifies the token.
+        signing_key = await self._jwks.get_key(
+            jwt.get_unverified_header(token).get("kid"))
+        if self._token_cache is None:
+            return self._decode(token, signing_key)
+
+        key = (self._jwks.generation, hashlib.sha256(token.encode()).hexdigest())
+
+        async def _load() -> tuple[bool, dict]:
+            return True, self._decode(token, signing_key)
+
+        # Never keep a token past its own expiry; the claim is only trusted
+        # once _decode has verified the signature, which gates the caching.
+        exp = jwt.get_unverified_claims(token).get("exp")
+        expires_at = None
+        if isinstance(exp, (int, float)):
+            expires_at = time.monotonic() + (exp - time.time())
+
+        return dict(await self._token_cache.get_or_load(key, _load, expires_at))
+
+    def _decode(self, token: str, signing_key: Key) -> dict:
         return jwt.decode(
             token,
-            self._get_jwks(),
+            signing_key,
             algorithms=["RS256"],
             issuer=self._issuer,
             audience=self._client_id,
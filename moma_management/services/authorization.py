@@ -1,11 +1,24 @@
+import asyncio
+import hashlib
 import logging
+import time
 from enum import Enum
-from typing import List
+from typing import Any, Iterable, List, Optional
 
 import aiohttp
+from jose import jwt
+from opentelemetry import metrics
+
+from moma_management.services.ttl_cache import TtlCache
 
 logger = logging.getLogger(__name__)
 
+_gateway_latency = metrics.get_meter(__name__).create_histogram(
+    "moma.authz.gateway.duration",
+    unit="s",
+    description="Latency of permissions gateway calls, by endpoint and status",
+)
+
 
 class DatasetRole(str, Enum):
     """Action verbs that can be granted/denied on a specific dataset."""
@@ -39,6 +52,10 @@ class RealmRole(str, Enum):
     SYSTEM = "GLOBAL_dg_system"
 
 
+# Statuses meaning the gateway does not offer the context-grants listing
+_LISTING_UNAVAILABLE = {404, 405, 501}
+
+
 class GatewayError(Exception):
     """Raised when the permissions gateway is unreachable or returns an unexpected error."""
     pass
@@ -51,31 +68,136 @@ class UserError(Exception):
         super().__init__(f"{self.status_code}: {self.text}")
 
 
+def _token_identity(token: str) -> tuple[Optional[str], Optional[float]]:
+    """
+    Return the ``sub`` claim of *token* and its expiry as a
+    :func:`time.monotonic` timestamp.
+
+    The token has already been verified by the authentication layer, so its
+    claims are read without checking the signature again.
+    """
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except Exception:
+        return None, None
+    exp = claims.get("exp")
+    expires_at = None
+    if isinstance(exp, (int, float)):
+        expires_at = time.monotonic() + (exp - time.time())
+    return claims.get("sub"), expires_at
+
+
 class DatagemsAuthorizationService:
 
-    def __init__(self, gateway_url: str) -> None:
+    def __init__(
+        self,
+        gateway_url: str,
+        max_connections: int = 100,
+        timeout: float = 10,
+        cache_ttl: float = 60,
+        cache_max_size: int = 10_000,
+        max_concurrent_checks: int = 10,
+    ) -> None:
         self._gateway_url = gateway_url.rstrip("/")
+        self._max_connections = max_connections
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._max_concurrent_checks = max_concurrent_checks
+        # Successful gateway answers, keyed by (subject, token digest, path, params)
+        self._cache: Optional[TtlCache[tuple[int, Any]]] = (
+            TtlCache(cache_ttl, cache_max_size) if cache_ttl > 0 else None)
+
+    async def start(self) -> None:
+        """Open the pooled HTTP session used for every gateway call."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._max_connections,
+                limit_per_host=self._max_connections,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self._timeout)
+
+    async def close(self) -> None:
+        """Close the HTTP session and its pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def invalidate_cache(self, subject: Optional[str] = None) -> int:
+        """
+        Drop cached gateway answers for the user *subject* (``sub`` claim),
+        or for every user when *subject* is ``None``.
 
-    async def has_realm_roles(self, who_token: str, any_of: List[RealmRole]) -> bool:
+        Returns the number of entries removed.
         """
-        Returns True if the user has any of the specified realm roles, False if not.
-        Raises GatewayError if the Gateway is not available, UserError if the gateway returns an error
+        if self._cache is None:
+            return 0
+        if subject is None:
+            return self._cache.invalidate()
+        return self._cache.invalidate(lambda key: key[0] == subject)
+
+    async def _get(self, path: str, who_token: str, params: Optional[dict] = None) -> tuple[int, Any]:
         """
+        GET *path* on the gateway on behalf of *who_token*.
+
+        Returns the response status with the decoded JSON body, or the raw
+        text body for error statuses.  Successful answers are cached per
+        user until the cache TTL or the token expiry, whichever comes first;
+        concurrent identical calls share one gateway request.
+
+        Raises:
+            GatewayError if the Gateway is not available
+        """
+        if self._cache is None:
+            return await self._fetch(path, who_token, params)
+
+        subject, expires_at = _token_identity(who_token)
+        key = (
+            subject,
+            hashlib.sha256(who_token.encode()).hexdigest(),
+            path,
+            tuple(sorted((params or {}).items())),
+        )
+
+        async def _load() -> tuple[bool, tuple[int, Any]]:
+            status, body = await self._fetch(path, who_token, params)
+            return status < 400, (status, body)
+
+        return await self._cache.get_or_load(key, _load, expires_at)
+
+    async def _fetch(self, path: str, who_token: str, params: Optional[dict] = None) -> tuple[int, Any]:
+        """Uncached :meth:`_get`; records the call's latency per endpoint."""
+        # Fallback for callers that never went through the application lifespan.
+        await self.start()
+        status = "unreachable"
+        start = time.perf_counter()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self._gateway_url}/api/principal/me",
-                    headers={"Authorization": f"Bearer {who_token}"},
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as resp:
-                    if resp.status >= 400:
-                        text = await resp.text()
-                        raise UserError(resp.status, text)
-
-                    grants: dict[str, list[str]] = await resp.json()
+            async with self._session.get(
+                f"{self._gateway_url}{path}",
+                params=params,
+                headers={"Authorization": f"Bearer {who_token}"},
+            ) as resp:
+                status = str(resp.status)
+                if resp.status >= 400:
+                    return resp.status, await resp.text()
+                return resp.status, await resp.json()
         except aiohttp.ClientError as exc:
             logger.error("Permission gateway unreachable: %s", exc)
             raise GatewayError(exc)
+        finally:
+            _gateway_latency.record(
+                time.perf_counter() - start, {"endpoint": path, "status": status})
+
+    async def has_realm_roles(self, who_token: str, any_of: List[RealmRole]) -> bool:
+        """
+        Returns True if the user has any of the specified realm roles, False if not.
+        Raises GatewayError if the Gateway is not available, UserError if the gateway returns an error
+        """
+        status, grants = await self._get("/api/principal/me", who_token)
+        if status >= 400:
+            raise UserError(status, grants)
 
         return any(r == role.value for r in grants.get("roles", []) for role in any_of)
 
@@ -115,31 +237,62 @@ class DatagemsAuthorizationService:
         Raises:
             GatewayError if the Gateway is not available
         """
+        status, grants = await self._get(
+            "/api/principal/me/context-grants/dataset", who_token,
+            params={"id": on_which_id})
+        # A 404 means the dataset doesn't exists. This is not exposed to prevent enumeration of dataset ids
+        if status == 404:
+            return False
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self._gateway_url}/api/principal/me/context-grants/dataset",
-                    params={"id": on_which_id},
-                    headers={"Authorization": f"Bearer {who_token}"},
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as resp:
-                    # A 404 means the dataset doesn't exists. This is not exposed to prevent enumeration of dataset ids
-                    if resp.status == 404:
-                        return False
-
-                    if resp.status >= 400:
-                        text = await resp.text()
-                        raise UserError(resp.status, text)
-
-                    # The gateway returns a JSON object like {"dataset_id": ["role1", "role2", ...]}
-                    grants: dict[str, list[str]] = await resp.json()
-        except aiohttp.ClientError as exc:
-            logger.error("Permission gateway unreachable: %s", exc)
-            raise GatewayError(exc)
+        if status >= 400:
+            raise UserError(status, grants)
 
+        # The gateway returns a JSON object like {"dataset_id": ["role1", "role2", ...]}
         return any(role == what.value for role in grants.get(on_which_id, []))
 
+    async def has_dataset_grants(
+        self, who_token: str, what: DatasetRole, on_which_ids: Iterable[str]
+    ) -> dict[str, bool]:
+        """
+        Batch version of ``has_dataset_grant``: check *what* on every dataset
+        of *on_which_ids* at once.  Realm roles are **not** checked.
+
+        The user's context grants are fetched once and every id is answered
+        from that list.  If the gateway does not offer the listing, the ids
+        are checked one by one, with at most ``max_concurrent_checks``
+        requests in flight.
+
+        Returns:
+            A mapping from each dataset ID to whether the grant is held.
+
+        Raises:
+            GatewayError if the Gateway is not available
+        """
+        ids = list(dict.fromkeys(on_which_ids))
+        if not ids:
+            return {}
+
+        status, grants = await self._get(
+            "/api/principal/me/context-grants", who_token)
+        if status in _LISTING_UNAVAILABLE:
+            semaphore = asyncio.Semaphore(self._max_concurrent_checks)
+
+            async def _check(ds_id: str) -> bool:
+                async with semaphore:
+                    return await self.has_dataset_grant(who_token, what, ds_id)
+
+            return dict(zip(ids, await asyncio.gather(*map(_check, ids))))
+
+        if status >= 400:
+            raise UserError(status, grants)
+
+        granted = {
+            grant.get("targetId")
+            for grant in (grants if isinstance(grants, list) else [])
+            if grant.get("role") == what.value
+        }
+        return {ds_id: ds_id in granted for ds_id in ids}
+
     async def get_browseable_dataset_ids(self, who_token: str) -> List[str] | None:
         """
         Returns all the dataset IDs the user has access to, or None if the
@@ -148,23 +301,12 @@ class DatagemsAuthorizationService:
         if await self.has_realm_roles(who_token, [RealmRole.ADMIN, RealmRole.CURATOR, RealmRole.SYSTEM]):
             return None
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self._gateway_url}/api/principal/me/context-grants",
-                    headers={"Authorization": f"Bearer {who_token}"},
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as resp:
-                    if resp.status >= 400:
-                        text = await resp.text()
-                        logger.error("Permission gateway returned %s: %s",
-                                     resp.status, text)
-                        raise UserError(resp.status, text)
-
-                    permissions = await resp.json()
-        except aiohttp.ClientError as exc:
-            logger.error("Permission gateway unreachable: %s", exc)
-            raise GatewayError(exc)
+        status, permissions = await self._get(
+            "/api/principal/me/context-grants", who_token)
+        if status >= 400:
+            logger.error("Permission gateway returned %s: %s",
+                         status, permissions)
+            raise UserError(status, permissions)
 
         if not permissions or not isinstance(permissions, list):
             return []
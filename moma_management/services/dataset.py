@@ -1,9 +1,10 @@
+import asyncio
+import hashlib
 import logging
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 from pydantic import ValidationError as PydanticValidationError
-from yaml import safe_load
 
 from moma_management.domain.dataset import Dataset
 from moma_management.domain.exceptions import (
@@ -13,15 +14,81 @@ from moma_management.domain.exceptions import (
     ValidationError,
 )
 from moma_management.domain.filters import DatasetFilter
-from moma_management.domain.mapping_engine import croissant_to_pgjson
+from moma_management.domain.generated.moma_schema import MoMaGraphModel
+from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.domain.mapping_engine import (
+    EDGE,
+    NODE,
+    croissant_to_pgjson,
+    iter_croissant_pgjson,
+    load_mapping_plan,
+)
+from moma_management.domain.validation import StreamingGraphValidator
 from moma_management.domain.validation.schema_error import SchemaError
 from moma_management.repository.dataset.dataset_repository import DatasetRepository
 from moma_management.repository.dataset_relationship.dataset_relationship_repository import (
     DatasetRelationshipRepository,
 )
+from moma_management.services.executor import WorkExecutor
+from moma_management.services.ttl_cache import TtlCache
 
 logger = logging.getLogger(__name__)
 
+# DatasetFilter fields that determine which datasets match, hence the total.
+_COUNT_FIELDS = {"nodeIds", "types", "mimeTypes",
+                 "publishedFrom", "publishedTo", "status"}
+
+
+def convert_profile(candidate: Dict[str, Any], mapping_file: Path) -> Dataset:
+    """Convert and validate a Croissant profile (see :meth:`DatasetService.convert`).
+
+    Module-level so that it can be shipped to a process pool.
+    """
+    try:
+        plan = load_mapping_plan(mapping_file)
+        dataset = croissant_to_pgjson(candidate, plan)
+    except Exception as e:
+        logger.exception("Croissant conversion failed")
+        raise ConversionError(
+            f"Failed to convert Croissant profile: {e}") from e
+
+    try:
+        return Dataset.model_validate(dataset)
+    except PydanticValidationError as e:
+        raise ValidationError(
+            f"PG-JSON failed schema validation: {e}") from e
+
+
+def parse_dataset(candidate: Dict[str, Any]) -> Dataset:
+    """Build a validated Dataset from raw PG-JSON (see :meth:`DatasetService.parse`).
+
+    Module-level so that it can be shipped to a process pool.
+    """
+    try:
+        return Dataset.model_validate(candidate)
+    except PydanticValidationError as e:
+        raise ValidationError(
+            f"PG-JSON failed schema validation: {e}") from e
+
+
+def validate_dataset(candidate: dict) -> list[SchemaError]:
+    """Validate a raw PG-JSON dict as a Dataset (see :meth:`DatasetService.validate`)."""
+    try:
+        Dataset.model_validate(candidate)
+        return []
+    except PydanticValidationError as e:
+        return [
+            SchemaError(
+                keyword=err["type"],
+                instancePath="/" + "/".join(str(x)
+                                            for x in (err.get("loc") or [])),
+                schemaPath="#",
+                params={},
+                message=err["msg"],
+            )
+            for err in e.errors()
+        ]
+
 
 class DatasetService:
 
@@ -33,74 +100,58 @@ class DatasetService:
         repo: DatasetRepository,
         mapping_file: Path,
         relationship_repo: DatasetRelationshipRepository,
+        stream_chunk_size: int = 1000,
+        cpu_executor: Optional[WorkExecutor] = None,
+        total_cache: Optional[TtlCache[int]] = None,
     ):
         self._repo = repo
         assert mapping_file.exists(
         ), f"Mapping file not found at {mapping_file}"
         self._mapping_file = mapping_file
         self._relationship_repo = relationship_repo
+        self._stream_chunk_size = stream_chunk_size
+        self._cpu_executor = cpu_executor or WorkExecutor("cpu")
+        self._total_cache = total_cache
 
     async def create(self, candidate: Dataset) -> Dataset:
         """
         Create a new dataset from a validated Dataset object.
         """
         await self._repo.create(candidate)
+        self._invalidate_totals()
         return candidate
 
-    def convert(self, candidate: Dict[str, Any]) -> Dataset:
+    async def convert(self, candidate: Dict[str, Any]) -> Dataset:
         """
         Convert a Croissant-format JSON body to PG-JSON according to the MoMa graph schema.
         Does not persist the result to Neo4j.
 
+        The conversion and validation run on the CPU executor.
+
         Raises:
             ConversionError: if the Croissant profile cannot be mapped to PG-JSON.
             ValidationError: if the resulting PG-JSON does not conform to the MoMa schema.
         """
-        try:
-            mapping = safe_load(self._mapping_file.open("r"))
-            dataset = croissant_to_pgjson(candidate, mapping)
-        except Exception as e:
-            logger.exception("Croissant conversion failed")
-            raise ConversionError(
-                f"Failed to convert Croissant profile: {e}") from e
+        return await self._cpu_executor.run(
+            convert_profile, candidate, self._mapping_file)
 
-        return self._parse(dataset)
-
-    def _parse(self, pg_json: Dict[str, Any]) -> Dataset:
-        """Parse and validate a raw PG-JSON dict into a :class:`Dataset`.
-
-        Used internally by :meth:`convert` and :meth:`ingest`.
+    async def parse(self, candidate: Dict[str, Any]) -> Dataset:
+        """
+        Build a Dataset from a raw PG-JSON dict, validating it on the CPU
+        executor.
 
         Raises:
-            ValidationError: if *pg_json* does not conform to the MoMa Dataset schema.
+            ValidationError: if the PG-JSON does not conform to the MoMa schema.
         """
-        try:
-            return Dataset.model_validate(pg_json)
-        except PydanticValidationError as e:
-            raise ValidationError(
-                f"PG-JSON failed schema validation: {e}") from e
+        return await self._cpu_executor.run(parse_dataset, candidate)
 
-    def validate(self, candidate: dict) -> list[SchemaError]:
+    async def validate(self, candidate: dict) -> list[SchemaError]:
         """Validate a raw PG-JSON dict as a Dataset.
 
         Returns a list of AJV-style :class:`SchemaError` objects (empty when
-        the candidate is valid).
+        the candidate is valid).  Validation runs on the CPU executor.
         """
-        try:
-            Dataset.model_validate(candidate)
-            return []
-        except PydanticValidationError as e:
-            return [
-                SchemaError(
-                    keyword=err["type"],
-                    instancePath="/" + "/".join(str(x)
-                                                for x in (err.get("loc") or [])),
-                    schemaPath="#",
-                    params={},
-                    message=err["msg"],
-                )
-                for err in e.errors()
-            ]
+        return await self._cpu_executor.run(validate_dataset, candidate)
 
     async def ingest(self, candidate: Dict[str, Any]) -> Dataset:
         """
@@ -112,10 +163,128 @@ class DatasetService:
             ConversionError: if the Croissant profile cannot be converted.
             ValidationError: if the converted PG-JSON fails schema validation.
         """
-        dataset = self.convert(candidate)
+        dataset = await self.convert(candidate)
         await self._repo.create(dataset)
+        self._invalidate_totals()
         return dataset
 
+    async def ingest_streaming(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ingest a Croissant profile without materialising its PG-JSON graph.
+
+        Nodes and edges are produced lazily by the mapping engine, validated
+        one by one and written to Neo4j in chunks of at most
+        ``stream_chunk_size`` nodes, all within a single transaction.  The
+        edge-constraint and structural checks run once the whole profile has
+        been converted; if they fail, nothing is persisted.  Conversion and
+        validation run in a worker thread, one chunk at a time, so that the
+        event loop keeps serving other requests meanwhile.
+
+        Returns:
+            A summary ``{"id", "nodes", "edges"}`` of the stored dataset.
+
+        Raises:
+            ConversionError: if the Croissant profile cannot be converted.
+            ValidationError: if a node, an edge or the final graph is invalid.
+        """
+        def _start() -> tuple[Iterator[tuple[str, dict]], tuple[str, dict] | None]:
+            elements = iter_croissant_pgjson(
+                candidate, load_mapping_plan(self._mapping_file))
+            return elements, next(elements, None)
+
+        try:
+            elements, first = await asyncio.to_thread(_start)
+        except Exception as e:
+            logger.exception("Croissant conversion failed")
+            raise ConversionError(
+                f"Failed to convert Croissant profile: {e}") from e
+
+        if first is None or Dataset._root_label not in first[1]["labels"]:
+            raise ValidationError(
+                "PG-JSON failed schema validation: the profile has no "
+                f"'{Dataset._root_label}' root node.")
+        try:
+            root_id = str(Node.model_validate(first[1]).id)
+        except PydanticValidationError as e:
+            raise ValidationError(
+                f"PG-JSON failed schema validation: {e}") from e
+
+        validator = StreamingGraphValidator(Dataset)
+        await self._repo.create_streaming(
+            root_id, self._off_loop(self._stream_chunks(first, elements, validator)))
+        self._invalidate_totals()
+        return {
+            "id": root_id,
+            "nodes": validator.node_count,
+            "edges": validator.edge_count,
+        }
+
+    @staticmethod
+    async def _off_loop(chunks: Iterator[MoMaGraphModel]) -> AsyncIterator[MoMaGraphModel]:
+        """Produce each chunk of *chunks* in a worker thread."""
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            yield chunk
+
+    def _stream_chunks(
+        self,
+        first: tuple[str, dict],
+        elements: Iterator[tuple[str, dict]],
+        validator: StreamingGraphValidator,
+    ) -> Iterator[MoMaGraphModel]:
+        """Validate streamed elements and group them into writable chunks.
+
+        An edge is emitted in the first chunk in which both of its endpoints
+        have been written; edges to nodes that never appear are left for the
+        final edge-constraint check to report.
+        """
+        written: set[str] = set()
+        nodes: list = []
+        pending_edges: list = []
+
+        def _flush() -> MoMaGraphModel:
+            written.update(str(n.id) for n in nodes)
+            ready, waiting = [], []
+            for e in pending_edges:
+                endpoints_written = str(e.from_) in written and str(e.to) in written
+                (ready if endpoints_written else waiting).append(e)
+            pending_edges[:] = waiting
+            chunk = MoMaGraphModel.model_construct(
+                nodes=list(nodes), edges=ready)
+            nodes.clear()
+            return chunk
+
+        def _elements():
+            yield first
+            try:
+                yield from elements
+            except Exception as e:
+                logger.exception("Croissant conversion failed")
+                raise ConversionError(
+                    f"Failed to convert Croissant profile: {e}") from e
+
+        for kind, raw in _elements():
+            if kind == NODE:
+                element, errors = validator.add_node(raw)
+            else:
+                element, errors = validator.add_edge(raw)
+            if errors:
+                raise ValidationError(
+                    f"PG-JSON failed schema validation: {errors}")
+
+            if kind == EDGE:
+                pending_edges.append(element)
+            else:
+                nodes.append(element)
+                if len(nodes) >= self._stream_chunk_size:
+                    yield _flush()
+
+        yield _flush()
+
+        errors = validator.finish()
+        if errors:
+            raise ValidationError(
+                f"Dataset validation failed with errors: {errors}")
+
     async def get(self, dataset_id: str) -> Dataset:
         """
         Retrieve the full dataset subgraph (nodes + edges) by dataset ID.
@@ -131,8 +300,35 @@ class DatasetService:
     async def list(self, filters: DatasetFilter) -> List[Dataset]:
         """
         List datasets with optional filtering, sorting, and pagination criteria.
+
+        When a total cache is configured, the ``total`` of a filter is counted
+        once per cache TTL rather than on every page, so it may lag behind
+        writes of other workers.
         """
-        return await self._repo.list(filters)
+        if self._total_cache is None or not filters.includeTotal:
+            return await self._repo.list(filters)
+
+        result = await self._repo.list(
+            filters.model_copy(update={"includeTotal": False}))
+        if "error" not in result:
+            key = ("datasets", hashlib.sha256(
+                filters.model_dump_json(include=_COUNT_FIELDS).encode()).hexdigest())
+
+            async def count() -> tuple[bool, int]:
+                return True, await self._repo.count(filters)
+
+            result["total"] = await self._total_cache.get_or_load(key, count)
+        return result
+
+    async def resolve_owning_datasets(self, node_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Map each node id to the ids of the datasets it belongs to.
+
+        A dataset id maps to itself; ids of unknown nodes are omitted.
+        """
+        if not node_ids:
+            return {}
+        return await self._repo.resolve_owning_datasets(node_ids)
 
     async def delete(self, id: str) -> int:
         """
@@ -154,4 +350,10 @@ class DatasetService:
         rows = await self._repo.delete(id)
         if rows == 0:
             raise NotFoundError(f"Dataset '{id}' not found.")
+        self._invalidate_totals()
         return rows
+
+    def _invalidate_totals(self) -> None:
+        """Drop the cached listing totals after a dataset was added or removed."""
+        if self._total_cache is not None:
+            self._total_cache.invalidate(lambda key: key[0] == "datasets")
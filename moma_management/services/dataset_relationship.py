@@ -2,7 +2,6 @@ import logging
 
 from moma_management.domain.dataset_relationship import DatasetRelationship
 from moma_management.domain.exceptions import ConflictError, NotFoundError, ValidationError
-from moma_management.domain.filters import DatasetFilter
 from moma_management.repository.dataset_relationship.dataset_relationship_repository import (
     DatasetRelationshipRepository,
 )
@@ -35,13 +34,9 @@ class DatasetRelationshipService:
             ConflictError: if a relationship already exists for this dataset pair.
         """
         target_ids = list(relationship.target_dataset_ids)
-        result = await self._dataset_service.list(DatasetFilter(nodeIds=target_ids))
-        found_ids: set[str] = set()
-        for ds in result.get("datasets", []):
-            for node in ds.nodes:
-                found_ids.add(str(node.id))
-
-        missing = [nid for nid in target_ids if nid not in found_ids]
+        owners = await self._dataset_service.resolve_owning_datasets(target_ids)
+        # Only a dataset root node owns itself
+        missing = [nid for nid in target_ids if nid not in owners.get(nid, [])]
         if missing:
             raise ValidationError(
                 f"DatasetRelationship references dataset(s) that do not exist: "
@@ -85,9 +80,11 @@ class DatasetRelationshipService:
         self,
         dataset_id: str,
         accessible_dataset_ids: list[str] | None = None,
+        page: int = 1,
+        page_size: int | None = None,
     ) -> list[DatasetRelationship]:
         """
-        List every DatasetRelationship that targets *dataset_id*.
+        List the DatasetRelationships that target *dataset_id*, ordered by ID.
 
         When *accessible_dataset_ids* is provided, relationships whose OTHER
         linked dataset is not in that set are silently excluded (the caller
@@ -95,17 +92,20 @@ class DatasetRelationshipService:
         them) rather than causing the whole request to fail — the same
         convention used by AnalyticalPatternService.list().
 
+        When *page_size* is set, only the *page*-th page of that many
+        relationships is returned; otherwise all of them are.
+
         Raises:
             NotFoundError: if no dataset with *dataset_id* exists.
         """
-        await self._dataset_service.get(dataset_id)  # raises NotFoundError if missing
-
-        relationships = await self._repo.list_for_dataset(dataset_id)
-        if accessible_dataset_ids is None:
-            return relationships
-
-        accessible = set(accessible_dataset_ids)
-        return [
-            rel for rel in relationships
-            if all(did in accessible for did in rel.target_dataset_ids)
-        ]
+        owners = await self._dataset_service.resolve_owning_datasets([dataset_id])
+        if dataset_id not in owners.get(dataset_id, []):
+            raise NotFoundError(f"Dataset '{dataset_id}' not found.")
+
+        skip = (page - 1) * page_size if page_size is not None else 0
+        return await self._repo.list_for_dataset(
+            dataset_id,
+            accessible_dataset_ids=accessible_dataset_ids,
+            skip=skip,
+            limit=page_size,
+        )
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Optional, TypeVar
+
+from opentelemetry import metrics
+
+from moma_management.domain.exceptions import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_meter = metrics.get_meter(__name__)
+_tasks = _meter.create_counter(
+    "moma.executor.tasks",
+    description="Tasks submitted to an executor, by outcome",
+)
+_pending = _meter.create_up_down_counter(
+    "moma.executor.pending",
+    description="Tasks queued or running in an executor",
+)
+_duration = _meter.create_histogram(
+    "moma.executor.duration",
+    unit="s",
+    description="Time from submission to completion of an executor task",
+)
+
+
+class ExecutorMode(str, Enum):
+    """Where a :class:`WorkExecutor` runs its tasks."""
+    # Run on the event loop, as a plain function call
+    INLINE = "inline"
+    # Run in a pool of worker threads
+    THREAD = "thread"
+    # Run in a pool of worker processes (arguments and results are pickled)
+    PROCESS = "process"
+
+
+class WorkExecutor:
+    """
+    Run blocking work off the event loop.
+
+    Tasks are handed to a thread or process pool and awaited from the
+    caller's coroutine.  At most ``max_workers + max_queue`` tasks may be
+    pending at once; beyond that, :meth:`run` fails fast with
+    :class:`OverloadedError` instead of growing an unbounded backlog.
+
+    In ``inline`` mode tasks run directly on the calling thread, which
+    reproduces the behaviour of a plain synchronous call.  *initializer* is
+    called once in each worker process (``process`` mode only).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        mode: ExecutorMode = ExecutorMode.INLINE,
+        max_workers: Optional[int] = None,
+        max_queue: int = 64,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.name = name
+        self.mode = ExecutorMode(mode)
+        workers = max_workers or os.process_cpu_count() or 1
+        self._pool: Optional[Executor] = None
+        if self.mode is ExecutorMode.THREAD:
+            self._pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=name)
+        elif self.mode is ExecutorMode.PROCESS:
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=initializer)
+        self._capacity = workers + max_queue
+        self._in_flight = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of tasks currently queued or running."""
+        return self._in_flight
+
+    @property
+    def stats(self) -> dict:
+        """Counters of completed, failed and rejected tasks since start-up."""
+        return {**self._stats, "in_flight": self._in_flight}
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """
+        Run ``fn(*args)`` and return its result.
+
+        In ``process`` mode *fn* must be a module-level function and its
+        arguments and result must be picklable.
+
+        Raises:
+            OverloadedError: if the executor's queue is full.
+        """
+        if self._pool is None:
+            return self._record(fn, *args)
+
+        attributes = {"executor": self.name}
+        if self._in_flight >= self._capacity:
+            self._stats["rejected"] += 1
+            _tasks.add(1, {**attributes, "outcome": "rejected"})
+            raise OverloadedError(
+                f"The '{self.name}' executor is busy, retry later.")
+
+        self._in_flight += 1
+        _pending.add(1, attributes)
+        start = time.perf_counter()
+        outcome = "failed"
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._pool, fn, *args)
+            outcome = "completed"
+            return result
+        finally:
+            self._in_flight -= 1
+            self._stats[outcome] += 1
+            _pending.add(-1, attributes)
+            _tasks.add(1, {**attributes, "outcome": outcome})
+            _duration.record(time.perf_counter() - start, attributes)
+
+    def _record(self, fn: Callable[..., T], *args) -> T:
+        attributes = {"executor": self.name}
+        start = time.perf_counter()
+        outcome = "failed"
+        try:
+            result = fn(*args)
+            outcome = "completed"
+            return result
+        finally:
+            self._stats[outcome] += 1
+            _tasks.add(1, {**attributes, "outcome": outcome})
+            _duration.record(time.perf_counter() - start, attributes)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, dropping tasks that have not started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            logger.info("Executor '%s' shut down (%s)", self.name, self.stats)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from jose import JWTError, jwk
+from jose.exceptions import JOSEError
+from jose.backends.base import Key
+
+logger = logging.getLogger(__name__)
+
+
+class JwksProvider:
+    """
+    Asynchronous, cached source of the issuer's JWT signing keys.
+
+    Keys are parsed once and indexed by ``kid``.  Once :meth:`start` has been
+    called, a background task refreshes them before they expire; if the
+    issuer is unreachable the last known keys keep being served.  A token
+    signed with an unknown ``kid`` triggers an immediate refresh, rate
+    limited to one every *min_refresh_interval* seconds.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 300,
+        timeout: float = 10,
+        min_refresh_interval: float = 10,
+    ) -> None:
+        self._url = url
+        self._ttl = ttl
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, Key] = {}
+        self._raw: Dict[str, dict] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Bumped whenever the set of keys changes
+        self.generation = 0
+
+    @property
+    def keys(self) -> Dict[str, Key]:
+        """The current keys, indexed by ``kid``."""
+        return self._keys
+
+    async def start(self) -> None:
+        """Fetch the keys and start refreshing them in the background."""
+        try:
+            await self.refresh()
+        except Exception as exc:
+            logger.error("Initial JWKS fetch from %s failed: %s", self._url, exc)
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get_key(self, kid: Optional[str]) -> Key:
+        """
+        Return the signing key identified by *kid*.
+
+        Raises:
+            jose.JWTError: if no such key exists, even after a refresh.
+        """
+        key = self._keys.get(kid)
+        if key is not None and not self._expired():
+            return key
+
+        if not self._attempted_recently(self._min_refresh_interval):
+            try:
+                await self.refresh(if_older_than=self._min_refresh_interval)
+            except Exception as exc:
+                # Keep serving the last known keys while the issuer is down.
+                logger.error("JWKS refresh from %s failed: %s", self._url, exc)
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key '{kid}'")
+        return key
+
+    async def refresh(self, if_older_than: Optional[float] = None) -> None:
+        """
+        Download and parse the key set.
+
+        Concurrent callers share one download; with *if_older_than*, the
+        download is skipped when a refresh was attempted less than that many
+        seconds ago (e.g. because another caller just did it).
+        """
+        async with self._refresh_lock:
+            if if_older_than is not None and self._attempted_recently(if_older_than):
+                return
+
+            self._attempted_at = time.monotonic()
+            logger.info("Refreshing JWKS from %s", self._url)
+            async with aiohttp.ClientSession(timeout=self._timeout) as session:
+                async with session.get(self._url) as resp:
+                    resp.raise_for_status()
+                    jwks = await resp.json()
+
+            raw = {
+                data.get("kid"): data
+                for data in jwks.get("keys", [])
+                if data.get("kty") == "RSA" and data.get("use", "sig") == "sig"
+            }
+            if raw != self._raw:
+                keys: Dict[str, Key] = {}
+                for kid, data in raw.items():
+                    try:
+                        keys[kid] = jwk.construct(data, "RS256")
+                    except JOSEError as exc:
+                        logger.warning("Ignoring invalid JWK '%s': %s", kid, exc)
+                self._keys, self._raw = keys, raw
+                self.generation += 1
+            self._fetched_at = time.monotonic()
+
+    def _attempted_recently(self, seconds: float) -> bool:
+        return (
+            self._attempted_at is not None
+            and time.monotonic() - self._attempted_at < seconds
+        )
+
+    def _expired(self) -> bool:
+        return self._task is None and (
+            self._fetched_at is None
+            or time.monotonic() - self._fetched_at > self._ttl
+        )
+
+    async def _refresh_loop(self) -> None:
+        # Refresh ahead of expiry; retry sooner after a failure.
+        delay = self._ttl * 0.8
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+                delay = self._ttl * 0.8
+            except Exception as exc:
+                logger.error("JWKS refresh from %s failed: %s", self._url, exc)
+                delay = min(self._min_refresh_interval, self._ttl)
@@ -1,8 +1,10 @@
 import logging
 from typing import Optional
 
-from moma_management.domain.exceptions import NotFoundError
+from moma_management.domain.exceptions import NotFoundError, ValidationError
 from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.domain.pg_json_graph import MomaEntity
+from moma_management.domain.validation import IncrementalGraphValidator
 from moma_management.repository.node.node_repository import NodeRepository
 
 logger = logging.getLogger(__name__)
@@ -35,9 +37,24 @@ class NodeService:
         """
         Update properties of an existing node.
 
+        Only the updated node is validated against the schema, with the
+        supplied properties merged onto the stored ones.  Labels are never
+        written by an update, so the stored labels are the ones validated.
+
         Raises:
             NotFoundError: if no node with *node.id* exists.
+            ValidationError: if the updated node fails schema validation.
         """
+        stored = await self._repo.get(str(node.id))
+        if stored is None:
+            raise NotFoundError(f"Node '{node.id}' not found.")
+        errors = IncrementalGraphValidator(
+            MomaEntity.model_construct(nodes=[stored], edges=[])
+        ).validate(nodes=[node.model_dump(mode="json", include={"id", "properties"})])
+        if errors:
+            raise ValidationError(
+                f"Node update failed schema validation: {errors}")
+
         result = await self._repo.update(node)
         if result.get("updated", 0) == 0:
             raise NotFoundError(f"Node '{node.id}' not found.")
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TtlCache(Generic[T]):
+    """
+    Bounded in-process cache whose entries expire after a TTL.
+
+    Once *max_size* is reached, the least recently used entry is evicted.
+    Concurrent :meth:`get_or_load` calls for the same missing key share a
+    single call to the loader.  Failed loads are not cached.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10_000) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        # key -> (expires_at, value)
+        self._entries: OrderedDict[Hashable, tuple[float, T]] = OrderedDict()
+        self._loading: dict[Hashable, asyncio.Task] = {}
+        # Bumped by invalidate() so that loads started before it are not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Return the live entry for *key*, or ``None``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value: T, expires_at: Optional[float] = None) -> None:
+        """
+        Store *value* under *key* for the cache TTL.
+
+        *expires_at* (a :func:`time.monotonic` timestamp) shortens the
+        entry's lifetime when it comes before the TTL.
+        """
+        deadline = time.monotonic() + self._ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self._entries[key] = (deadline, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[tuple[bool, T]]],
+        expires_at: Optional[float] = None,
+    ) -> T:
+        """
+        Return the cached value for *key*, calling *loader* on a miss.
+
+        *loader* returns ``(cacheable, value)``; the value is only stored
+        when *cacheable* is true.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, expires_at))
+            # Retrieve the outcome so that a load whose callers were all
+            # cancelled does not log an unretrieved exception.
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._loading[key] = task
+        # Shielded so that a cancelled caller does not cancel the shared load.
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[tuple[bool, T]]],
+        expires_at: Optional[float],
+    ) -> T:
+        generation = self._generation
+        try:
+            cacheable, value = await loader()
+            if cacheable and generation == self._generation:
+                self.set(key, value, expires_at)
+            return value
+        finally:
+            del self._loading[key]
+
+    def invalidate(self, predicate: Optional[Callable[[Any], bool]] = None) -> int:
+        """
+        Drop the entries whose key matches *predicate* (all of them when
+        *predicate* is ``None``) and return how many were removed.
+        """
+        self._generation += 1
+        if predicate is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+        keys = [k for k in self._entries if predicate(k)]
+        for k in keys:
+            del self._entries[k]
+        return len(keys)
@@ -75,7 +75,7 @@ async def test_create_fails_if_input_dataset_not_found():
     repo = AsyncMock()
     dataset_svc = AsyncMock()
     # Simulate: no datasets contain the input node
-    dataset_svc.list.return_value = {"datasets": []}
+    dataset_svc.resolve_owning_datasets.return_value = {}
 
     svc = AnalyticalPatternService(repo, dataset_svc)
 
@@ -95,11 +95,7 @@ async def test_create_success_when_input_node_found():
     dataset_svc = AsyncMock()
 
     # Simulate: input node found in a dataset
-    mock_node = MagicMock()
-    mock_node.id = data_id
-    mock_dataset = MagicMock()
-    mock_dataset.nodes = [mock_node]
-    dataset_svc.list.return_value = {"datasets": [mock_dataset]}
+    dataset_svc.resolve_owning_datasets.return_value = {data_id: [str(uuid4())]}
 
     svc = AnalyticalPatternService(repo, dataset_svc)
     returned_id = await svc.create(ap)
@@ -119,7 +115,7 @@ async def test_create_success_with_no_input_edges():
     svc = AnalyticalPatternService(repo, dataset_svc)
     returned_id = await svc.create(ap)
 
-    dataset_svc.list.assert_not_called()
+    dataset_svc.resolve_owning_datasets.assert_not_called()
     repo.create.assert_called_once_with(ap, embedding=None)
     assert returned_id == str(ap.root.id)
 
@@ -136,6 +132,28 @@ async def test_get_raises_not_found():
         await svc.get(str(uuid4()))
 
 
+@pytest.mark.asyncio
+async def test_parse_returns_analytical_pattern():
+    """parse() must build an AnalyticalPattern from a valid raw body."""
+    svc = AnalyticalPatternService(AsyncMock(), AsyncMock())
+    payload = json.loads(
+        (_EVALUATIONS_DIR.parent / "ap_sql_select.json").read_text())
+
+    ap = await svc.parse(payload)
+
+    assert isinstance(ap, AnalyticalPattern)
+    assert len(ap.nodes) == len(payload["nodes"])
+
+
+@pytest.mark.asyncio
+async def test_parse_raises_validation_error_on_invalid_body():
+    """parse() must raise the domain ValidationError for an invalid body."""
+    svc = AnalyticalPatternService(AsyncMock(), AsyncMock())
+
+    with pytest.raises(ValidationError):
+        await svc.parse({"nodes": "not-a-list"})
+
+
 # ---------------------------------------------------------------------------
 # list() — accessible_dataset_ids passed to repo
 # ---------------------------------------------------------------------------
@@ -173,6 +191,47 @@ async def test_list_passes_accessible_ids_to_repo():
     assert result["aps"] == [ap]
 
 
+@pytest.mark.asyncio
+async def test_list_reads_total_from_cache():
+    """With a total cache, pages are listed without counting and the count runs once."""
+    from moma_management.services.ttl_cache import TtlCache
+    ap = _make_ap_no_input()
+
+    repo = AsyncMock()
+    repo.list.return_value = {"aps": [ap], "total": None, "nextCursor": "c"}
+    repo.count.return_value = 7
+    svc = AnalyticalPatternService(repo, AsyncMock(), total_cache=TtlCache(60))
+
+    first = await svc.list(AnalyticalPatternFilter(), accessible_dataset_ids=["ds-1"])
+    second = await svc.list(AnalyticalPatternFilter(after="c"), accessible_dataset_ids=["ds-1"])
+
+    assert first["total"] == second["total"] == 7
+    assert second["nextCursor"] == "c"
+    repo.count.assert_awaited_once_with(["ds-1"])
+    assert all(call.args[0].includeTotal is False for call in repo.list.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cached_totals():
+    """Creating or deleting an AP drops the cached AP totals."""
+    from moma_management.services.ttl_cache import TtlCache
+    ap = _make_ap_no_input()
+
+    repo = AsyncMock()
+    repo.list.return_value = {"aps": [], "total": None, "nextCursor": None}
+    repo.count.return_value = 7
+    svc = AnalyticalPatternService(repo, AsyncMock(), total_cache=TtlCache(60))
+
+    await svc.list(AnalyticalPatternFilter())
+    await svc.create(ap)
+    await svc.list(AnalyticalPatternFilter())
+    assert repo.count.await_count == 2
+
+    await svc.delete(str(ap.root.id))
+    await svc.list(AnalyticalPatternFilter())
+    assert repo.count.await_count == 3
+
+
 # ---------------------------------------------------------------------------
 # create() — embedding
 # ---------------------------------------------------------------------------
@@ -187,11 +246,7 @@ async def test_create_embeds_description_when_embedder_set():
 
     repo = AsyncMock()
     dataset_svc = AsyncMock()
-    mock_node = MagicMock()
-    mock_node.id = data_id
-    mock_dataset = MagicMock()
-    mock_dataset.nodes = [mock_node]
-    dataset_svc.list.return_value = {"datasets": [mock_dataset]}
+    dataset_svc.resolve_owning_datasets.return_value = {data_id: [str(uuid4())]}
 
     embedder = MagicMock()
     embedder.embed.return_value = [0.1, 0.2, 0.3]
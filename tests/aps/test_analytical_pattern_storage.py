@@ -134,6 +134,85 @@ async def test_get_excludes_input_edge_nodes(
     assert str(data_node.id) not in {str(n.id) for n in retrieved.nodes}
 
 
+@pytest.mark.asyncio
+async def test_get_includes_internal_result_types(
+    ap_repository: Neo4jAnalyticalPatternRepository,
+):
+    """Internal ResultType nodes and their input/output edges are part of the AP."""
+    root_id, op_id, rt_id = str(uuid4()), str(uuid4()), str(uuid4())
+    mapping = {"result": "value"}
+    ap = AnalyticalPattern.model_construct(
+        nodes=[
+            Node(id=root_id, labels=["Analytical_Pattern"],
+                 properties={"name": "ap"}),
+            Node(id=op_id, labels=["Operator"], properties={"name": "op"}),
+            Node(id=rt_id, labels=["ResultType", "String"],
+                 properties={"name": "result"}),
+        ],
+        edges=[
+            Edge(**{"from": root_id, "to": op_id, "labels": ["consist_of"]}),
+            Edge(**{"from": op_id, "to": rt_id, "labels": ["output"],
+                    "properties": {"mapping": mapping}}),
+        ],
+    )
+    await ap_repository.create(ap)
+
+    retrieved = await ap_repository.get(root_id)
+
+    assert retrieved is not None
+    assert {str(n.id) for n in retrieved.nodes} == {root_id, op_id, rt_id}
+    output = next(e for e in retrieved.edges if "output" in e.labels)
+    assert (str(output.from_), str(output.to)) == (op_id, rt_id)
+    assert output.properties == {"mapping": mapping}
+
+
+@pytest.mark.asyncio
+async def test_list_returns_subgraphs_in_page_order(
+    ap_repository: Neo4jAnalyticalPatternRepository,
+):
+    """list() fetches the whole page at once, in id order, with full subgraphs."""
+    from moma_management.domain.filters import AnalyticalPatternFilter
+
+    aps = [_make_ap() for _ in range(3)]
+    for ap in aps:
+        await ap_repository.create(ap)
+    created = {str(ap.root.id): ap for ap in aps}
+
+    result = await ap_repository.list(AnalyticalPatternFilter(pageSize=100))
+
+    listed = [ap for ap in result["aps"] if str(ap.root.id) in created]
+    assert [str(ap.root.id) for ap in listed] == sorted(created)
+    for ap in listed:
+        operator_id = next(str(n.id) for n in created[str(ap.root.id)].nodes
+                           if "Operator" in n.labels)
+        assert {str(n.id) for n in ap.nodes} == {str(ap.root.id), operator_id}
+        assert [e.labels for e in ap.edges] == [["consist_of"]]
+
+
+@pytest.mark.asyncio
+async def test_list_cursor_walk_visits_every_ap_once(
+    ap_repository: Neo4jAnalyticalPatternRepository,
+):
+    """Following nextCursor yields the same id-ordered sequence as one big page."""
+    from moma_management.domain.filters import AnalyticalPatternFilter
+
+    for _ in range(3):
+        await ap_repository.create(_make_ap())
+    everything = await ap_repository.list(AnalyticalPatternFilter(pageSize=100))
+
+    walked, cursor = [], None
+    while True:
+        page = await ap_repository.list(AnalyticalPatternFilter(
+            pageSize=2, after=cursor, includeTotal=False))
+        assert page["total"] is None
+        walked += [str(ap.root.id) for ap in page["aps"]]
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+
+    assert walked == [str(ap.root.id) for ap in everything["aps"]]
+
+
 @pytest.mark.asyncio
 async def test_delete_removes_ap(
     ap_repository: Neo4jAnalyticalPatternRepository,
@@ -469,6 +548,39 @@ async def test_delete_preserves_data_nodes(
         await driver.close()
 
 
+
+@pytest.mark.asyncio
+async def test_resolve_input_datasets(ap_repository: Neo4jAnalyticalPatternRepository):
+    """Input data nodes are mapped to their datasets without loading the AP."""
+    ds_id, data_id = str(uuid4()), str(uuid4())
+    await Neo4jDatasetRepository(ap_repository._session).create(Dataset(
+        nodes=[
+            Node(id=ds_id, labels=["sc:Dataset"],
+                 properties={"status": "ready"}),
+            Node(id=data_id, labels=["Data"], properties={"name": "data"}),
+        ],
+        edges=[
+            Edge(**{"from": ds_id, "to": data_id, "labels": ["distribution"]}),
+        ],
+    ))
+    ap = _make_ap(data_id=data_id)
+    await ap_repository.create(ap)
+    standalone_id, op_id = str(uuid4()), str(uuid4())
+    await ap_repository.create(AnalyticalPattern(
+        nodes=[
+            Node(id=standalone_id, labels=["Analytical_Pattern"],
+                 properties={"name": "standalone"}),
+            Node(id=op_id, labels=["Operator"], properties={"name": "op"}),
+        ],
+        edges=[
+            Edge(**{"from": standalone_id, "to": op_id, "labels": ["consist_of"]}),
+        ],
+    ))
+
+    assert await ap_repository.resolve_input_datasets(str(ap.root.id)) == {data_id: [ds_id]}
+    assert await ap_repository.resolve_input_datasets(standalone_id) == {}
+    assert await ap_repository.resolve_input_datasets(str(uuid4())) is None
+
 # ---------------------------------------------------------------------------
 # list() – filter / pagination tests
 #
@@ -576,3 +688,4 @@ async def _list_aps(
         AnalyticalPatternFilter(**filter_kwargs),
         accessible_dataset_ids=accessible_dataset_ids,
     )
+
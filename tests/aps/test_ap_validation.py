@@ -146,6 +146,27 @@ class TestEdgeConstraintValidation:
         errors = SchemaStep.validate_edge_constraints(_make_valid_dataset())
         assert errors == []
 
+    def test_repeated_invalid_edges_report_the_same_details(self):
+        """Memoised verdicts still yield one error per edge with its own index."""
+        root_id = str(uuid4())
+        op_ids = [str(uuid4()) for _ in range(3)]
+        data = {
+            "nodes": [
+                {"id": root_id, "labels": [
+                    "Analytical_Pattern"], "properties": {"name": "ap"}},
+                *[{"id": op_id, "labels": ["Operator"],
+                   "properties": {"name": "op"}} for op_id in op_ids],
+            ],
+            "edges": [
+                {"from": root_id, "to": op_id, "labels": ["bad_edge"]}
+                for op_id in op_ids
+            ],
+        }
+        errors = SchemaStep.validate_edge_constraints(data)
+        assert [e.params["edgeIndex"] for e in errors] == [0, 1, 2]
+        assert len({e.message for e in errors}) == 1
+        assert "consist_of" in errors[0].message
+
 
 # ===================================================================
 # Graph-structure validation
@@ -275,6 +296,21 @@ class TestValidateGraph:
         assert "AnalyticalPatternStructure" in err_str
         assert "No node with label" in err_str
 
+    def test_chain_serialises_the_graph_once(self, monkeypatch):
+        """All steps of one run share the JSON form of the graph."""
+        ap = AnalyticalPattern.model_validate(_make_valid_ap())
+        dumps = []
+        original = AnalyticalPattern.model_dump
+
+        def counting_dump(self, *args, **kwargs):
+            dumps.append(kwargs)
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(AnalyticalPattern, "model_dump", counting_dump)
+        errors = AnalyticalPattern.validation_chain.handle(ap)
+        assert errors == []
+        assert len(dumps) == 1
+
 
 # ===================================================================
 # Service-level validate (no DB needed)
@@ -284,22 +320,24 @@ class TestValidateGraph:
 class TestApServiceValidate:
     """Tests for AnalyticalPatternService.validate (uses MagicMock repo)."""
 
-    def test_valid_ap(self):
+    @pytest.mark.asyncio
+    async def test_valid_ap(self):
         from unittest.mock import MagicMock
 
         from moma_management.services.analytical_pattern import AnalyticalPatternService
 
         svc = AnalyticalPatternService(MagicMock(), MagicMock())
-        errors = svc.validate(_make_valid_ap())
+        errors = await svc.validate(_make_valid_ap())
         assert errors == []
 
-    def test_invalid_ap(self):
+    @pytest.mark.asyncio
+    async def test_invalid_ap(self):
         from unittest.mock import MagicMock
 
         from moma_management.services.analytical_pattern import AnalyticalPatternService
 
         svc = AnalyticalPatternService(MagicMock(), MagicMock())
-        errors = svc.validate({"nodes": []})
+        errors = await svc.validate({"nodes": []})
         assert len(errors) >= 1
 
 
@@ -818,7 +856,8 @@ class TestDatasetNodeIO:
 class TestDatasetServiceValidate:
     """Tests for DatasetService.validate (uses MagicMock repo)."""
 
-    def test_valid_dataset(self):
+    @pytest.mark.asyncio
+    async def test_valid_dataset(self):
         from pathlib import Path
         from unittest.mock import MagicMock
 
@@ -827,10 +866,11 @@ class TestDatasetServiceValidate:
         mapping_file = Path(__file__).resolve(
         ).parent.parent.parent / "moma_management" / "domain" / "mapping.yml"
         svc = DatasetService(MagicMock(), mapping_file, MagicMock())
-        errors = svc.validate(_make_valid_dataset())
+        errors = await svc.validate(_make_valid_dataset())
         assert errors == []
 
-    def test_invalid_dataset(self):
+    @pytest.mark.asyncio
+    async def test_invalid_dataset(self):
         from pathlib import Path
         from unittest.mock import MagicMock
 
@@ -839,5 +879,5 @@ class TestDatasetServiceValidate:
         mapping_file = Path(__file__).resolve(
         ).parent.parent.parent / "moma_management" / "domain" / "mapping.yml"
         svc = DatasetService(MagicMock(), mapping_file, MagicMock())
-        errors = svc.validate({"nodes": []})
+        errors = await svc.validate({"nodes": []})
         assert len(errors) >= 1
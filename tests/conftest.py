@@ -390,8 +390,8 @@ async def heavy_dataset_repository(
     """
     Module-scoped repository pre-loaded with all heavy datasets.
 
-    Uses ``create_with_indexes`` so indexes and VIRTUAL_BELONGS_TO backfill
-    run once, mirroring production start-up.
+    Uses ``create_with_indexes`` so indexes exist before the datasets are
+    ingested, as they would after the start-up migrations.
     """
     from moma_management.domain.dataset import Dataset
 
@@ -2,7 +2,7 @@
 Unit tests for DatasetRelationshipService (MagicMock/AsyncMock — no Neo4j container).
 """
 
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock
 from uuid import uuid4
 
 import pytest
@@ -35,15 +35,8 @@ def _make_relationship(ds_id_a: str, ds_id_b: str) -> DatasetRelationship:
 
 
 def _found_datasets(*ids: str) -> dict:
-    """Build a DatasetService.list()-shaped return value where *ids* all resolve."""
-    datasets = []
-    for i in ids:
-        node = MagicMock()
-        node.id = i
-        ds = MagicMock()
-        ds.nodes = [node]
-        datasets.append(ds)
-    return {"datasets": datasets}
+    """Build a DatasetService.resolve_owning_datasets()-shaped return value where *ids* all resolve."""
+    return {i: [i] for i in ids}
 
 
 # ---------------------------------------------------------------------------
@@ -58,7 +51,7 @@ async def test_create_fails_if_dataset_not_found():
 
     repo = AsyncMock()
     dataset_svc = AsyncMock()
-    dataset_svc.list.return_value = {"datasets": []}
+    dataset_svc.resolve_owning_datasets.return_value = {}
 
     svc = DatasetRelationshipService(repo, dataset_svc)
 
@@ -77,7 +70,7 @@ async def test_create_fails_if_pair_already_linked():
     repo = AsyncMock()
     repo.find_id_for_dataset_pair.return_value = str(uuid4())
     dataset_svc = AsyncMock()
-    dataset_svc.list.return_value = _found_datasets(ds_a, ds_b)
+    dataset_svc.resolve_owning_datasets.return_value = _found_datasets(ds_a, ds_b)
 
     svc = DatasetRelationshipService(repo, dataset_svc)
 
@@ -96,7 +89,7 @@ async def test_create_success_when_both_datasets_found_and_pair_unique():
     repo = AsyncMock()
     repo.find_id_for_dataset_pair.return_value = None
     dataset_svc = AsyncMock()
-    dataset_svc.list.return_value = _found_datasets(ds_a, ds_b)
+    dataset_svc.resolve_owning_datasets.return_value = _found_datasets(ds_a, ds_b)
 
     svc = DatasetRelationshipService(repo, dataset_svc)
     returned_id = await svc.create(rel)
@@ -159,7 +152,7 @@ async def test_list_for_dataset_raises_not_found_when_dataset_missing():
     """list_for_dataset() must raise NotFoundError when the dataset does not exist."""
     repo = AsyncMock()
     dataset_svc = AsyncMock()
-    dataset_svc.get.side_effect = NotFoundError("no such dataset")
+    dataset_svc.resolve_owning_datasets.return_value = {}
 
     svc = DatasetRelationshipService(repo, dataset_svc)
     with pytest.raises(NotFoundError):
@@ -178,26 +171,29 @@ async def test_list_for_dataset_returns_all_when_no_access_filter():
     repo = AsyncMock()
     repo.list_for_dataset.return_value = [rel_ab, rel_ac]
     dataset_svc = AsyncMock()
+    dataset_svc.resolve_owning_datasets.return_value = _found_datasets(ds_a)
 
     svc = DatasetRelationshipService(repo, dataset_svc)
     result = await svc.list_for_dataset(ds_a)
 
     assert result == [rel_ab, rel_ac]
+    repo.list_for_dataset.assert_called_once_with(
+        ds_a, accessible_dataset_ids=None, skip=0, limit=None)
 
 
 @pytest.mark.asyncio
-async def test_list_for_dataset_filters_out_relationships_to_inaccessible_datasets():
-    """list_for_dataset() excludes relationships whose OTHER dataset is not accessible."""
-    ds_a, ds_b, ds_c = str(uuid4()), str(uuid4()), str(uuid4())
-    rel_ab = _make_relationship(ds_a, ds_b)
-    rel_ac = _make_relationship(ds_a, ds_c)
+async def test_list_for_dataset_forwards_access_filter_and_page():
+    """list_for_dataset() delegates access filtering and paging to the repository."""
+    ds_a, ds_b = str(uuid4()), str(uuid4())
 
     repo = AsyncMock()
-    repo.list_for_dataset.return_value = [rel_ab, rel_ac]
+    repo.list_for_dataset.return_value = []
     dataset_svc = AsyncMock()
+    dataset_svc.resolve_owning_datasets.return_value = _found_datasets(ds_a)
 
     svc = DatasetRelationshipService(repo, dataset_svc)
-    # Caller can only browse ds_a and ds_b, not ds_c -> rel_ac must be excluded
-    result = await svc.list_for_dataset(ds_a, accessible_dataset_ids=[ds_a, ds_b])
+    await svc.list_for_dataset(
+        ds_a, accessible_dataset_ids=[ds_a, ds_b], page=3, page_size=20)
 
-    assert result == [rel_ab]
+    repo.list_for_dataset.assert_called_once_with(
+        ds_a, accessible_dataset_ids=[ds_a, ds_b], skip=40, limit=20)
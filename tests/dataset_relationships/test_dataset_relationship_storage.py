@@ -221,3 +221,50 @@ async def test_list_for_dataset_returns_only_matching_relationships(
     await relationship_repository.delete(str(rel_ab.root.id))
     await relationship_repository.delete(str(rel_ac.root.id))
     await relationship_repository.delete(str(rel_bc.root.id))
+
+
+@pytest.mark.asyncio
+async def test_list_for_dataset_loads_subgraphs_and_pages(
+    relationship_repository: Neo4jDatasetRelationshipRepository,
+):
+    """Listed relationships match get(), ordered by ID, and page consistently."""
+    ds_a = str(uuid4())
+    rels = [_make_relationship(ds_a, str(uuid4())) for _ in range(3)]
+    for rel in rels:
+        await relationship_repository.create(rel)
+    ordered_ids = sorted(str(rel.root.id) for rel in rels)
+
+    result = await relationship_repository.list_for_dataset(ds_a)
+    assert [str(r.root.id) for r in result] == ordered_ids
+    for listed in result:
+        single = await relationship_repository.get(str(listed.root.id))
+        assert {str(n.id) for n in listed.nodes} == {str(n.id) for n in single.nodes}
+        assert [(e.labels, e.properties) for e in listed.edges] == [
+            (["HAS_COMPARISON"], {"weight": 0.5})]
+
+    first = await relationship_repository.list_for_dataset(ds_a, limit=2)
+    rest = await relationship_repository.list_for_dataset(ds_a, skip=2, limit=2)
+    assert [str(r.root.id) for r in first + rest] == ordered_ids
+
+    for rel in rels:
+        await relationship_repository.delete(str(rel.root.id))
+
+
+@pytest.mark.asyncio
+async def test_list_for_dataset_excludes_inaccessible_targets(
+    relationship_repository: Neo4jDatasetRelationshipRepository,
+):
+    """Relationships to a dataset outside accessible_dataset_ids are left out."""
+    ds_a, ds_b, ds_c = str(uuid4()), str(uuid4()), str(uuid4())
+    rel_ab = _make_relationship(ds_a, ds_b)
+    rel_ac = _make_relationship(ds_a, ds_c)
+    await relationship_repository.create(rel_ab)
+    await relationship_repository.create(rel_ac)
+
+    result = await relationship_repository.list_for_dataset(
+        ds_a, accessible_dataset_ids=[ds_a, ds_b])
+
+    assert [str(r.root.id) for r in result] == [str(rel_ab.root.id)]
+
+    await relationship_repository.delete(str(rel_ab.root.id))
+    await relationship_repository.delete(str(rel_ac.root.id))
@@ -1,12 +1,19 @@
 
 import json
+import os
 from pathlib import Path
 
 import pytest
 import yaml
 
 from moma_management.domain.generated.moma_schema import MoMaGraphModel
-from moma_management.domain.mapping_engine import croissant_to_pgjson
+from moma_management.domain.mapping_engine import (
+    _enrich_field_sources,
+    compile_condition,
+    croissant_to_pgjson,
+    get_path,
+    load_mapping_plan,
+)
 from moma_management.legacy.converters import Croissant2PGjson
 from tests.utils import normalize, save
 
@@ -283,3 +290,79 @@ def test_column_statistics_new_fields_mapped(mapping_file: Path):
     assert "percentile95" not in text
     assert "generatedAt" not in text
     assert text.get("rowCount") == 200
+
+
+def test_compiled_plan_matches_raw_mapping(light_profile: Path, mapping_file: Path):
+    """Converting with a cached MappingPlan must give the same graph as the raw mapping."""
+    mapping = yaml.safe_load(mapping_file.open("r"))
+    plan = load_mapping_plan(mapping_file)
+
+    from_raw = croissant_to_pgjson(json.load(light_profile.open("r")), mapping)
+    from_plan = croissant_to_pgjson(json.load(light_profile.open("r")), plan)
+
+    assert from_plan == from_raw
+
+
+def test_mapping_plan_is_cached_until_file_changes(tmp_path: Path, mapping_file: Path):
+    """load_mapping_plan must reuse its plan and recompile only when the mtime changes."""
+    local_mapping = tmp_path / "mapping.yml"
+    local_mapping.write_text(mapping_file.read_text())
+
+    plan = load_mapping_plan(local_mapping)
+    assert load_mapping_plan(local_mapping) is plan
+
+    stat = local_mapping.stat()
+    os.utime(local_mapping, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_mapping_plan(local_mapping) is not plan
+
+
+def _reference_truthy(data: dict, expr: str) -> bool:
+    """The original string-parsing evaluator, kept as the differential oracle."""
+    if "||" in expr:
+        return any(_reference_truthy(data, part.strip()) for part in expr.split("||"))
+    if "&&" in expr:
+        return all(_reference_truthy(data, part.strip()) for part in expr.split("&&"))
+    if "^=" in expr:
+        left, right = expr.split("^=", 1)
+        return str(get_path(data, left.strip())).startswith(right.strip().strip("'\""))
+    if "==" in expr:
+        left, right = expr.split("==", 1)
+        return str(get_path(data, left.strip())) == right.strip().strip("'\"")
+    return get_path(data, expr) is not None
+
+
+def _walk(value):
+    """Yield every dict in a nested YAML/JSON structure."""
+    if isinstance(value, dict):
+        yield value
+        for v in value.values():
+            yield from _walk(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _walk(v)
+
+
+@pytest.mark.parametrize(
+    "profile_path",
+    sorted(PROFILES_DIR.rglob("*.json")),
+    ids=lambda p: f"{p.parent.name}/{p.name}",
+)
+def test_compiled_conditions_match_reference(profile_path: Path, mapping_file: Path):
+    """Compiled predicates must agree with the string evaluator on every object of every profile."""
+    mapping = yaml.safe_load(mapping_file.open("r"))
+    expressions = {
+        d[key]
+        for d in _walk(mapping)
+        for key in ("case", "when", "match")
+        if isinstance(d.get(key), str)
+    }
+    assert expressions
+
+    profile = json.load(profile_path.open("r"))
+    _enrich_field_sources(profile)
+
+    for obj in _walk(profile):
+        for expr in expressions:
+            assert compile_condition(expr)(obj) == _reference_truthy(obj, expr), (
+                f"{expr!r} disagrees on {obj.get('@id')!r}"
+            )
@@ -3,10 +3,14 @@ Performance tests for Dataset repository get() and list() operations.
 
 Every query must complete within MAX_SECONDS (60 s). The heavy_dataset_repository
 fixture (conftest.py) loads all heavy datasets into a shared Neo4j container.
+TestTraversalModes compares the VIRTUAL_BELONGS_TO reads and deletes with the
+hop-by-hop fallback; run it with ``-s -p no:xdist`` to see the report.
 """
 
+import json
 import time
 from pathlib import Path
+from uuid import uuid4
 
 import pytest
 
@@ -18,11 +22,14 @@ from moma_management.domain.filters import (
     NodeLabel,
 )
 from moma_management.domain.generated.nodes.dataset.dataset_schema import Status
+from moma_management.repository import Neo4jDatasetRepository
+from tests.utils import timed_median
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 HEAVY_DIR = PROJECT_ROOT / "assets" / "datasets" / "heavy"
 
 MAX_SECONDS = 60
+RUNS = 5
 
 # ---------------------------------------------------------------------------
 # Pre-compute dataset metadata at collection time
@@ -71,6 +78,25 @@ async def _timed_list(repo, **kwargs):
     return result, time.monotonic() - t0
 
 
+def _fresh_copy(stem: str) -> Dataset:
+    """Return a heavy dataset with fresh ids, so that it can be stored again."""
+    raw = json.loads((HEAVY_DIR / f"{stem}.json").read_text())
+    id_map = {n["id"]: str(uuid4()) for n in raw["nodes"]}
+    for node in raw["nodes"]:
+        node["id"] = id_map[node["id"]]
+    for edge in raw["edges"]:
+        edge["from"] = id_map[edge["from"]]
+        edge["to"] = id_map[edge["to"]]
+    return Dataset.model_validate(raw)
+
+
+def _hop_repository(repo: Neo4jDatasetRepository) -> Neo4jDatasetRepository:
+    """Return a repository on the same session using the hop-based fallback."""
+    fallback = Neo4jDatasetRepository(repo._session)
+    fallback.use_virtual_edges = False
+    return fallback
+
+
 # ---------------------------------------------------------------------------
 # get() performance
 # ---------------------------------------------------------------------------
@@ -93,6 +119,67 @@ class TestGetPerformance:
         assert elapsed < MAX_SECONDS
 
 
+# ---------------------------------------------------------------------------
+# VIRTUAL_BELONGS_TO reads vs. hop-based fallback
+# ---------------------------------------------------------------------------
+
+
+class TestTraversalModes:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("stem,ds_id", list(_IDS.items()), ids=list(_IDS.keys()))
+    async def test_get_matches_fallback(self, heavy_dataset_repository, stem, ds_id):
+        hops = _hop_repository(heavy_dataset_repository)
+        virtual_ds, virtual_s = await timed_median(
+            lambda: heavy_dataset_repository.get(ds_id), RUNS)
+        hop_ds, hop_s = await timed_median(lambda: hops.get(ds_id), RUNS)
+
+        assert virtual_ds is not None and hop_ds is not None
+        assert {n.id for n in virtual_ds.nodes} == {n.id for n in hop_ds.nodes}
+        assert len(virtual_ds.edges or []) == len(hop_ds.edges or [])
+        assert virtual_s < MAX_SECONDS
+
+        print(f"\nget {stem:<40} {len(virtual_ds.nodes):>6} nodes"
+              f" | virtual {virtual_s * 1000:8.1f} ms | hops {hop_s * 1000:8.1f} ms")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("stem,ds_id", list(_IDS.items()), ids=list(_IDS.keys()))
+    async def test_has_referencing_aps_matches_fallback(self, heavy_dataset_repository, stem, ds_id):
+        hops = _hop_repository(heavy_dataset_repository)
+        virtual, virtual_s = await timed_median(
+            lambda: heavy_dataset_repository.has_referencing_aps(ds_id), RUNS)
+        hop, hop_s = await timed_median(lambda: hops.has_referencing_aps(ds_id), RUNS)
+
+        assert virtual == hop
+        assert virtual_s < MAX_SECONDS
+
+        print(f"\nhas_referencing_aps {stem:<28}"
+              f" | virtual {virtual_s * 1000:8.1f} ms | hops {hop_s * 1000:8.1f} ms")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("stem", list(_IDS.keys()))
+    async def test_delete_matches_fallback(self, heavy_dataset_repository, stem):
+        hops = _hop_repository(heavy_dataset_repository)
+        durations = {}
+        for name, repo in (("virtual", heavy_dataset_repository), ("hops", hops)):
+            # Each run deletes a copy of its own, stored beforehand.
+            copies = [_fresh_copy(stem) for _ in range(RUNS)]
+            for ds in copies:
+                assert await heavy_dataset_repository.create(ds) == "success"
+            root_ids = iter([ds.root_id for ds in copies])
+            deleted, durations[name] = await timed_median(
+                lambda: repo.delete(next(root_ids)), RUNS)
+
+            assert deleted == 1
+            node_ids = [str(n.id) for ds in copies for n in ds.nodes]
+            assert await heavy_dataset_repository.resolve_owning_datasets(node_ids) == {}
+        assert durations["virtual"] < MAX_SECONDS
+
+        print(f"\ndelete {stem:<37} {len(copies[0].nodes):>6} nodes"
+              f" | virtual {durations['virtual'] * 1000:8.1f} ms"
+              f" | hops {durations['hops'] * 1000:8.1f} ms")
+
+
 # ---------------------------------------------------------------------------
 # list() performance – parametrized filter combinations
 # ---------------------------------------------------------------------------
@@ -2,11 +2,13 @@
 All tests that involve complex ingestion pipeline.
 """
 import json
+import threading
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from moma_management.domain.dataset import Dataset
 from moma_management.domain.exceptions import (
     ConversionError,
     NotFoundError,
@@ -120,16 +122,35 @@ async def test_convert_invalid_croissant_raises_conversion_error(dataset_service
     """A mapping engine failure must be wrapped in ConversionError."""
     with patch("moma_management.services.dataset.croissant_to_pgjson", side_effect=ValueError("bad input")):
         with pytest.raises(ConversionError):
-            dataset_service.convert({})
+            await dataset_service.convert({})
 
 
 @pytest.mark.asyncio
 async def test_validate_invalid_pgjson_returns_errors(dataset_service: DatasetService):
     """Structurally invalid PG-JSON must return a non-empty list of SchemaErrors."""
-    errors = dataset_service.validate({"nodes": "not-a-list"})
+    errors = await dataset_service.validate({"nodes": "not-a-list"})
     assert len(errors) >= 1
 
 
+@pytest.mark.asyncio
+async def test_parse_light_dataset_returns_dataset(mapping_file: Path):
+    """A valid PG-JSON body must be parsed into a Dataset on the CPU executor."""
+    svc = DatasetService(repo=AsyncMock(), mapping_file=mapping_file, relationship_repo=AsyncMock())
+    light_dataset = Path(__file__).parent.parent.parent / \
+        "assets" / "datasets" / "light" / "esco_light.json"
+    dataset = await svc.parse(json.loads(light_dataset.read_text()))
+    assert isinstance(dataset, Dataset)
+    assert dataset.root_id
+
+
+@pytest.mark.asyncio
+async def test_parse_invalid_pgjson_raises_validation_error(mapping_file: Path):
+    """A body that is not valid PG-JSON must raise the domain ValidationError."""
+    svc = DatasetService(repo=AsyncMock(), mapping_file=mapping_file, relationship_repo=AsyncMock())
+    with pytest.raises(ValidationError):
+        await svc.parse({"nodes": "not-a-list"})
+
+
 @pytest.mark.asyncio
 async def test_get_missing_dataset_raises_not_found(dataset_service: DatasetService):
     """Getting a non-existent dataset ID must raise NotFoundError."""
@@ -184,3 +205,135 @@ async def test_ingest_repo_error_propagates(mapping_file: Path):
     )
     with pytest.raises(RuntimeError, match="Neo4j is down"):
         await svc.ingest(json.loads(light_profile.read_text()))
+
+
+# ---------------------------------------------------------------------------
+# Streaming ingestion
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_ingest_streaming_matches_convert(light_profile: Path, mapping_file: Path):
+    """Streamed chunks must add up to the converted graph, with edges after their endpoints."""
+    chunks = []
+
+    async def _consume(root_id, stream):
+        chunks.extend([chunk async for chunk in stream])
+
+    repo = AsyncMock()
+    repo.create_streaming.side_effect = _consume
+    svc = DatasetService(repo=repo, mapping_file=mapping_file,
+                         relationship_repo=AsyncMock(), stream_chunk_size=2)
+
+    expected = await svc.convert(json.loads(light_profile.read_text()))
+    summary = await svc.ingest_streaming(json.loads(light_profile.read_text()))
+
+    assert summary == {
+        "id": expected.root_id,
+        "nodes": len(expected.nodes),
+        "edges": len(expected.edges or []),
+    }
+    assert all(len(c.nodes) <= 2 for c in chunks)
+
+    written: set[str] = set()
+    streamed_edges = []
+    for chunk in chunks:
+        written |= {str(n.id) for n in chunk.nodes}
+        for e in chunk.edges:
+            assert str(e.from_) in written and str(e.to) in written
+        streamed_edges += chunk.edges
+    assert written == {str(n.id) for n in expected.nodes}
+    assert len(streamed_edges) == len(expected.edges or [])
+
+
+@pytest.mark.asyncio
+async def test_ingest_streaming_converts_off_the_event_loop(
+    light_profile: Path, mapping_file: Path, monkeypatch,
+):
+    """Conversion and validation of streamed chunks never run on the loop's thread."""
+    from moma_management.domain.validation import StreamingGraphValidator
+
+    threads: set[int] = set()
+    add_node = StreamingGraphValidator.add_node
+
+    def _recording_add_node(self, raw):
+        threads.add(threading.get_ident())
+        return add_node(self, raw)
+
+    monkeypatch.setattr(StreamingGraphValidator, "add_node", _recording_add_node)
+
+    async def _consume(root_id, stream):
+        async for _ in stream:
+            pass
+
+    repo = AsyncMock()
+    repo.create_streaming.side_effect = _consume
+    svc = DatasetService(repo=repo, mapping_file=mapping_file,
+                         relationship_repo=AsyncMock(), stream_chunk_size=2)
+    await svc.ingest_streaming(json.loads(light_profile.read_text()))
+
+    assert threads
+    assert threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_ingest_streaming_without_root_raises(mapping_file: Path):
+    """A profile that yields no sc:Dataset root must be rejected before any write."""
+    repo = AsyncMock()
+    svc = DatasetService(repo=repo, mapping_file=mapping_file,
+                         relationship_repo=AsyncMock())
+    with pytest.raises(ValidationError):
+        await svc.ingest_streaming({"@type": "cr:FileObject", "@id": "x"})
+    repo.create_streaming.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Listing
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_list_counts_each_filter_once_with_total_cache(mapping_file: Path):
+    """Pages of the same filter share one cached count; another filter counts again."""
+    from moma_management.domain.filters import DatasetFilter
+    from moma_management.services.ttl_cache import TtlCache
+
+    repo = AsyncMock()
+    repo.list.return_value = {"datasets": [], "total": None, "nextCursor": None}
+    repo.count.return_value = 3
+    svc = DatasetService(repo=repo, mapping_file=mapping_file,
+                         relationship_repo=AsyncMock(), total_cache=TtlCache(60))
+
+    assert (await svc.list(DatasetFilter(page=1)))["total"] == 3
+    assert (await svc.list(DatasetFilter(page=2)))["total"] == 3
+    assert repo.count.await_count == 1
+    await svc.list(DatasetFilter(nodeIds=["ds-1"]))
+    assert repo.count.await_count == 2
+    assert all(call.args[0].includeTotal is False for call in repo.list.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cached_totals(mapping_file: Path):
+    """Creating or deleting a dataset drops the cached dataset totals, not the AP ones."""
+    from moma_management.domain.filters import DatasetFilter
+    from moma_management.services.ttl_cache import TtlCache
+
+    repo = AsyncMock()
+    repo.list.return_value = {"datasets": [], "total": None, "nextCursor": None}
+    repo.count.return_value = 3
+    repo.has_referencing_aps.return_value = False
+    repo.delete.return_value = 1
+    cache = TtlCache(60)
+    cache.set(("aps", "all"), 5)
+    svc = DatasetService(repo=repo, mapping_file=mapping_file,
+                         relationship_repo=AsyncMock(), total_cache=cache)
+
+    await svc.list(DatasetFilter())
+    await svc.create(MagicMock())
+    await svc.list(DatasetFilter())
+    assert repo.count.await_count == 2
+
+    await svc.delete("ds-1")
+    await svc.list(DatasetFilter())
+    assert repo.count.await_count == 3
+    assert cache.get(("aps", "all")) == 5
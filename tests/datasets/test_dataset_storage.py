@@ -15,6 +15,7 @@ from pydantic import ValidationError
 from testcontainers.neo4j import Neo4jContainer
 
 from moma_management.domain.dataset import Dataset
+from moma_management.domain.exceptions import ValidationError as MomaValidationError
 from moma_management.domain.filters import (
     DatasetFilter,
     DatasetSortField,
@@ -167,6 +168,176 @@ async def test_deletion(
     )
 
 
+@pytest.mark.asyncio
+async def test_round_trip_with_small_write_batches(
+    dataset_repository: Neo4jDatasetRepository, monkeypatch,
+):
+    """
+    Splitting the bulk UNWIND writes into many small chunks must store
+    exactly the same graph as a single-batch write.
+    """
+    dataset_path = Path(__file__).parent.parent.parent / "assets" / \
+        "datasets" / "light" / "esco_light.json"
+    original = Dataset.model_validate_json(dataset_path.read_text())
+    monkeypatch.setattr(dataset_repository, "write_batch_size", 3)
+
+    assert await dataset_repository.create(original) == "success"
+
+    stored = await dataset_repository.get(original.root_id)
+    expected = _with_normalised_dates(original)
+    assert len(stored.nodes) == len(expected.nodes)
+    assert len(stored.edges) == len(expected.edges)
+    assert stored == expected
+
+
+@pytest.mark.asyncio
+async def test_facets_follow_child_node_changes(
+    dataset_repository: Neo4jDatasetRepository,
+):
+    """
+    The type / MIME-type facets of a dataset follow updates and deletions
+    of its child nodes, so the list filters keep matching its subgraph.
+    """
+    from uuid import uuid4
+
+    from moma_management.domain.generated.edges.edge_schema import Edge
+    from moma_management.domain.generated.nodes.node_schema import Node
+    from moma_management.repository.node import Neo4jNodeRepository
+
+    ds_id, file_id = str(uuid4()), str(uuid4())
+    file_node = Node(id=file_id, labels=["cr:FileObject", "CSV"],
+                     properties={"encodingFormat": "text/csv"})
+    await dataset_repository.create(Dataset.model_construct(
+        nodes=[Node(id=ds_id, labels=["sc:Dataset"], properties={}), file_node],
+        edges=[Edge(**{"from": ds_id, "to": file_id, "labels": ["distribution"]})],
+    ))
+
+    async def matching(**kwargs) -> int:
+        return (await _list(dataset_repository, nodeIds=[ds_id], **kwargs))["total"]
+
+    assert await matching(mimeTypes=[MimeType.CSV]) == 1
+    assert await matching(types=[NodeLabel.CSV]) == 1
+
+    await dataset_repository.update(Dataset.model_construct(nodes=[file_node.model_copy(
+        update={"properties": {"encodingFormat": "application/pdf"}})]))
+    assert await matching(mimeTypes=[MimeType.CSV]) == 0
+    assert await matching(mimeTypes=[MimeType.PDF]) == 1
+
+    await Neo4jNodeRepository(dataset_repository._session).delete(file_id)
+    assert await matching(mimeTypes=[MimeType.PDF]) == 0
+    assert await matching(types=[NodeLabel.CSV]) == 0
+
+
+@pytest.mark.asyncio
+async def test_update_rejects_invalid_node_properties(
+    dataset_repository: Neo4jDatasetRepository,
+):
+    """
+    An update is validated against the stored form of the nodes it touches,
+    and nothing is written when it fails.
+    """
+    from uuid import uuid4
+
+    from moma_management.domain.generated.edges.edge_schema import Edge
+    from moma_management.domain.generated.nodes.node_schema import Node
+
+    ds_id, file_id = str(uuid4()), str(uuid4())
+    file_node = Node(id=file_id, labels=["cr:FileObject", "CSV", "Data"],
+                     properties={"name": "data.csv"})
+    await dataset_repository.create(Dataset.model_construct(
+        nodes=[Node(id=ds_id, labels=["sc:Dataset"], properties={}), file_node],
+        edges=[Edge(**{"from": ds_id, "to": file_id, "labels": ["distribution"]})],
+    ))
+
+    with pytest.raises(MomaValidationError, match="/nodes/0/properties/name"):
+        await dataset_repository.update(Dataset.model_construct(nodes=[
+            file_node.model_copy(update={"properties": {"name": 12}})]))
+    # Labels are not written by an update, so they cannot change the verdict.
+    with pytest.raises(MomaValidationError, match="/nodes/0/properties/name"):
+        await dataset_repository.update(Dataset.model_construct(nodes=[
+            file_node.model_copy(update={"labels": ["sc:Dataset"], "properties": {"name": 12}})]))
+
+    stored = await dataset_repository.get(ds_id)
+    node = next(n for n in stored.nodes if str(n.id) == file_id)
+    assert node.properties["name"] == "data.csv"
+
+
+@pytest.mark.asyncio
+async def test_nodes_attached_later_join_their_dataset(
+    dataset_repository: Neo4jDatasetRepository,
+):
+    """
+    Nodes hung below a stored dataset by a later PG-JSON write gain their
+    VIRTUAL_BELONGS_TO edge, so the dataset read and facets include them.
+    """
+    from uuid import uuid4
+
+    from moma_management.domain.generated.edges.edge_schema import Edge
+    from moma_management.domain.generated.moma_schema import MoMaGraphModel
+    from moma_management.domain.generated.nodes.node_schema import Node
+
+    ds_id, file_id, set_id, field_id = (str(uuid4()) for _ in range(4))
+    await dataset_repository.create(Dataset.model_construct(
+        nodes=[Node(id=ds_id, labels=["sc:Dataset"], properties={}),
+               Node(id=file_id, labels=["cr:FileObject"], properties={})],
+        edges=[Edge(**{"from": ds_id, "to": file_id, "labels": ["distribution"]})],
+    ))
+
+    # Chained below the existing file node: linking must spread two hops.
+    await dataset_repository._session.execute_write(
+        dataset_repository.create_pgson_bulk,
+        MoMaGraphModel.model_construct(
+            nodes=[Node(id=set_id, labels=["cr:FileSet"],
+                        properties={"encodingFormat": "application/pdf"}),
+                   Node(id=field_id, labels=["cr:Field"], properties={})],
+            edges=[Edge(**{"from": file_id, "to": set_id, "labels": ["containedIn"]}),
+                   Edge(**{"from": set_id, "to": field_id, "labels": ["field"]})],
+        ),
+    )
+
+    owners = await dataset_repository.resolve_owning_datasets([set_id, field_id])
+    assert owners == {set_id: [ds_id], field_id: [ds_id]}
+    assert (await _list(dataset_repository, nodeIds=[ds_id],
+                        mimeTypes=[MimeType.PDF]))["total"] == 1
+
+
+
+@pytest.mark.asyncio
+async def test_deleting_an_intermediate_node_unlinks_its_children(
+    dataset_repository: Neo4jDatasetRepository,
+):
+    """
+    Children that only reached the dataset through a deleted node lose their
+    VIRTUAL_BELONGS_TO edge, so the dataset read no longer includes them.
+    """
+    from uuid import uuid4
+
+    from moma_management.domain.generated.edges.edge_schema import Edge
+    from moma_management.domain.generated.nodes.node_schema import Node
+    from moma_management.repository.node import Neo4jNodeRepository
+
+    ds_id, file_id, set_id, field_id, stats_id = (str(uuid4()) for _ in range(5))
+    await dataset_repository.create(Dataset.model_construct(
+        nodes=[Node(id=ds_id, labels=["sc:Dataset"], properties={}),
+               Node(id=file_id, labels=["cr:FileObject"], properties={}),
+               Node(id=set_id, labels=["cr:RecordSet"], properties={}),
+               Node(id=field_id, labels=["cr:Field"], properties={}),
+               Node(id=stats_id, labels=["Statistics"], properties={})],
+        edges=[Edge(**{"from": ds_id, "to": file_id, "labels": ["distribution"]}),
+               Edge(**{"from": ds_id, "to": set_id, "labels": ["recordSet"]}),
+               Edge(**{"from": set_id, "to": field_id, "labels": ["field"]}),
+               Edge(**{"from": field_id, "to": stats_id, "labels": ["statistics"]})],
+    ))
+    owners = await dataset_repository.resolve_owning_datasets([field_id, stats_id])
+    assert owners == {field_id: [ds_id], stats_id: [ds_id]}
+
+    assert await Neo4jNodeRepository(dataset_repository._session).delete(set_id) == 1
+
+    owners = await dataset_repository.resolve_owning_datasets([file_id, field_id, stats_id])
+    assert owners == {file_id: [ds_id], field_id: [], stats_id: []}
+    stored = await dataset_repository.get(ds_id)
+    assert {str(n.id) for n in stored.nodes} == {ds_id, file_id}
+
 # NOTE: The listing test are autogenerated and are subject to change as the listing functionality evolves.
 # ---------------------------------------------------------------------------
 # list() – all filter/sort/pagination tests share ONE Neo4j container via
@@ -276,6 +447,17 @@ class TestListMethod:
         }
         assert returned_dataset_ids == {DS_ALPHA_ID}
 
+    # -- owning datasets -----------------------------------------------------
+
+    @pytest.mark.asyncio
+    async def test_resolve_owning_datasets(self, populated_repository):
+        owners = await populated_repository.resolve_owning_datasets(
+            [DS_ALPHA_FILE_ID, DS_BETA_ID, "no-such-id"])
+        assert owners == {
+            DS_ALPHA_FILE_ID: [DS_ALPHA_ID],
+            DS_BETA_ID: [DS_BETA_ID],
+        }
+
     # -- filter by status ----------------------------------------------------
 
     @pytest.mark.asyncio
@@ -430,6 +612,46 @@ class TestListMethod:
         page2 = await _list(populated_repository, page=2, pageSize=2, orderBy=["id"])
         assert page1["total"] == page2["total"] == 3
 
+    @pytest.mark.asyncio
+    async def test_cursor_walk_matches_offset_order(self, populated_repository):
+        """Following nextCursor visits every dataset once, in sort order."""
+        def root_ids(page):
+            return [n.id for ds in page["datasets"]
+                    for n in ds.nodes if "sc:Dataset" in n.labels]
+
+        expected = root_ids(await _list(
+            populated_repository, orderBy=["id"], direction=SortDirection.DESC))
+
+        walked, cursor = [], None
+        while True:
+            page = await _list(populated_repository, pageSize=1, after=cursor,
+                               orderBy=["id"], direction=SortDirection.DESC)
+            walked += root_ids(page)
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+        assert walked == expected
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self, populated_repository):
+        result = await _list(populated_repository, pageSize=3)
+        assert len(result["datasets"]) == 3
+        assert result["nextCursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_total_can_be_skipped(self, populated_repository):
+        result = await _list(populated_repository, pageSize=2, includeTotal=False)
+        assert result["total"] is None
+        assert len(result["datasets"]) == 2
+        assert result["nextCursor"] is not None
+
+    @pytest.mark.asyncio
+    async def test_cursor_rejected_for_other_ordering(self, populated_repository):
+        page = await _list(populated_repository, pageSize=1, orderBy=["id"])
+        with pytest.raises(MomaValidationError):
+            await _list(populated_repository, pageSize=1, after=page["nextCursor"],
+                        orderBy=["id"], direction=SortDirection.DESC)
+
     # -- filter by mimeType --------------------------------------------------
     # Seed data reminder:
     #   ds-alpha  cr:FileObject + CSV  →  matches text/csv
@@ -555,6 +777,24 @@ class TestOrderByDate:
         assert self._dates(result) == [
             "2023-01-15", "2024-01-15", "2024-06-01", "2025-03-01"]
 
+    @pytest.mark.asyncio
+    async def test_cursor_walk_by_date(self, mixed_date_repository):
+        """Cursor pages sorted DESC by datePublished follow the full sequence."""
+        dates, cursor = [], None
+        while True:
+            page = await _list(
+                mixed_date_repository,
+                pageSize=1,
+                after=cursor,
+                orderBy=[DatasetSortField.DATE_PUBLISHED],
+                direction=SortDirection.DESC,
+            )
+            dates += self._dates(page)
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+        assert dates == ["2025-03-01", "2024-06-01", "2024-01-15", "2023-01-15"]
+
     @pytest.mark.asyncio
     async def test_date_range_filter_works_with_mixed_input_formats(self, mixed_date_repository):
         """publishedFrom/publishedTo must correctly bound datasets after normalisation."""
@@ -814,3 +1054,68 @@ async def test_prevent_ap_or_ml_traversal(
         assert node_id not in returned_ids, (
             f"Node connected via forbidden edge '{edge_type}' must not be returned"
         )
+
+
+@pytest.mark.asyncio
+async def test_hop_fallback_reads_and_deletes_unlinked_dataset(
+    dataset_repository: Neo4jDatasetRepository,
+):
+    """
+    With use_virtual_edges off, a dataset stored without VIRTUAL_BELONGS_TO
+    edges (not yet backfilled) is still read and deleted as a whole.
+    """
+    from uuid import uuid4
+
+    ds_id, file_id, field_id = (str(uuid4()) for _ in range(3))
+    session = dataset_repository._session
+    await session.run(
+        """
+        CREATE (d:MomaNode:`sc:Dataset` {id: $dsId})
+        CREATE (f:MomaNode:`cr:FileObject` {id: $fileId})
+        CREATE (c:MomaNode:`cr:Field` {id: $fieldId})
+        CREATE (d)-[:distribution]->(f)-[:field]->(c)
+        """,
+        dsId=ds_id, fileId=file_id, fieldId=field_id,
+    )
+
+    fallback = Neo4jDatasetRepository(session)
+    fallback.use_virtual_edges = False
+
+    result = await fallback.get(ds_id)
+    assert result is not None
+    assert {str(n.id) for n in result.nodes} == {ds_id, file_id, field_id}
+    assert len(result.edges) == 2
+
+    assert await fallback.delete(ds_id) == 1
+    owners = await dataset_repository.resolve_owning_datasets([ds_id, file_id, field_id])
+    assert owners == {}
+
+
+def test_newly_owned_stops_at_max_hops():
+    """
+    Nodes join a dataset only within DATASET_MAX_HOPS of its root, as with
+    the hop-based reads, and a later chunk bringing them closer links them.
+    """
+    from uuid import uuid4
+
+    from moma_management.domain.generated.edges.edge_schema import Edge
+    from moma_management.repository.neo4j_pgson_mixin import DATASET_MAX_HOPS
+
+    chain = [str(uuid4()) for _ in range(DATASET_MAX_HOPS + 3)]
+    root_id = chain[0]
+
+    def _edges(pairs):
+        return [Edge.model_validate({"from": a, "to": b, "labels": ["distribution"]})
+                for a, b in pairs]
+
+    adjacency: dict = {}
+    owned = {root_id: 0}
+    reached = Neo4jDatasetRepository._newly_owned(
+        root_id, _edges(zip(chain, chain[1:])), adjacency, owned)
+    assert reached == chain[1:DATASET_MAX_HOPS + 1]
+
+    shortcut = chain[DATASET_MAX_HOPS]
+    reached = Neo4jDatasetRepository._newly_owned(
+        root_id, _edges([(root_id, shortcut)]), adjacency, owned)
+    assert reached == chain[DATASET_MAX_HOPS + 1:]
+    assert owned[shortcut] == 1
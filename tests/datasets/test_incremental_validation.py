@@ -0,0 +1,85 @@
+"""
+Unit tests for IncrementalGraphValidator.
+
+Validating a patch against a stored dataset must report the same errors as
+re-validating the whole patched dataset. No database is required.
+"""
+
+import copy
+import json
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+
+from moma_management.domain.dataset import Dataset
+from moma_management.domain.generated.edges.edge_schema import Edge
+from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.domain.validation import IncrementalGraphValidator
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+BASE_PATH = PROJECT_ROOT / "assets" / "datasets" / "light" / "esco_light.json"
+
+_RAW = json.loads(BASE_PATH.read_text())
+_ROOT = next(n for n in _RAW["nodes"] if "sc:Dataset" in n["labels"])
+_FILE = next(n for n in _RAW["nodes"] if "cr:FileObject" in n["labels"])
+
+
+def _patched(nodes: list[dict], edges: list[dict]) -> Dataset:
+    """Apply a patch the way IncrementalGraphValidator does, without validating."""
+    raw = copy.deepcopy(_RAW)
+    by_id = {n["id"]: n for n in raw["nodes"]}
+    for patch in nodes:
+        if patch["id"] in by_id:
+            stored = by_id[patch["id"]]
+            stored["properties"].update(patch.get("properties") or {})
+            stored["labels"] = patch.get("labels") or stored["labels"]
+        else:
+            raw["nodes"].append(patch)
+    raw["edges"] += edges
+    return Dataset.model_construct(
+        nodes=[Node.model_construct(id=UUID(n["id"]), labels=n["labels"], properties=n["properties"])
+               for n in raw["nodes"]],
+        edges=[Edge.model_construct(from_=UUID(e["from"]), to=UUID(e["to"]),
+                                    labels=e["labels"], properties=e.get("properties"))
+               for e in raw["edges"]],
+    )
+
+
+def _sorted(errors) -> list[tuple]:
+    return sorted((e.instancePath, e.keyword, e.schemaPath, e.message) for e in errors)
+
+
+_NEW_ID = str(uuid4())
+
+_PATCHES = {
+    "valid_property": ([{"id": _FILE["id"], "properties": {"name": "renamed.csv"}}], []),
+    "wrong_property_type": ([{"id": _FILE["id"], "properties": {"name": 12}}], []),
+    "relabel_breaks_edges": ([{"id": _FILE["id"], "labels": ["cr:RecordSet"]}], []),
+    "edge_into_root": ([], [{"from": _FILE["id"], "to": _ROOT["id"], "labels": ["distribution"]}]),
+    "edge_to_missing_node": ([], [{"from": _ROOT["id"], "to": str(uuid4()), "labels": ["distribution"]}]),
+    "unreachable_node": ([{**_FILE, "id": _NEW_ID}], []),
+    "connected_node": ([{**_FILE, "id": _NEW_ID}],
+                       [{"from": _ROOT["id"], "to": _NEW_ID, "labels": ["distribution"]}]),
+}
+
+_VALID_PATCHES = {"valid_property", "connected_node"}
+
+
+@pytest.mark.parametrize("name", list(_PATCHES))
+def test_patch_matches_full_validation(name):
+    nodes, edges = _PATCHES[name]
+    base = Dataset.model_validate(_RAW)
+    incremental = IncrementalGraphValidator(base).validate(nodes=nodes, edges=edges)
+    full = Dataset.validation_chain.handle(_patched(nodes, edges))
+    assert _sorted(incremental) == _sorted(full)
+    assert bool(incremental) == (name not in _VALID_PATCHES)
+
+
+def test_property_patch_skips_structure_checks():
+    """A property patch on a base graph with no root is not re-checked for structure."""
+    base = Dataset.model_construct(
+        nodes=[Node.model_construct(**{**_FILE, "id": UUID(_FILE["id"])})], edges=[])
+    errors = IncrementalGraphValidator(base).validate(
+        nodes=[{"id": _FILE["id"], "properties": {"name": "renamed.csv"}}])
+    assert errors == []
@@ -0,0 +1,56 @@
+"""
+Unit tests for NodeService.update validation.
+
+Updates only merge properties, so they are validated against the stored
+labels of the node. No database is required.
+"""
+
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from moma_management.domain.exceptions import ValidationError
+from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.services.node import NodeService
+
+
+def _interval_stats_service() -> tuple[NodeService, AsyncMock, str]:
+    """Return (service, repo_mock, node_id) for a stored global IntervalColumnStatistics node."""
+    node_id = uuid4()
+    repo = AsyncMock()
+    repo.get.return_value = Node.model_construct(
+        id=node_id, labels=["IntervalColumnStatistics"],
+        properties={"windowStart": "2024-01-01T00:00:00Z",
+                    "windowEnd": "2024-01-02T00:00:00Z", "scopeType": "global"})
+    repo.update.return_value = {"status": "success", "updated": 1}
+    return NodeService(repo), repo, str(node_id)
+
+
+@pytest.mark.asyncio
+async def test_update_validates_merged_properties():
+    svc, repo, node_id = _interval_stats_service()
+
+    with pytest.raises(ValidationError, match="scopeId"):
+        await svc.update(Node(id=node_id, labels=[], properties={"scopeType": "station"}))
+    repo.update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_ignores_supplied_labels():
+    """Labels are never written, so sending other labels cannot bypass validation."""
+    svc, repo, node_id = _interval_stats_service()
+
+    with pytest.raises(ValidationError, match="scopeId"):
+        await svc.update(Node(id=node_id, labels=["cr:FileObject"],
+                              properties={"scopeType": "station"}))
+    repo.update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_accepts_valid_properties():
+    svc, repo, node_id = _interval_stats_service()
+
+    await svc.update(Node(id=node_id, labels=[],
+                          properties={"scopeType": "station", "scopeId": "s1"}))
+    repo.update.assert_called_once()
@@ -6,6 +6,8 @@ Covers the CRUD lifecycle for a single node in Neo4j.
 import pytest
 
 from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.repository.backfill_base_label import backfill_base_label
+from moma_management.repository.neo4j_pgson_mixin import BASE_LABEL
 from moma_management.repository.node import Neo4jNodeRepository
 
 # ---------------------------------------------------------------------------
@@ -139,3 +141,37 @@ async def test_delete_detaches_relationships(node_repository: Neo4jNodeRepositor
     assert await node_repository.get(node_a.id) is None
     # node_b must still exist
     assert await node_repository.get(node_b.id) is not None
+
+
+# ---------------------------------------------------------------------------
+# MomaNode base label
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_base_label_is_not_exposed(node_repository: Neo4jNodeRepository):
+    """The internal MomaNode label must never leak into returned labels."""
+    await node_repository.create(_SAMPLE_NODE)
+
+    retrieved = await node_repository.get(_SAMPLE_NODE.id)
+    assert retrieved is not None
+    assert BASE_LABEL not in retrieved.labels
+
+
+@pytest.mark.asyncio
+async def test_backfill_labels_legacy_nodes(node_repository: Neo4jNodeRepository):
+    """Nodes stored without the base label become reachable after the backfill."""
+    legacy_id = "00000000-0000-0000-0000-0000000000cc"
+    await node_repository._session.run(
+        "CREATE (n:`cr:FileObject` {id: $id, name: 'legacy.csv'})",
+        id=legacy_id,
+    )
+    assert await node_repository.get(legacy_id) is None
+
+    labelled = await backfill_base_label(node_repository._session)
+    assert labelled >= 1
+
+    retrieved = await node_repository.get(legacy_id)
+    assert retrieved is not None
+    assert retrieved.labels == ["cr:FileObject"]
+    assert retrieved.properties["name"] == "legacy.csv"
@@ -0,0 +1,176 @@
+"""
+Tests for JWT validation against a fake OIDC issuer.
+"""
+import asyncio
+import time
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import JWTError, jwk, jwt
+
+from moma_management.services.authentication import Authentication
+
+CERTS_PATH = "/protocol/openid-connect/certs"
+
+
+def _rsa_key() -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+class FakeIssuer:
+    """OIDC issuer serving a JWKS that can be rotated or taken down."""
+
+    def __init__(self) -> None:
+        self.private_keys: dict[str, str] = {}
+        self.fetches = 0
+        self.down = False
+        self.app = web.Application()
+        self.app.router.add_get(CERTS_PATH, self._certs)
+        self.url = ""
+
+    def rotate(self, kid: str) -> None:
+        self.private_keys = {kid: _rsa_key()}
+
+    def token(self, kid: str, **claims) -> str:
+        payload = {"iss": self.url, "aud": "moma",
+                   "sub": "user1", "exp": int(time.time()) + 60, **claims}
+        return jwt.encode(payload, self.private_keys[kid], algorithm="RS256",
+                          headers={"kid": kid})
+
+    async def _certs(self, _: web.Request) -> web.Response:
+        self.fetches += 1
+        if self.down:
+            raise web.HTTPServiceUnavailable()
+        keys = []
+        for kid, pem in self.private_keys.items():
+            public = jwk.construct(pem, "RS256").public_key().to_dict()
+            keys.append({**public, "kid": kid, "use": "sig"})
+        return web.json_response({"keys": keys})
+
+
+@pytest_asyncio.fixture
+async def issuer() -> AsyncGenerator[FakeIssuer, None]:
+    fake = FakeIssuer()
+    server = TestServer(fake.app)
+    await server.start_server()
+    fake.url = str(server.make_url("")).rstrip("/")
+    fake.rotate("k1")
+    yield fake
+    await server.close()
+
+
+def _authentication(issuer: FakeIssuer, ttl: int = 300) -> Authentication:
+    return Authentication(issuer=issuer.url, ttl=ttl, client_id="moma",
+                          client_secret="secret", exchange_scope="scope")
+
+
+@pytest.mark.asyncio
+async def test_keys_are_fetched_once(issuer: FakeIssuer):
+    auth = _authentication(issuer)
+    for _ in range(3):
+        claims = await auth.validate(issuer.token("k1"))
+        assert claims["sub"] == "user1"
+    assert issuer.fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_triggers_refresh(issuer: FakeIssuer):
+    auth = _authentication(issuer)
+    await auth.validate(issuer.token("k1"))
+
+    issuer.rotate("k2")
+    auth._jwks._min_refresh_interval = 0
+    assert (await auth.validate(issuer.token("k2")))["sub"] == "user1"
+    assert issuer.fetches == 2
+
+    # Unknown kids right after a refresh do not hammer the issuer
+    auth._jwks._min_refresh_interval = 60
+    with pytest.raises(JWTError):
+        await auth.validate(jwt.encode({"sub": "x"}, _rsa_key(), algorithm="RS256",
+                                       headers={"kid": "forged"}))
+    assert issuer.fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_keys_are_served_when_issuer_is_down(issuer: FakeIssuer):
+    auth = _authentication(issuer, ttl=0)
+    token = issuer.token("k1")
+    await auth.validate(token)
+
+    issuer.down = True
+    auth._jwks._min_refresh_interval = 0
+    assert (await auth.validate(token))["sub"] == "user1"
+    assert issuer.fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_claims_are_rejected(issuer: FakeIssuer):
+    auth = _authentication(issuer)
+    with pytest.raises(JWTError):
+        await auth.validate(issuer.token("k1", aud="someone-else"))
+    with pytest.raises(JWTError):
+        await auth.validate(issuer.token("k1", exp=int(time.time()) - 60))
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_lifecycle(issuer: FakeIssuer):
+    auth = _authentication(issuer)
+    await auth.start()
+    try:
+        assert issuer.fetches == 1
+        await auth.validate(issuer.token("k1"))
+        assert issuer.fetches == 1
+    finally:
+        await auth.close()
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_cached(issuer: FakeIssuer):
+    auth = _authentication(issuer)
+    token = issuer.token("k1")
+    for _ in range(3):
+        assert (await auth.validate(token))["sub"] == "user1"
+    assert auth.token_cache_stats == {"hits": 2, "misses": 1, "size": 1}
+
+    # Rejected tokens are never cached
+    bad = issuer.token("k1", aud="someone-else")
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            await auth.validate(bad)
+    assert auth.token_cache_stats["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_cache_is_invalidated_by_key_rotation(issuer: FakeIssuer):
+    auth = _authentication(issuer)
+    token = issuer.token("k1")
+    await auth.validate(token)
+
+    issuer.rotate("k2")
+    auth._jwks._min_refresh_interval = 0
+    await auth.validate(issuer.token("k2"))
+
+    # k1 is gone from the issuer: its token must be verified again, and fail
+    with pytest.raises(JWTError):
+        await auth.validate(token)
+
+
+@pytest.mark.asyncio
+async def test_cached_token_expires_with_its_exp_claim(issuer: FakeIssuer):
+    auth = _authentication(issuer)
+    token = issuer.token("k1", exp=int(time.time()) + 1)
+    await auth.validate(token)
+    # jose compares whole seconds
+    await asyncio.sleep(2.1)
+    with pytest.raises(JWTError):
+        await auth.validate(token)
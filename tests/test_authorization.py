@@ -0,0 +1,175 @@
+"""
+Tests for DatagemsAuthorizationService against a fake permissions gateway.
+"""
+import asyncio
+import time
+from collections import Counter
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from jose import jwt
+
+from moma_management.services.authorization import (
+    DatagemsAuthorizationService,
+    DatasetRole,
+    GatewayError,
+    UserError,
+)
+
+
+class FakeGateway:
+    """Minimal permissions gateway recording the connections it serves."""
+
+    def __init__(self) -> None:
+        self.connections: set[int] = set()
+        self.calls: Counter[str] = Counter()
+        self.listing_available = True
+        self.app = web.Application()
+        self.app.router.add_get("/api/principal/me", self._me)
+        self.app.router.add_get(
+            "/api/principal/me/context-grants/dataset", self._dataset_grants)
+        self.app.router.add_get(
+            "/api/principal/me/context-grants", self._context_grants)
+
+    def _track(self, request: web.Request) -> None:
+        self.connections.add(id(request.transport))
+        self.calls[request.path] += 1
+        if request.headers.get("Authorization") == "Bearer bad":
+            raise web.HTTPUnauthorized(text="bad token")
+
+    async def _me(self, request: web.Request) -> web.Response:
+        self._track(request)
+        # Leave time for concurrent lookups to pile up
+        await asyncio.sleep(0.05)
+        return web.json_response({"roles": []})
+
+    async def _dataset_grants(self, request: web.Request) -> web.Response:
+        self._track(request)
+        ds_id = request.query["id"]
+        if ds_id == "missing":
+            raise web.HTTPNotFound()
+        return web.json_response({ds_id: [DatasetRole.BROWSE.value]})
+
+    async def _context_grants(self, request: web.Request) -> web.Response:
+        self._track(request)
+        if not self.listing_available:
+            raise web.HTTPNotFound()
+        return web.json_response([
+            {"role": DatasetRole.BROWSE.value, "targetId": "ds-1"},
+            {"role": DatasetRole.EDIT.value, "targetId": "ds-2"},
+        ])
+
+
+@pytest_asyncio.fixture
+async def gateway() -> AsyncGenerator[tuple[FakeGateway, DatagemsAuthorizationService], None]:
+    fake = FakeGateway()
+    server = TestServer(fake.app)
+    await server.start_server()
+    svc = DatagemsAuthorizationService(str(server.make_url("")))
+    await svc.start()
+    yield fake, svc
+    await svc.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_gateway_calls_reuse_pooled_connection(gateway):
+    """Sequential permission checks must share one keep-alive connection."""
+    fake, svc = gateway
+    for _ in range(3):
+        assert not await svc.has_realm_roles("good", [])
+        assert await svc.has_dataset_grant("good", DatasetRole.BROWSE, "ds-1")
+    assert await svc.get_browseable_dataset_ids("good") == ["ds-1"]
+    assert len(fake.connections) == 1
+
+
+@pytest.mark.asyncio
+async def test_gateway_error_statuses(gateway):
+    _, svc = gateway
+    assert not await svc.has_dataset_grant("good", DatasetRole.BROWSE, "missing")
+    with pytest.raises(UserError) as exc_info:
+        await svc.has_realm_roles("bad", [])
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_unreachable_gateway_raises_gateway_error():
+    svc = DatagemsAuthorizationService("http://127.0.0.1:1")
+    try:
+        with pytest.raises(GatewayError):
+            await svc.has_realm_roles("good", [])
+    finally:
+        await svc.close()
+
+
+def _token(sub: str, ttl: int = 3600) -> str:
+    return jwt.encode({"sub": sub, "exp": int(time.time()) + ttl}, "secret", algorithm="HS256")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced_and_cached(gateway):
+    fake, svc = gateway
+    token = _token("alice")
+    await asyncio.gather(*[svc.has_realm_roles(token, []) for _ in range(10)])
+    await svc.has_realm_roles(token, [])
+    assert fake.calls["/api/principal/me"] == 1
+
+    # Another user is looked up separately
+    await svc.has_realm_roles(_token("bob"), [])
+    assert fake.calls["/api/principal/me"] == 2
+
+
+@pytest.mark.asyncio
+async def test_gateway_errors_are_not_cached(gateway):
+    fake, svc = gateway
+    for _ in range(2):
+        with pytest.raises(UserError):
+            await svc.has_realm_roles("bad", [])
+    assert fake.calls["/api/principal/me"] == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cache_by_subject(gateway):
+    fake, svc = gateway
+    alice, bob = _token("alice"), _token("bob")
+    for token in (alice, bob):
+        await svc.has_dataset_grant(token, DatasetRole.BROWSE, "ds-1")
+
+    assert svc.invalidate_cache("alice") == 1
+    for token in (alice, bob):
+        await svc.has_dataset_grant(token, DatasetRole.BROWSE, "ds-1")
+    assert fake.calls["/api/principal/me/context-grants/dataset"] == 3
+
+    assert svc.invalidate_cache() == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_entries_expire_with_token(gateway):
+    fake, svc = gateway
+    token = _token("alice", ttl=-1)
+    await svc.get_browseable_dataset_ids(token)
+    await svc.get_browseable_dataset_ids(token)
+    assert fake.calls["/api/principal/me/context-grants"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_grant_check_uses_one_listing_call(gateway):
+    fake, svc = gateway
+    grants = await svc.has_dataset_grants(
+        "good", DatasetRole.BROWSE, ["ds-1", "ds-2", "ds-3", "ds-1"])
+    assert grants == {"ds-1": True, "ds-2": False, "ds-3": False}
+    assert fake.calls["/api/principal/me/context-grants"] == 1
+    assert fake.calls["/api/principal/me/context-grants/dataset"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_grant_check_falls_back_to_per_id_lookups(gateway):
+    fake, svc = gateway
+    fake.listing_available = False
+    ids = [f"ds-{i}" for i in range(25)] + ["missing"]
+    grants = await svc.has_dataset_grants("good", DatasetRole.BROWSE, ids)
+    assert grants == {**{i: True for i in ids}, "missing": False}
+    assert fake.calls["/api/principal/me/context-grants/dataset"] == len(ids)
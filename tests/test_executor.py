@@ -0,0 +1,65 @@
+"""
+Tests for the executor layer that offloads CPU-bound work from the event loop.
+"""
+import asyncio
+import json
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from moma_management.domain.exceptions import OverloadedError, ValidationError
+from moma_management.services.dataset import DatasetService
+from moma_management.services.executor import ExecutorMode, WorkExecutor
+
+
+@pytest.mark.asyncio
+async def test_inline_executor_runs_on_calling_thread():
+    executor = WorkExecutor("test", mode=ExecutorMode.INLINE)
+    assert await executor.run(threading.get_ident) == threading.get_ident()
+    assert executor.stats["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_rejects_when_queue_is_full():
+    """Submissions beyond max_workers + max_queue fail fast instead of queueing."""
+    executor = WorkExecutor("test", mode=ExecutorMode.THREAD,
+                            max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = [asyncio.ensure_future(executor.run(release.wait))
+                   for _ in range(2)]
+        await asyncio.sleep(0)
+        assert executor.in_flight == 2
+
+        with pytest.raises(OverloadedError):
+            await executor.run(release.wait)
+        assert executor.stats["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(*running)
+        assert executor.stats == {"completed": 2, "failed": 0,
+                                  "rejected": 1, "in_flight": 0}
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_executor_convert_matches_inline(light_profile: Path, mapping_file: Path):
+    """Converting in a worker process yields the same dataset as the inline path."""
+    profile = json.loads(light_profile.read_text())
+    inline = DatasetService(AsyncMock(), mapping_file, AsyncMock())
+    executor = WorkExecutor("test", mode=ExecutorMode.PROCESS, max_workers=1)
+    try:
+        pooled = DatasetService(AsyncMock(), mapping_file, AsyncMock(),
+                                cpu_executor=executor)
+        expected = await inline.convert(json.loads(light_profile.read_text()))
+        assert await pooled.convert(profile) == expected
+
+        # Domain errors raised in the worker reach the caller unchanged
+        with pytest.raises(ValidationError):
+            await pooled.convert({})
+    finally:
+        executor.shutdown()
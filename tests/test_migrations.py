@@ -0,0 +1,122 @@
+"""
+Tests for the versioned Neo4j migration runner.
+
+Covers recording of applied versions, idempotent re-runs, mutual exclusion
+between concurrent runners, the VIRTUAL_BELONGS_TO and facet backfills and
+the start-up failure on a failed migration.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from neo4j import AsyncGraphDatabase
+from testcontainers.neo4j import Neo4jContainer
+
+from moma_management import di
+from moma_management.repository import Neo4jDatasetRepository
+from moma_management.repository.migrations import (
+    MIGRATIONS,
+    Migration,
+    run_migrations,
+)
+from moma_management.repository.neo4j_pgson_mixin import Neo4jPgJsonMixin
+
+_LEGACY_DS_ID = "00000000-0000-0000-0000-00000000f001"
+_LEGACY_FILE_ID = "00000000-0000-0000-0000-00000000f002"
+
+
+@pytest_asyncio.fixture(scope="module")
+async def driver(neo4j_container_module: Neo4jContainer):
+    uri = neo4j_container_module.get_connection_url()
+    auth = (neo4j_container_module.username, neo4j_container_module.password)
+    driver = AsyncGraphDatabase.driver(uri, auth=auth)
+    yield driver
+    await driver.close()
+
+
+@pytest.mark.asyncio
+async def test_migrations_backfill_legacy_dataset(driver):
+    """A dataset stored before the migrations gains its label and virtual edges."""
+    async with driver.session() as session:
+        await session.run(
+            """
+            CREATE (d:`sc:Dataset` {id: $dsId})
+            CREATE (f:`cr:FileObject` {id: $fileId, encodingFormat: 'text/csv'})
+            CREATE (d)-[:distribution]->(f)
+            """,
+            dsId=_LEGACY_DS_ID, fileId=_LEGACY_FILE_ID,
+        )
+
+        applied = await run_migrations(session)
+        assert applied == [m.version for m in MIGRATIONS]
+
+        result = await session.run(
+            """
+            MATCH (f:MomaNode {id: $fileId})-[:VIRTUAL_BELONGS_TO]->(d:MomaNode {id: $dsId})
+            RETURN count(*) AS c
+            """,
+            dsId=_LEGACY_DS_ID, fileId=_LEGACY_FILE_ID,
+        )
+        record = await result.single()
+        assert record["c"] == 1
+
+        result = await session.run(
+            "MATCH (d:`sc:Dataset` {id: $dsId}) "
+            "RETURN d._facetLabels AS labels, d._facetEncodingFormats AS formats",
+            dsId=_LEGACY_DS_ID,
+        )
+        record = await result.single()
+        assert record["labels"] == ["cr:FileObject"]
+        assert record["formats"] == ["text/csv"]
+
+
+@pytest.mark.asyncio
+async def test_migrations_are_not_reapplied(driver):
+    """A second run finds every migration recorded and applies nothing."""
+    async with driver.session() as session:
+        await run_migrations(session)
+        assert await run_migrations(session) == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runners_apply_once(driver):
+    """Only one of several concurrent runners applies a pending migration."""
+    calls: list[int] = []
+
+    async def _slow(session) -> None:
+        calls.append(1)
+        await asyncio.sleep(0.5)
+
+    migrations = MIGRATIONS + [Migration(1000, "test migration", _slow)]
+
+    async def _run() -> list[int]:
+        async with driver.session() as session:
+            return await run_migrations(session, migrations)
+
+    results = await asyncio.gather(*(_run() for _ in range(3)))
+
+    assert len(calls) == 1
+    assert sorted(len(r) for r in results) == [0, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_failed_migration_aborts_startup(neo4j_container_module, monkeypatch):
+    """The application does not start on a database whose migrations failed."""
+    async def _failing(session) -> list[int]:
+        raise RuntimeError("migration 1000 failed")
+
+    monkeypatch.setattr(di, "NEO4J_URI", neo4j_container_module.get_connection_url())
+    monkeypatch.setattr(di, "NEO4J_USER", neo4j_container_module.username)
+    monkeypatch.setattr(di, "NEO4J_PASSWORD", neo4j_container_module.password)
+    monkeypatch.setattr(di, "RUN_MIGRATIONS_ON_STARTUP", True)
+    monkeypatch.setattr(di, "run_migrations", _failing)
+    # The lifespan configures the repositories shared with other tests.
+    monkeypatch.setattr(Neo4jPgJsonMixin, "write_batch_size", Neo4jPgJsonMixin.write_batch_size)
+    monkeypatch.setattr(Neo4jDatasetRepository, "use_virtual_edges",
+                        Neo4jDatasetRepository.use_virtual_edges)
+
+    with pytest.raises(RuntimeError, match="migration 1000 failed"):
+        async with di.container_lifespan(None):
+            pass
+    await di.driver.close()
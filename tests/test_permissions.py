@@ -45,7 +45,7 @@ async def test_require_authentication_disabled_returns_none():
 @pytest.mark.asyncio
 async def test_require_authentication_valid_token_returns_user():
     auth_svc = MagicMock()
-    auth_svc.validate.return_value = {"sub": "user1"}
+    auth_svc.validate = AsyncMock(return_value={"sub": "user1"})
 
     check = require_authentication()
     result = await check(
@@ -59,7 +59,7 @@ async def test_require_authentication_valid_token_returns_user():
 async def test_require_authentication_invalid_token_raises_401():
     from jose import JWTError
     auth_svc = MagicMock()
-    auth_svc.validate.side_effect = JWTError("bad token")
+    auth_svc.validate = AsyncMock(side_effect=JWTError("bad token"))
 
     check = require_authentication()
     with pytest.raises(HTTPException) as exc_info:
@@ -104,7 +104,7 @@ async def test_authz_disabled_returns_user():
 async def test_permission_granted():
     authz_svc = MagicMock()
     authz_svc.has_realm_roles = AsyncMock(return_value=False)
-    authz_svc.has_dataset_grant = AsyncMock(return_value=True)
+    authz_svc.has_dataset_grants = AsyncMock(return_value={"ds-123": True})
 
     check = require_permission(DatasetRole.BROWSE)
     result = await check(
@@ -115,15 +115,15 @@ async def test_permission_granted():
         dataset_svc=MagicMock(),
     )
     assert result == {"sub": "user1"}
-    authz_svc.has_dataset_grant.assert_called_once_with(
-        "tok", DatasetRole.BROWSE, "ds-123")
+    authz_svc.has_dataset_grants.assert_called_once_with(
+        "tok", DatasetRole.BROWSE, ["ds-123"])
 
 
 @pytest.mark.asyncio
 async def test_permission_denied_raises_403():
     authz_svc = MagicMock()
     authz_svc.has_realm_roles = AsyncMock(return_value=False)
-    authz_svc.has_dataset_grant = AsyncMock(return_value=False)
+    authz_svc.has_dataset_grants = AsyncMock(return_value={"ds-123": False})
 
     check = require_permission(DatasetRole.BROWSE)
     with pytest.raises(HTTPException) as exc_info:
@@ -141,7 +141,7 @@ async def test_permission_denied_raises_403():
 async def test_gateway_error_raises_502():
     authz_svc = MagicMock()
     authz_svc.has_realm_roles = AsyncMock(return_value=False)
-    authz_svc.has_dataset_grant = AsyncMock(side_effect=GatewayError("down"))
+    authz_svc.has_dataset_grants = AsyncMock(side_effect=GatewayError("down"))
 
     check = require_permission(DatasetRole.BROWSE)
     with pytest.raises(HTTPException) as exc_info:
@@ -159,8 +159,7 @@ async def test_gateway_error_raises_502():
 async def test_node_not_found_raises_404():
     authz_svc = MagicMock()
     dataset_svc = AsyncMock()
-    dataset_svc.list.return_value = {
-        "datasets": []}  # node has no parent datasets
+    dataset_svc.resolve_owning_datasets.return_value = {}  # node has no parent datasets
 
     check = require_permission(DatasetRole.BROWSE, id_type=IdType.Node)
     with pytest.raises(HTTPException) as exc_info:
@@ -174,6 +173,114 @@ async def test_node_not_found_raises_404():
     assert exc_info.value.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_node_checks_owning_datasets():
+    """A node ID is authorised against the dataset(s) it belongs to."""
+    authz_svc = MagicMock()
+    authz_svc.has_realm_roles = AsyncMock(return_value=False)
+    authz_svc.has_dataset_grants = AsyncMock(return_value={"ds-123": True})
+    dataset_svc = AsyncMock()
+    dataset_svc.resolve_owning_datasets.return_value = {"node-xyz": ["ds-123"]}
+
+    check = require_permission(DatasetRole.BROWSE, id_type=IdType.Node)
+    result = await check(
+        request=_make_request("node-xyz"),
+        credentials=_make_credentials(),
+        user={"sub": "user1"},
+        authorization=authz_svc,
+        dataset_svc=dataset_svc,
+    )
+    assert result == {"sub": "user1"}
+    dataset_svc.resolve_owning_datasets.assert_awaited_once_with(["node-xyz"])
+    authz_svc.has_dataset_grants.assert_called_once_with(
+        "tok", DatasetRole.BROWSE, ["ds-123"])
+
+
+# ---------------------------------------------------------------------------
+# require_permission — IdType.AP
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_ap_not_found_raises_404():
+    """A missing AP (NotFoundError from the service) must surface as 404."""
+    ap_svc = AsyncMock()
+    ap_svc.resolve_input_datasets.side_effect = NotFoundError("not found")
+
+    check = require_permission(DatasetRole.BROWSE, id_type=IdType.AP)
+    with pytest.raises(NotFoundError):
+        await check(
+            request=_make_request("ap-xyz"),
+            credentials=_make_credentials(),
+            user={"sub": "user1"},
+            authorization=MagicMock(),
+            dataset_svc=MagicMock(),
+            ap_svc=ap_svc,
+        )
+
+
+@pytest.mark.asyncio
+async def test_ap_checks_datasets_of_its_inputs():
+    """An AP ID is authorised against the datasets of its input nodes."""
+    authz_svc = MagicMock()
+    authz_svc.has_realm_roles = AsyncMock(return_value=False)
+    authz_svc.has_dataset_grants = AsyncMock(
+        return_value={"ds-a": True, "ds-b": True})
+    ap_svc = AsyncMock()
+    ap_svc.resolve_input_datasets.return_value = {
+        "data-1": ["ds-a"], "data-2": ["ds-a", "ds-b"]}
+
+    check = require_permission(DatasetRole.BROWSE, id_type=IdType.AP)
+    result = await check(
+        request=_make_request("ap-xyz"),
+        credentials=_make_credentials(),
+        user={"sub": "user1"},
+        authorization=authz_svc,
+        dataset_svc=MagicMock(),
+        ap_svc=ap_svc,
+    )
+    assert result == {"sub": "user1"}
+    ap_svc.resolve_input_datasets.assert_awaited_once_with("ap-xyz")
+    ap_svc.get.assert_not_called()
+    authz_svc.has_dataset_grants.assert_awaited_once_with(
+        "tok", DatasetRole.BROWSE, ["ds-a", "ds-b"])
+
+
+@pytest.mark.asyncio
+async def test_ap_without_inputs_is_granted():
+    authz_svc = MagicMock()
+    ap_svc = AsyncMock()
+    ap_svc.resolve_input_datasets.return_value = {}
+
+    check = require_permission(DatasetRole.BROWSE, id_type=IdType.AP)
+    result = await check(
+        request=_make_request("ap-xyz"),
+        credentials=_make_credentials(),
+        user={"sub": "user1"},
+        authorization=authz_svc,
+        dataset_svc=MagicMock(),
+        ap_svc=ap_svc,
+    )
+    assert result == {"sub": "user1"}
+    authz_svc.has_dataset_grants.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ap_with_unowned_inputs_raises_404():
+    ap_svc = AsyncMock()
+    ap_svc.resolve_input_datasets.return_value = {"data-1": []}
+
+    check = require_permission(DatasetRole.BROWSE, id_type=IdType.AP)
+    with pytest.raises(HTTPException) as exc_info:
+        await check(
+            request=_make_request("ap-xyz"),
+            credentials=_make_credentials(),
+            user={"sub": "user1"},
+            authorization=MagicMock(),
+            dataset_svc=MagicMock(),
+            ap_svc=ap_svc,
+        )
+    assert exc_info.value.status_code == 404
+
 # ---------------------------------------------------------------------------
 # require_permission — IdType.Relationship
 # ---------------------------------------------------------------------------
@@ -209,7 +316,8 @@ async def test_relationship_permission_granted_when_all_datasets_allowed():
     """require_all=True must grant access when the caller can BROWSE both linked datasets."""
     authz_svc = MagicMock()
     authz_svc.has_realm_roles = AsyncMock(return_value=False)
-    authz_svc.has_dataset_grant = AsyncMock(return_value=True)
+    authz_svc.has_dataset_grants = AsyncMock(
+        return_value={"ds-a": True, "ds-b": True})
 
     relationship_svc = AsyncMock()
     relationship_svc.get.return_value = _make_relationship_result("ds-a", "ds-b")
@@ -225,7 +333,8 @@ async def test_relationship_permission_granted_when_all_datasets_allowed():
         relationship_svc=relationship_svc,
     )
     assert result == {"sub": "user1"}
-    assert authz_svc.has_dataset_grant.await_count == 2
+    authz_svc.has_dataset_grants.assert_awaited_once_with(
+        "tok", DatasetRole.BROWSE, ["ds-a", "ds-b"])
 
 
 @pytest.mark.asyncio
@@ -234,7 +343,8 @@ async def test_relationship_permission_denied_when_one_dataset_lacks_grant():
     authz_svc = MagicMock()
     authz_svc.has_realm_roles = AsyncMock(return_value=False)
     # Grant on the first dataset only
-    authz_svc.has_dataset_grant = AsyncMock(side_effect=[True, False])
+    authz_svc.has_dataset_grants = AsyncMock(
+        return_value={"ds-a": True, "ds-b": False})
 
     relationship_svc = AsyncMock()
     relationship_svc.get.return_value = _make_relationship_result("ds-a", "ds-b")
@@ -271,7 +381,7 @@ async def test_require_admin_disabled_returns_none():
 @pytest.mark.asyncio
 async def test_require_admin_authz_disabled_returns_user():
     auth_svc = MagicMock()
-    auth_svc.validate.return_value = {"sub": "user1"}
+    auth_svc.validate = AsyncMock(return_value={"sub": "user1"})
 
     check = require_admin()
     result = await check(
@@ -285,7 +395,7 @@ async def test_require_admin_authz_disabled_returns_user():
 @pytest.mark.asyncio
 async def test_require_admin_granted_for_admin_role():
     auth_svc = MagicMock()
-    auth_svc.validate.return_value = {"sub": "user1"}
+    auth_svc.validate = AsyncMock(return_value={"sub": "user1"})
     authz_svc = MagicMock()
     authz_svc.has_realm_roles = AsyncMock(return_value=True)
 
@@ -301,7 +411,7 @@ async def test_require_admin_granted_for_admin_role():
 @pytest.mark.asyncio
 async def test_require_admin_denied_raises_403_for_non_admin():
     auth_svc = MagicMock()
-    auth_svc.validate.return_value = {"sub": "user1"}
+    auth_svc.validate = AsyncMock(return_value={"sub": "user1"})
     authz_svc = MagicMock()
     authz_svc.has_realm_roles = AsyncMock(return_value=False)
 
@@ -0,0 +1,121 @@
+"""
+Differential tests for the compiled JSON schema fast path of SchemaStep.
+
+Every graph asset, and mutated copies of its nodes and edges, must be accepted
+by the compiled schema exactly when jsonschema accepts it, and SchemaStep must
+report the same errors with and without the fast path.
+No database is required.
+"""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from moma_management.domain.validation import SchemaStep
+from moma_management.domain.validation.compiled_schema import CompiledSchema
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = PROJECT_ROOT / "assets"
+
+# Graph assets only: profiles are Croissant documents, not PG-JSON.
+_GRAPHS = {
+    str(path.relative_to(ASSETS_DIR)): json.loads(path.read_text())
+    for path in sorted(ASSETS_DIR.rglob("*.json"))
+    if "nodes" in json.loads(path.read_text())
+}
+
+# Values of every JSON type, used to replace properties of valid elements.
+_WRONG_VALUES = [None, True, 7, 1.5, "not-a-value", [], ["x"], {}, {"k": 1}]
+
+_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def _mutations(element: dict):
+    """Yield copies of a node or edge, each broken (or not) in one place."""
+    for key in element:
+        broken = copy.deepcopy(element)
+        del broken[key]
+        yield broken
+    for labels in ([], ["Unknown"], "CSV", [1], element.get("labels", []) + ["CSV"]):
+        yield {**copy.deepcopy(element), "labels": labels}
+    properties = element.get("properties")
+    if isinstance(properties, dict):
+        yield {**copy.deepcopy(element), "properties": {**properties, "bad key": 1}}
+        for key in properties:
+            for value in _WRONG_VALUES:
+                yield {**copy.deepcopy(element), "properties": {**properties, key: value}}
+
+
+@pytest.fixture(scope="module")
+def step():
+    return SchemaStep()
+
+
+@pytest.fixture(scope="module")
+def compiled(step):
+    return CompiledSchema(step._schema, step._schema_dir)
+
+
+def _errors(step: SchemaStep, raw: dict, fast: bool) -> list[dict]:
+    step.fast_path = fast
+    try:
+        return [e.model_dump() for e in step._schema_errors(raw)]
+    finally:
+        del step.fast_path
+
+
+def test_schema_compiles(step):
+    assert step._compiled() is not None
+
+
+@pytest.mark.parametrize("name", list(_GRAPHS))
+def test_assets_are_accepted_by_both_paths(step, compiled, name):
+    raw = _GRAPHS[name]
+    assert compiled.is_valid(raw) == step._validator().is_valid(raw)
+    assert _errors(step, raw, fast=True) == _errors(step, raw, fast=False)
+
+
+@pytest.mark.parametrize("name", list(_GRAPHS))
+def test_mutated_elements_match_jsonschema(step, compiled, name):
+    graph = _GRAPHS[name]
+    # One element per distinct label set keeps the heavy assets tractable.
+    seen: set[tuple[str, tuple]] = set()
+    rejected = 0
+    for collection in ("nodes", "edges"):
+        for element in graph.get(collection) or []:
+            key = (collection, tuple(map(str, element.get("labels", []))))
+            if key in seen:
+                continue
+            seen.add(key)
+            for broken in _mutations(element):
+                doc = {"nodes": [], collection: [broken]}
+                valid = step._validator().is_valid(doc)
+                assert compiled.is_valid(doc) == valid, (collection, broken)
+                if not valid:
+                    rejected += 1
+                    assert _errors(step, doc, fast=True) == _errors(step, doc, fast=False)
+    assert rejected > 0
+
+
+def _interval_stats(**properties) -> dict:
+    node = {"id": _ID, "labels": ["IntervalColumnStatistics"],
+            "properties": {"windowStart": "2024-01-01T00:00:00Z",
+                           "windowEnd": "2024-01-02T00:00:00Z", **properties}}
+    return {"nodes": [node], "edges": []}
+
+
+@pytest.mark.parametrize("doc", [
+    _interval_stats(scopeType="global"),
+    _interval_stats(scopeType="global", scopeId="c"),
+    _interval_stats(scopeType="station", scopeId="c"),
+    _interval_stats(scopeType="station"),
+    {"nodes": [{"id": _ID, "labels": "sc:Dataset", "properties": {}}], "edges": []},
+    {"nodes": [{"id": _ID, "properties": {"name": 3}}], "edges": []},
+    {"nodes": [{"id": _ID, "labels": [None, "sc:Dataset"], "properties": {}}], "edges": []},
+])
+def test_conditional_subschemas_match_jsonschema(step, compiled, doc):
+    """if/then/else, and label dispatch on labels it cannot key on."""
+    assert compiled.is_valid(doc) == step._validator().is_valid(doc)
+    assert _errors(step, doc, fast=True) == _errors(step, doc, fast=False)
@@ -0,0 +1,105 @@
+"""
+Tests for the sharded (process pool) path of SchemaStep.
+
+Large graphs are split into shards of nodes and edges validated in worker
+processes; the merged errors must equal those of inline validation.
+No database is required.
+"""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from moma_management.domain.validation import SchemaStep
+
+PROJECT_ROOT = Path(__file__).parent.parent
+HEAVY_DIR = PROJECT_ROOT / "assets" / "datasets" / "heavy"
+
+_GRAPH = json.loads(sorted(HEAVY_DIR.glob("*.json"))[0].read_text())
+
+
+def _broken_graph() -> dict:
+    """A copy of a heavy dataset with invalid nodes and edges spread over it."""
+    graph = copy.deepcopy(_GRAPH)
+    nodes, edges = graph["nodes"], graph["edges"]
+    for i in (0, len(nodes) // 3, len(nodes) // 2, len(nodes) - 1):
+        nodes[i]["properties"]["name"] = 12
+    nodes[len(nodes) // 4]["labels"] = "CSV"
+    for i in (1, len(edges) - 1):
+        edges[i]["labels"] = ["notAnEdge"]
+    return graph
+
+
+@pytest.fixture
+def step(monkeypatch):
+    monkeypatch.setattr(SchemaStep, "parallel_workers", 2)
+    monkeypatch.setattr(SchemaStep, "parallel_chunk_size", max(1, len(_GRAPH["nodes"]) // 5))
+    yield SchemaStep()
+    SchemaStep.shutdown_pool()
+
+
+def _errors(step: SchemaStep, raw: dict, threshold: int) -> list[dict]:
+    step.parallel_threshold = threshold
+    try:
+        return [e.model_dump() for e in step._schema_errors(raw)]
+    finally:
+        del step.parallel_threshold
+
+
+def test_sharded_errors_match_inline(step):
+    graph = _broken_graph()
+    inline = _errors(step, graph, threshold=0)
+    assert SchemaStep._pool is None
+
+    sharded = _errors(step, graph, threshold=10)
+    assert SchemaStep._pool is not None
+    assert sharded == inline
+    assert {e["instancePath"].split("/")[1] for e in sharded} == {"nodes", "edges"}
+
+
+def test_sharded_paths_index_the_whole_graph(step):
+    graph = copy.deepcopy(_GRAPH)
+    last = len(graph["nodes"]) - 1
+    graph["nodes"][last]["labels"] = "CSV"
+
+    errors = _errors(step, graph, threshold=10)
+    assert errors
+    assert all(e["instancePath"].startswith(f"/nodes/{last}/") for e in errors)
+
+
+def test_small_or_valid_graphs_stay_inline(step):
+    assert _errors(step, _GRAPH, threshold=10) == []
+    assert _errors(step, _broken_graph(), threshold=10 ** 9)
+    assert SchemaStep._pool is None
+
+
+def _worker_threshold() -> int:
+    return SchemaStep.parallel_threshold
+
+
+@pytest.mark.asyncio
+async def test_validation_workers_do_not_shard(monkeypatch):
+    """Worker processes started with disable_sharding keep graphs inline."""
+    from moma_management.services.executor import ExecutorMode, WorkExecutor
+
+    monkeypatch.setattr(SchemaStep, "parallel_threshold", 10)
+    monkeypatch.setenv("VALIDATION_PARALLEL_THRESHOLD", "10")
+    executor = WorkExecutor("test", mode=ExecutorMode.PROCESS, max_workers=1,
+                            initializer=SchemaStep.disable_sharding)
+    try:
+        assert await executor.run(_worker_threshold) == 0
+    finally:
+        executor.shutdown()
+
+
+def test_shutdown_pool_stops_the_pool(step):
+    _errors(step, _broken_graph(), threshold=10)
+    pool = SchemaStep._pool
+    assert pool is not None
+
+    SchemaStep.shutdown_pool()
+    assert SchemaStep._pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(_worker_threshold)
@@ -0,0 +1,144 @@
+"""
+Benchmark of the AP and DatasetRelationship subgraph reads.
+
+Both repositories used to read a subgraph with a variable-length
+``(root)-[*1..4]-(m)`` match returning one row per path; they now expand it
+breadth-first over distinct nodes and return one row per subgraph.  For every
+fixture of ``assets/aps`` and ``assets/dataset_relationships`` (plus a
+synthetic AP with a dense operator graph), this module checks that the new
+read returns at least the nodes of the legacy one and reports rows and median
+latency of both.  Run it with ``-s -p no:xdist`` to see the report.
+"""
+
+import json
+from pathlib import Path
+from typing import AsyncGenerator
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from neo4j import AsyncGraphDatabase
+from testcontainers.neo4j import Neo4jContainer
+
+from moma_management.domain.analytical_pattern import AnalyticalPattern
+from moma_management.domain.dataset_relationship import DatasetRelationship
+from moma_management.domain.generated.edges.edge_schema import Edge
+from moma_management.domain.generated.nodes.node_schema import Node
+from moma_management.repository.analytical_pattern import (
+    Neo4jAnalyticalPatternRepository,
+)
+from moma_management.repository.dataset_relationship import (
+    Neo4jDatasetRelationshipRepository,
+)
+from tests.utils import timed_median
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+MAX_SECONDS = 60
+RUNS = 5
+
+# The path-enumerating reads replaced by the breadth-first expansion.
+LEGACY_AP_QUERY = """//cypher
+    MATCH (root:Analytical_Pattern {id: $id})
+    OPTIONAL MATCH path=(root)-[*1..4]-(m)
+    WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
+    RETURN root, m, relationships(path) AS rels
+"""
+LEGACY_RELATIONSHIP_QUERY = """//cypher
+    MATCH (root:BasicDLElement {id: $id})
+    OPTIONAL MATCH path=(root)-[*1..4]-(m)
+    WHERE NONE(r IN relationships(path) WHERE type(r) IN $forbiddenEdges)
+    RETURN root, m, relationships(path) AS rels
+"""
+
+
+def _load_rereid(path: Path) -> dict:
+    """Load a PG-JSON fixture with fresh node IDs so fixtures never collide."""
+    raw = json.loads(path.read_text())
+    id_map = {n["id"]: str(uuid4()) for n in raw["nodes"]}
+    for node in raw["nodes"]:
+        node["id"] = id_map[node["id"]]
+        node["properties"] = node.get("properties") or {}
+    for edge in raw["edges"]:
+        edge["from"] = id_map[edge["from"]]
+        edge["to"] = id_map[edge["to"]]
+    return raw
+
+
+def _dense_ap(operators: int = 10) -> AnalyticalPattern:
+    """AP whose operators all follow every earlier operator."""
+    root_id = str(uuid4())
+    op_ids = [str(uuid4()) for _ in range(operators)]
+    nodes = [Node(id=root_id, labels=["Analytical_Pattern"], properties={"name": "dense"})]
+    edges = []
+    for i, op_id in enumerate(op_ids):
+        nodes.append(Node(id=op_id, labels=["Operator"], properties={"name": f"op{i}"}))
+        edges.append(Edge(**{"from": root_id, "to": op_id, "labels": ["consist_of"]}))
+        edges.extend(
+            Edge(**{"from": op_id, "to": prev, "labels": ["follows"]})
+            for prev in op_ids[:i]
+        )
+    return AnalyticalPattern.model_construct(nodes=nodes, edges=edges)
+
+
+@pytest_asyncio.fixture(scope="module")
+async def session(neo4j_container_module: Neo4jContainer) -> AsyncGenerator:
+    uri = neo4j_container_module.get_connection_url()
+    auth = (neo4j_container_module.username, neo4j_container_module.password)
+    driver = AsyncGraphDatabase.driver(uri, auth=auth)
+    async with driver.session() as session:
+        yield session
+    await driver.close()
+
+
+async def _compare(session, name, legacy_query, forbidden, repo, root_id) -> None:
+    async def legacy():
+        result = await session.run(legacy_query, id=root_id, forbiddenEdges=forbidden)
+        return [record async for record in result]
+
+    rows, legacy_s = await timed_median(legacy, RUNS)
+    graph, bfs_s = await timed_median(lambda: repo.get(root_id), RUNS)
+
+    legacy_ids = {rows[0]["root"]["id"]} | {r["m"]["id"] for r in rows if r["m"]}
+    assert graph is not None
+    assert legacy_ids <= {str(n.id) for n in graph.nodes}
+    assert bfs_s < MAX_SECONDS
+
+    print(
+        f"\n{name:<40} legacy: {len(rows):>6} rows {legacy_s * 1000:8.1f} ms"
+        f" | bfs: 1 row {bfs_s * 1000:8.1f} ms"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "ap_path", sorted((ASSETS_DIR / "aps").glob("*.json")), ids=lambda p: p.name
+)
+async def test_ap_get(session, ap_path: Path):
+    repo = Neo4jAnalyticalPatternRepository(session)
+    ap = AnalyticalPattern.model_validate(_load_rereid(ap_path))
+    await repo.create(ap)
+    await _compare(session, ap_path.name, LEGACY_AP_QUERY,
+                   repo._effective_forbidden_edges(False), repo, str(ap.root.id))
+
+
+@pytest.mark.asyncio
+async def test_dense_ap_get(session):
+    repo = Neo4jAnalyticalPatternRepository(session)
+    ap = _dense_ap()
+    await repo.create(ap)
+    await _compare(session, "dense operator graph (10 operators)", LEGACY_AP_QUERY,
+                   repo._effective_forbidden_edges(False), repo, str(ap.root.id))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "rel_path",
+    sorted((ASSETS_DIR / "dataset_relationships").glob("*.json")),
+    ids=lambda p: p.name,
+)
+async def test_relationship_get(session, rel_path: Path):
+    repo = Neo4jDatasetRelationshipRepository(session)
+    rel = DatasetRelationship.model_validate(_load_rereid(rel_path))
+    await repo.create(rel)
+    await _compare(session, rel_path.name, LEGACY_RELATIONSHIP_QUERY,
+                   repo.FORBIDDEN_EDGES, repo, str(rel.root.id))
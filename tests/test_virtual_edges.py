@@ -0,0 +1,109 @@
+"""
+Tests for the VIRTUAL_BELONGS_TO consistency checker.
+"""
+
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from neo4j import AsyncGraphDatabase
+from testcontainers.neo4j import Neo4jContainer
+
+from moma_management.repository.neo4j_pgson_mixin import DATASET_MAX_HOPS
+from moma_management.repository.virtual_edges import (
+    VirtualEdgeReport,
+    check_virtual_edges,
+)
+
+_DS_ID = "00000000-0000-0000-0000-00000000e001"
+_FILE_ID = "00000000-0000-0000-0000-00000000e002"
+_FIELD_ID = "00000000-0000-0000-0000-00000000e003"
+_STRAY_ID = "00000000-0000-0000-0000-00000000e004"
+
+
+@pytest_asyncio.fixture(scope="module")
+async def driver(neo4j_container_module: Neo4jContainer):
+    uri = neo4j_container_module.get_connection_url()
+    auth = (neo4j_container_module.username, neo4j_container_module.password)
+    driver = AsyncGraphDatabase.driver(uri, auth=auth)
+    yield driver
+    await driver.close()
+
+
+@pytest.mark.asyncio
+async def test_check_reports_then_repairs(driver):
+    """Missing and dangling edges are counted, fixed, and gone on re-check."""
+    async with driver.session() as session:
+        # The field lacks its edge; the stray node keeps one it no longer
+        # deserves.
+        await session.run(
+            """
+            CREATE (d:MomaNode:`sc:Dataset` {id: $dsId})
+            CREATE (f:MomaNode:`cr:FileObject` {id: $fileId})
+            CREATE (c:MomaNode:`cr:Field` {id: $fieldId, encodingFormat: 'text/csv'})
+            CREATE (s:MomaNode:`cr:FileObject` {id: $strayId})
+            CREATE (d)-[:distribution]->(f)-[:field]->(c)
+            CREATE (f)-[:VIRTUAL_BELONGS_TO]->(d)
+            CREATE (s)-[:VIRTUAL_BELONGS_TO]->(d)
+            """,
+            dsId=_DS_ID, fileId=_FILE_ID, fieldId=_FIELD_ID, strayId=_STRAY_ID,
+        )
+
+        assert await check_virtual_edges(session) == VirtualEdgeReport(1, 1)
+        assert await check_virtual_edges(session, repair=True, batch_size=1) \
+            == VirtualEdgeReport(1, 1)
+        assert await check_virtual_edges(session) == VirtualEdgeReport(0, 0)
+
+        result = await session.run(
+            """
+            MATCH (n)-[:VIRTUAL_BELONGS_TO]->(:`sc:Dataset` {id: $dsId})
+            RETURN collect(n.id) AS ids
+            """,
+            dsId=_DS_ID,
+        )
+        record = await result.single()
+        assert sorted(record["ids"]) == [_FILE_ID, _FIELD_ID]
+
+        result = await session.run(
+            "MATCH (d:`sc:Dataset` {id: $dsId}) RETURN d._facetEncodingFormats AS formats",
+            dsId=_DS_ID,
+        )
+        record = await result.single()
+        assert record["formats"] == ["text/csv"]
+
+
+@pytest.mark.asyncio
+async def test_repair_links_nodes_within_max_hops_only(driver):
+    """Each repair pass spreads ownership by one hop, so a long chain stops at DATASET_MAX_HOPS."""
+    ds_id = str(uuid4())
+    chain = [str(uuid4()) for _ in range(DATASET_MAX_HOPS + 2)]
+    async with driver.session() as session:
+        await session.run(
+            """
+            CREATE (:MomaNode:`sc:Dataset` {id: $dsId})
+            WITH *
+            UNWIND $chain AS nodeId
+            CREATE (:MomaNode:`cr:FileObject` {id: nodeId})
+            """,
+            dsId=ds_id, chain=chain,
+        )
+        await session.run(
+            """
+            UNWIND $pairs AS pair
+            MATCH (a:MomaNode {id: pair[0]}), (b:MomaNode {id: pair[1]})
+            CREATE (a)-[:containedIn]->(b)
+            """,
+            pairs=[[a, b] for a, b in zip([ds_id] + chain, chain)],
+        )
+
+        await check_virtual_edges(session, repair=True, batch_size=1)
+
+        result = await session.run(
+            """
+            MATCH (n)-[:VIRTUAL_BELONGS_TO]->(:`sc:Dataset` {id: $dsId})
+            RETURN collect(n.id) AS ids
+            """,
+            dsId=ds_id,
+        )
+        record = await result.single()
+        assert sorted(record["ids"]) == sorted(chain[:DATASET_MAX_HOPS])
@@ -1,6 +1,8 @@
+import statistics
+import time
 from json import dumps
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Tuple
 
 # ---------------------------------------------------------------------------
 # Fixed UUIDs for test fixtures
@@ -90,3 +92,13 @@ def save(pg_json: dict, output_path: Path):
     output_path.parent.mkdir(exist_ok=True, parents=True)
     normalized = normalize(pg_json)
     output_path.write_text(dumps(normalized, indent=2, sort_keys=True))
+
+
+async def timed_median(fn: Callable[[], Awaitable[Any]], runs: int) -> Tuple[Any, float]:
+    """Run *fn* *runs* times and return its last result and median duration (s)."""
+    durations = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = await fn()
+        durations.append(time.perf_counter() - t0)
+    return result, statistics.median(durations)